@@ -0,0 +1,77 @@
+import sys
+import os
+import csv
+from datetime import datetime
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from src import baseline_runner
+from src.workloads import load_prompts
+
+def print_batch_report(summaries: list[dict], cold_start: float = None):
+    """Prints one row per batch size with throughput, padding and per-request latency percentiles."""
+    width = 110
+    print("\n" + "=" * width)
+    print("        Baseline Batched Throughput Report")
+    print("=" * width)
+    print(f"{'Batch':<6} | {'Req/s':<7} | {'Tok/s':<8} | {'Padding':<7} | {'Batch TTFT':<10} | {'Lat p50':<8} | {'Lat p90':<8} | {'Lat p99':<8} | {'Done p50':<8} | {'Done p99':<8} | {'Errors':<6}")
+    print("-" * width)
+    for s in summaries:
+        print(f"{s['batch_size']:<6} | {s['throughput_rps']:<7.2f} | {s['throughput_tps']:<8.1f} | {s['padding_ratio']:<7.1%} | {s['batch_ttft_p50']:<10.4f} | {s['latency_p50']:<8.4f} | {s['latency_p90']:<8.4f} | {s['latency_p99']:<8.4f} | {s['completion_p50']:<8.4f} | {s['completion_p99']:<8.4f} | {s['n_errors']:<6}")
+    print("=" * width)
+    if cold_start is not None:
+        reloads = sum(s['load_time'] for s in summaries)
+        reload_str = f" (+{reloads:.4f}s reloading during the sweep)" if reloads else ""
+        print(f"Cold start (Baseline model load): {cold_start:.4f}s{reload_str}")
+        print("=" * width)
+    print("(Latencies in seconds. Lat = a request's own batch time; Done = time from the start of the run, including waiting for earlier batches)")
+
+def save_batch_report_to_csv(summaries: list[dict], filename_prefix: str = "baseline_batch_results"):
+    """Saves the per-batch-size summaries to a timestamped CSV file."""
+    if not summaries:
+        print("No results to save to CSV.")
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{filename_prefix}_{timestamp}.csv"
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=summaries[0].keys())
+            writer.writeheader()
+            writer.writerows(summaries)
+        print(f"\nBatch test results saved to: {os.path.join(os.getcwd(), filename)}")
+    except IOError as e:
+        print(f"Error saving results to CSV: {e}")
+
+def main():
+    print("Starting Baseline Batched Throughput Test...")
+    print(f"Baseline Model: {config.BASELINE_MODEL_NAME}")
+    print(f"Batch sizes: {config.BASELINE_BATCH_SIZES} (length bucketing: {config.BASELINE_BATCH_BUCKET_BY_LENGTH})")
+    print("-" * 30)
+
+    prompts = load_prompts(config.SHORT_PROMPTS_FILE) + load_prompts(config.LONG_PROMPTS_FILE)
+    if not prompts:
+        print("No prompts found. Aborting batch test.")
+        return []
+    # Same request count as one load test level, so the two reports line up
+    requests = [prompts[i % len(prompts)] for i in range(config.LOAD_TEST_REQUESTS_PER_LEVEL)]
+
+    summaries, cold_start = baseline_runner.run_baseline_batch_sweep(
+        config.BASELINE_MODEL_NAME,
+        requests,
+        config.BASELINE_BATCH_SIZES,
+        max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT,
+        bucket_by_length=config.BASELINE_BATCH_BUCKET_BY_LENGTH,
+        model_options={'max_cached_models': config.BASELINE_MAX_CACHED_MODELS}
+    )
+
+    print_batch_report(summaries, cold_start)
+    save_batch_report_to_csv(summaries)
+    return summaries
+
+if __name__ == "__main__":
+    main()
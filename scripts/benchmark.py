@@ -3,6 +3,7 @@ import os
 import time # For any additional diagnostic timing if needed
 import csv
 from datetime import datetime
+from functools import partial
 
 # Add project root to sys.path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -10,143 +11,764 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src import config
-from src import baseline_runner
+from src import plugins
 from src import llamacpp_runner
-# import argparse # For potential future CLI arguments
+from src import stats
+from src import results_store
+from src import scheduler
+from src import resource_profiler
+from src import mock_server
+from src import workloads
+from src import server_monitor
+from src import experiment
+from src import live_view
+from src.workloads import load_prompts, load_vlm_prompts
 
-def load_prompts(filepath: str) -> list[str]:
-    prompts = []
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                stripped_line = line.strip()
-                if stripped_line:
-                    prompts.append(stripped_line)
-    except FileNotFoundError:
-        print(f"Error: Prompt file not found at {filepath}")
-    return prompts
-
-def main():
-    print("Starting VLM Performance Benchmark...")
-    print(f"Baseline Model: {config.BASELINE_MODEL_NAME}")
-    print(f"Llama.cpp API URL: {config.LLAMACPP_API_BASE_URL}")
-    if config.LLAMACPP_MODEL_ALIAS:
-        print(f"Llama.cpp Model Alias: {config.LLAMACPP_MODEL_ALIAS}")
-    print(f"Max new tokens for TTFT: {config.MAX_NEW_TOKENS_FOR_TTFT}")
-    print("-" * 30)
-
-    results = []
+# Imported on first use: a llama.cpp-only run never loads torch/transformers (baseline) or PIL (image cache)
+baseline_runner = plugins.lazy_import("src.baseline_runner")
+image_cache = plugins.lazy_import("src.image_cache")
 
+def build_workload(sink: results_store.ResultSink) -> list[dict]:
+    """
+    Loads every prompt to benchmark and interns it in `sink`. Returns one item per prompt with
+    prompt_type, prompt_idx, prompt_id and prompt_text; image + text items also carry image and
+    image_data_url (the payload prepared ahead of the timed loop, or None). Length sweep and
+    prefix cache items (see build_length_sweep and build_prefix_families) are added when enabled.
+    """
+    workload = []
     prompt_files = {
         "short": config.SHORT_PROMPTS_FILE,
         "long": config.LONG_PROMPTS_FILE
     }
-
     for prompt_type, filepath in prompt_files.items():
-        print(f"\nLoading {prompt_type} prompts from: {filepath}")
+        if prompt_type not in config.TEXT_WORKLOADS:
+            continue
+        print(f"Loading {prompt_type} prompts from: {filepath}")
         prompts = load_prompts(filepath)
         if not prompts:
             print(f"No prompts found or file error for {filepath}. Skipping.")
             continue
-
         for i, prompt_text in enumerate(prompts):
-            print(f"\n--- Testing {prompt_type} prompt {i+1}/{len(prompts)} ---")
-            # print(f"Prompt: "{prompt_text[:100]}..."" if len(prompt_text) > 100 else f"Prompt: "{prompt_text}"")
+            workload.append({
+                'prompt_type': prompt_type,
+                'prompt_idx': i,
+                'prompt_id': sink.intern_prompt(prompt_text),
+                'prompt_text': prompt_text,
+            })
 
-            # Baseline Runner
-            print(f"Running Baseline ({config.BASELINE_MODEL_NAME})...")
-            try:
-                baseline_output, baseline_ttft = baseline_runner.run_baseline_inference(
-                    config.BASELINE_MODEL_NAME,
-                    prompt_text,
-                    max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT
-                )
-                if baseline_ttft != -1.0:
-                    print(f"Baseline TTFT: {baseline_ttft:.4f}s")
-                    results.append({
-                        'prompt_type': prompt_type,
-                        'prompt_idx': i,
-                        'prompt_text': prompt_text,
-                        'runner': 'baseline',
-                        'output_preview': baseline_output[:50], # Store a preview
-                        'ttft': baseline_ttft
-                    })
-                else:
-                    print("Baseline inference failed.")
-                    results.append({
-                        'prompt_type': prompt_type,
-                        'prompt_idx': i,
-                        'prompt_text': prompt_text,
-                        'runner': 'baseline',
-                        'output_preview': "ERROR",
-                        'ttft': -1.0
-                    })
-            except Exception as e:
-                print(f"Exception in baseline_runner: {e}")
-                results.append({
-                        'prompt_type': prompt_type,
-                        'prompt_idx': i,
-                        'prompt_text': prompt_text,
-                        'runner': 'baseline',
-                        'output_preview': f"ERROR: {e}",
-                        'ttft': -1.0
-                    })
-
-
-            # Llama.cpp Runner
-            print(f"Running Llama.cpp (API: {config.LLAMACPP_API_BASE_URL})...")
+    if config.RUN_LENGTH_SWEEP:
+        workload.extend(build_length_sweep(sink))
+    if config.RUN_PREFIX_CACHE_BENCHMARK:
+        workload.extend(build_prefix_families(sink))
+
+    if not config.RUN_VLM_BENCHMARK:
+        return workload
+
+    print(f"Loading vlm prompts from: {config.VLM_PROMPTS_FILE}")
+    vlm_prompts = load_vlm_prompts(config.VLM_PROMPTS_FILE)
+    if not vlm_prompts:
+        print(f"No prompts found or file error for {config.VLM_PROMPTS_FILE}. Skipping.")
+        return workload
+
+    # Encode every image once before the timed loop so client-side CPU work stays out of TTFT
+    prepared_images = {}
+    if config.IMAGE_CACHE_DIR:
+        prepared_images, cache_stats = image_cache.prepare_images(
+            [entry['image'] for entry in vlm_prompts],
+            config.IMAGE_CACHE_DIR,
+            max_side=config.IMAGE_MAX_SIDE,
+            image_format=config.IMAGE_CACHE_FORMAT,
+            workers=config.IMAGE_PREPROCESS_WORKERS
+        )
+        print(f"Prepared {cache_stats['n_images']} image(s) in {cache_stats['preprocess_time']:.4f}s "
+              f"(cache hit rate {cache_stats['hit_rate']:.0%}: {cache_stats['cache_hits']} hit(s), {cache_stats['cache_misses']} miss(es))")
+
+    for i, entry in enumerate(vlm_prompts):
+        workload.append({
+            'prompt_type': 'vlm',
+            'prompt_idx': i,
+            # The image is part of the prompt's identity, so intern the pair
+            'prompt_id': sink.intern_prompt(f"[image: {entry['image']}] {entry['prompt']}"),
+            'prompt_text': entry['prompt'],
+            'image': entry['image'],
+            'image_data_url': prepared_images.get(entry['image']),
+        })
+    return workload
+
+def _sweep_tokenizers() -> dict:
+    """
+    Runner name -> (tokenize, detokenize) used to build that runner's length sweep prompts, from the
+    tokenizer factories of the enabled runners. A runner whose own tokenizer is unavailable falls back
+    to another runner's (token counts are then approximate).
+    """
+    tokenizers = {}
+    loaded = {} # Factory -> its tokenizer pair, so runners sharing a tokenizer load it once
+    for runner_name in _enabled_runners():
+        factory = RUNNER_TOKENIZERS.get(runner_name)
+        if factory is None:
+            continue
+        if factory not in loaded:
+            loaded[factory] = factory()
+        if loaded[factory] is not None:
+            tokenizers[runner_name] = loaded[factory]
+
+    fallback = next(iter(tokenizers.values()), None)
+    for runner_name in _enabled_runners():
+        if runner_name not in tokenizers and fallback is not None:
+            print(f"No tokenizer available for {runner_name}; building its sweep prompts with another runner's tokenizer (token counts are approximate).")
+            tokenizers[runner_name] = fallback
+    return tokenizers
+
+def build_length_sweep(sink: results_store.ResultSink) -> list[dict]:
+    """
+    Builds the prompt length sweep: one synthetic prompt per length in LENGTH_SWEEP_MIN_TOKENS..
+    LENGTH_SWEEP_MAX_TOKENS for each runner, sized with that runner's tokenizer. Items carry the
+    runner they belong to and their exact input_tokens.
+    """
+    lengths = workloads.sweep_lengths(config.LENGTH_SWEEP_MIN_TOKENS, config.LENGTH_SWEEP_MAX_TOKENS)
+    print(f"Building length sweep prompts: {lengths[0]}-{lengths[-1]} tokens ({len(lengths)} lengths)" if lengths else "Length sweep has no lengths; skipping.")
+    items = []
+    for runner_name, (tokenize, detokenize) in _sweep_tokenizers().items():
+        for i, n_tokens in enumerate(lengths):
             try:
-                llamacpp_output, llamacpp_ttft = llamacpp_runner.run_llamacpp_inference(
-                    config.LLAMACPP_API_BASE_URL,
-                    prompt_text,
-                    model_alias=config.LLAMACPP_MODEL_ALIAS,
-                    n_predict=config.MAX_NEW_TOKENS_FOR_TTFT
-                )
-                if llamacpp_ttft != -1.0:
-                    print(f"Llama.cpp TTFT: {llamacpp_ttft:.4f}s")
-                    results.append({
-                        'prompt_type': prompt_type,
-                        'prompt_idx': i,
-                        'prompt_text': prompt_text,
-                        'runner': 'llamacpp',
-                        'output_preview': llamacpp_output[:50], # Store a preview
-                        'ttft': llamacpp_ttft
-                    })
-                else:
-                    print("Llama.cpp inference failed.")
-                    results.append({
-                        'prompt_type': prompt_type,
-                        'prompt_idx': i,
-                        'prompt_text': prompt_text,
-                        'runner': 'llamacpp',
-                        'output_preview': "ERROR",
-                        'ttft': -1.0
-                    })
+                prompt_text, input_tokens = workloads.synthetic_prompt(tokenize, detokenize, n_tokens, seed=i)
             except Exception as e:
-                print(f"Exception in llamacpp_runner: {e}")
-                results.append({
-                        'prompt_type': prompt_type,
-                        'prompt_idx': i,
-                        'prompt_text': prompt_text,
-                        'runner': 'llamacpp',
-                        'output_preview': f"ERROR: {e}",
-                        'ttft': -1.0
-                    })
+                print(f"Could not build a {n_tokens}-token prompt for {runner_name}: {e}")
+                continue
+            if input_tokens != n_tokens:
+                print(f"Length sweep: {runner_name} prompt for {n_tokens} tokens has {input_tokens} tokens")
+            items.append({
+                'prompt_type': 'sweep',
+                'prompt_idx': i,
+                'prompt_id': sink.intern_prompt(prompt_text),
+                'prompt_text': prompt_text,
+                'runner': runner_name,
+                'input_tokens': input_tokens,
+                'cache_prompt': False, # Every repetition must pay the full prefill
+            })
+    return items
+
+def build_prefix_families(sink: results_store.ResultSink) -> list[dict]:
+    """
+    Builds PREFIX_CACHE_FAMILIES prompt families that share a long prefix, each as a "prefix-cold" and
+    a "prefix-warm" item. prompt_text is the shared prefix; every run appends the next of `suffixes`.
+    """
+    print(f"Building {config.PREFIX_CACHE_FAMILIES} shared-prefix prompt families "
+          f"({config.PREFIX_CACHE_PREFIX_WORDS}-word prefix, {config.PREFIX_CACHE_SUFFIX_WORDS}-word suffixes)")
+    # One fresh suffix per warm-up and measured run, so only the prefix is ever cacheable
+    n_suffixes = config.WARMUP_RUNS + config.MAX_REPETITIONS
+    items = []
+    for i in range(config.PREFIX_CACHE_FAMILIES):
+        prefix, suffixes = workloads.prefix_family(config.PREFIX_CACHE_PREFIX_WORDS, config.PREFIX_CACHE_SUFFIX_WORDS, n_suffixes, seed=i)
+        for cache_mode in ('cold', 'warm'):
+            items.append({
+                'prompt_type': f'prefix-{cache_mode}',
+                'prompt_idx': i,
+                'prompt_id': sink.intern_prompt(f"[prefix-{cache_mode}] {prefix}"),
+                'prompt_text': prefix,
+                'suffixes': suffixes,
+                'cache_mode': cache_mode,
+            })
+    return items
+
+def _with_cache_limit(model_options: dict = None) -> dict:
+    """A variant's get_model options plus BASELINE_MAX_CACHED_MODELS, so every load honours the configured cache size."""
+    return dict(model_options or {}, max_cached_models=config.BASELINE_MAX_CACHED_MODELS)
+
+def _run_baseline(item: dict, model_options: dict = None) -> dict:
+    """Runs one baseline inference and returns its metrics dict (text, ttft, ...)."""
+    prompt_text = item['prompt_text']
+    try:
+        if config.BASELINE_USE_MEASURED_GENERATION:
+            return baseline_runner.run_baseline_streaming_inference(
+                config.BASELINE_MODEL_NAME,
+                prompt_text,
+                max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT,
+                model_options=_with_cache_limit(model_options)
+            )
+        output, ttft = baseline_runner.run_baseline_inference(
+            config.BASELINE_MODEL_NAME,
+            prompt_text,
+            max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT,
+            model_options=_with_cache_limit(model_options)
+        )
+        return {'text': output, 'ttft': ttft}
+    except Exception as e:
+        print(f"Exception in baseline_runner: {e}")
+        return {'text': "", 'ttft': -1.0, 'error': str(e)}
+
+def _run_llamacpp(item: dict) -> dict:
+    """
+    Runs one llama.cpp inference and returns its metrics dict (text, ttft, ...). Repetitions send the
+    same prompt, so cache_prompt is off unless the item asks for it: every run pays the full prefill,
+    like the baseline.
+    """
+    prompt_text = item['prompt_text']
+    try:
+        if config.LLAMACPP_USE_STREAMING:
+            return llamacpp_runner.run_llamacpp_streaming_inference(
+                config.LLAMACPP_API_BASE_URL,
+                prompt_text,
+                model_alias=config.LLAMACPP_MODEL_ALIAS,
+                n_predict=config.MAX_NEW_TOKENS_FOR_TTFT,
+                cache_prompt=item.get('cache_prompt', False),
+                timeout=config.LLAMACPP_REQUEST_TIMEOUT
+            )
+        output, ttft = llamacpp_runner.run_llamacpp_inference(
+            config.LLAMACPP_API_BASE_URL,
+            prompt_text,
+            model_alias=config.LLAMACPP_MODEL_ALIAS,
+            n_predict=config.MAX_NEW_TOKENS_FOR_TTFT,
+            timeout=config.LLAMACPP_REQUEST_TIMEOUT,
+            cache_prompt=item.get('cache_prompt', False)
+        )
+        return {'text': output, 'ttft': ttft}
+    except Exception as e:
+        print(f"Exception in llamacpp_runner: {e}")
+        return {'text': "", 'ttft': -1.0, 'error': str(e)}
+
+def _run_baseline_vlm(item: dict, model_options: dict = None) -> dict:
+    """Runs one baseline image + text inference and returns its metrics dict."""
+    return baseline_runner.run_baseline_vlm_inference(
+        config.BASELINE_VLM_MODEL_NAME,
+        item['prompt_text'],
+        item['image'],
+        max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT,
+        model_options=_with_cache_limit(model_options)
+    )
+
+def _run_llamacpp_vlm(item: dict) -> dict:
+    """Runs one llama.cpp image + text inference (without prompt cache reuse, see _run_llamacpp) and returns its metrics dict."""
+    return llamacpp_runner.run_llamacpp_vlm_inference(
+        config.LLAMACPP_API_BASE_URL,
+        item['prompt_text'],
+        item['image'],
+        model_alias=config.LLAMACPP_MODEL_ALIAS,
+        n_predict=config.MAX_NEW_TOKENS_FOR_TTFT,
+        image_data_url=item['image_data_url'],
+        timeout=config.LLAMACPP_REQUEST_TIMEOUT,
+        cache_prompt=item.get('cache_prompt', False)
+    )
+
+def _next_suffix(item: dict) -> str:
+    """Returns the suffix for the next run of a prefix cache item, cycling through its suffixes."""
+    calls = item.get('suffix_calls', 0)
+    item['suffix_calls'] = calls + 1
+    return item['suffixes'][calls % len(item['suffixes'])]
+
+def _run_baseline_prefix(item: dict, model_options: dict = None) -> dict:
+    """Runs one baseline shared-prefix inference, reusing the prefix's past_key_values for warm items."""
+    return baseline_runner.run_baseline_prefix_inference(
+        config.BASELINE_MODEL_NAME,
+        item['prompt_text'],
+        _next_suffix(item),
+        max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT,
+        reuse_prefix=item['cache_mode'] == 'warm',
+        model_options=_with_cache_limit(model_options)
+    )
+
+def _prime_llamacpp_prefix(item: dict):
+    """For warm items, sends the bare prefix (untimed, with cache_prompt) so it is resident in a slot before the measured run."""
+    if item['cache_mode'] == 'warm':
+        llamacpp_runner.run_llamacpp_streaming_inference(
+            config.LLAMACPP_API_BASE_URL,
+            item['prompt_text'],
+            model_alias=config.LLAMACPP_MODEL_ALIAS,
+            n_predict=1,
+            cache_prompt=True,
+            timeout=config.LLAMACPP_REQUEST_TIMEOUT
+        )
+
+def _run_llamacpp_prefix(item: dict) -> dict:
+    """
+    Runs one llama.cpp shared-prefix inference. Warm items reuse the prefix sent by
+    _prime_llamacpp_prefix; cold items disable cache_prompt.
+    """
+    warm = item['cache_mode'] == 'warm'
+    suffix = _next_suffix(item)
+    return llamacpp_runner.run_llamacpp_streaming_inference(
+        config.LLAMACPP_API_BASE_URL,
+        item['prompt_text'] + suffix,
+        model_alias=config.LLAMACPP_MODEL_ALIAS,
+        n_predict=config.MAX_NEW_TOKENS_FOR_TTFT,
+        cache_prompt=warm,
+        timeout=config.LLAMACPP_REQUEST_TIMEOUT
+    )
+
+# get_model options a BASELINE_VARIANTS entry may set; num_threads is applied by the scheduler instead
+_MODEL_OPTION_KEYS = ('dtype', 'quantization', 'compile')
+
+def _baseline_variants() -> dict:
+    """
+    Runner name -> (display suffix, get_model options) of every configured baseline variant;
+    a single plain 'baseline' runner when BASELINE_VARIANTS is empty.
+    """
+    if not config.BASELINE_VARIANTS:
+        return {'baseline': ("", {})}
+    return {
+        f"baseline-{name}": (f" {name}", {key: value for key, value in options.items() if key in _MODEL_OPTION_KEYS})
+        for name, options in config.BASELINE_VARIANTS.items()
+    }
+
+def _describe_options(model_options: dict) -> str:
+    described = ", ".join(f"{key}={value}" for key, value in model_options.items())
+    return f" ({described})" if described else ""
+
+# Runner name -> (display name, target description, function running one inference on a workload item)
+RUNNERS = {}
+# Same, for image + text workload items
+VLM_RUNNERS = {}
+# Same, for shared-prefix (prompt cache) workload items
+PREFIX_RUNNERS = {}
+# Runner name -> function run before every shared-prefix inference, outside its timing and resource profile
+PREFIX_PRIMERS = {}
+# Runners whose thread count (RUNNER_NUM_THREADS) is applied to torch as well; see scheduler.run_phases
+TORCH_RUNNERS = set()
+# Runner name -> one-off setup run at the start of that runner's phase, called with the sink and the pending items
+RUNNER_SETUP = {}
+# Runner name -> factory returning the runner's (tokenize, detokenize) pair, or None if unavailable
+RUNNER_TOKENIZERS = {}
+
+def _baseline_tokenizer():
+    try:
+        hf_tokenizer = baseline_runner.load_tokenizer(config.BASELINE_MODEL_NAME)
+    except Exception as e:
+        print(f"Could not load baseline tokenizer ({config.BASELINE_MODEL_NAME}): {e}")
+        return None
+    return (
+        lambda text: hf_tokenizer.encode(text, add_special_tokens=False),
+        lambda token_ids: hf_tokenizer.decode(token_ids)
+    )
+
+def _llamacpp_tokenizer():
+    if llamacpp_runner.tokenize(config.LLAMACPP_API_BASE_URL, "probe", timeout=config.LLAMACPP_REQUEST_TIMEOUT) is None:
+        print("llama.cpp /tokenize is unavailable.")
+        return None
+    return (
+        lambda text: llamacpp_runner.tokenize(config.LLAMACPP_API_BASE_URL, text, timeout=config.LLAMACPP_REQUEST_TIMEOUT),
+        lambda token_ids: llamacpp_runner.detokenize(config.LLAMACPP_API_BASE_URL, token_ids, timeout=config.LLAMACPP_REQUEST_TIMEOUT)
+    )
+
+def _setup_llamacpp(sink, items: list[dict] = None):
+    """
+    Releases baseline models still held by this process (isolation mode "none") so the client does
+    not compete with the llama.cpp server for memory while the server is measured.
+    """
+    if "src.baseline_runner" in sys.modules and baseline_runner.clear_model_cache():
+        print("Released baseline models held by the benchmark process.")
+
+def _register_baseline() -> dict:
+    """One baseline runner per BASELINE_VARIANTS entry; none (with a notice) if torch/transformers are missing."""
+    missing = plugins.missing_modules(["torch", "transformers"])
+    if missing:
+        print(f"Baseline runners unavailable ({', '.join(missing)} not installed).")
+        return {}
+    runners = {}
+    for name, (suffix, options) in _baseline_variants().items():
+        described = _describe_options(options)
+        runners[name] = {
+            'text': (f"Baseline{suffix}", config.BASELINE_MODEL_NAME + described, partial(_run_baseline, model_options=options)),
+            'vlm': (f"Baseline VLM{suffix}", config.BASELINE_VLM_MODEL_NAME + described, partial(_run_baseline_vlm, model_options=options)),
+            'prefix': (f"Baseline{suffix}", config.BASELINE_MODEL_NAME + described, partial(_run_baseline_prefix, model_options=options)),
+            'setup': partial(_setup_baseline, runner_name=name, model_options=options),
+            'tokenizer': _baseline_tokenizer, # Every variant shares the model's tokenizer
+            'uses_torch': True,
+        }
+    return runners
+
+def _register_llamacpp() -> dict:
+    target = f"API: {config.LLAMACPP_API_BASE_URL}"
+    return {'llamacpp': {
+        'text': ("Llama.cpp", target, _run_llamacpp),
+        'vlm': ("Llama.cpp VLM", target, _run_llamacpp_vlm),
+        'prefix': ("Llama.cpp", target, _run_llamacpp_prefix),
+        'prime': _prime_llamacpp_prefix,
+        'setup': _setup_llamacpp,
+        'tokenizer': _llamacpp_tokenizer,
+    }}
+
+# Plugin name -> register function returning {runner name: entry}. An entry holds the
+# (display name, target, run function) tuple for text prompts under 'text', optionally the same
+# for 'vlm' and 'prefix' items (items a runner has no entry for are skipped), and optionally a
+# 'prime' function for prefix items, 'uses_torch' (True if its thread count must reach torch), a 'setup' function (called with the sink and the phase's pending items) and a 'tokenizer' factory (see the tables above).
+# Installed packages add plugins through the src.plugins.ENTRY_POINT_GROUP entry point.
+BUILTIN_RUNNER_PLUGINS = {
+    'baseline': _register_baseline,
+    'llamacpp': _register_llamacpp,
+}
+
+def _plugin_enabled(plugin_name: str) -> bool:
+    """Whether ENABLED_RUNNERS selects any runner of a plugin ("baseline" or "baseline-<variant>" for baseline)."""
+    if config.ENABLED_RUNNERS is None:
+        return True
+    return any(name == plugin_name or name.startswith(f"{plugin_name}-") for name in config.ENABLED_RUNNERS)
+
+def configure_runners():
+    """
+    (Re)builds the runner tables from the current config by registering every enabled runner plugin;
+    plugins ENABLED_RUNNERS leaves out are never loaded. Called at import and whenever the settings
+    change (e.g. per experiment cell).
+    """
+    # Cleared and refilled in place so every reference to a table sees the new runners
+    for table in (RUNNERS, VLM_RUNNERS, PREFIX_RUNNERS, PREFIX_PRIMERS, TORCH_RUNNERS, RUNNER_SETUP, RUNNER_TOKENIZERS):
+        table.clear()
+    for plugin_name, load in plugins.runner_plugins(BUILTIN_RUNNER_PLUGINS).items():
+        if not _plugin_enabled(plugin_name):
+            continue
+        try:
+            registered = load()()
+        except Exception as e:
+            print(f"Failed to load runner plugin '{plugin_name}': {e}")
+            continue
+        for runner_name, entry in registered.items():
+            RUNNERS[runner_name] = entry['text']
+            for table, kind in ((VLM_RUNNERS, 'vlm'), (PREFIX_RUNNERS, 'prefix')):
+                if kind in entry:
+                    table[runner_name] = entry[kind]
+            if entry.get('prime'):
+                PREFIX_PRIMERS[runner_name] = entry['prime']
+            if entry.get('uses_torch'):
+                TORCH_RUNNERS.add(runner_name)
+            if entry.get('setup'):
+                RUNNER_SETUP[runner_name] = entry['setup']
+            if entry.get('tokenizer'):
+                RUNNER_TOKENIZERS[runner_name] = entry['tokenizer']
+
+def _runners_for(item: dict) -> dict:
+    """The runner table that knows how to run a workload item."""
+    if 'image' in item:
+        return VLM_RUNNERS
+    if 'cache_mode' in item:
+        return PREFIX_RUNNERS
+    return RUNNERS
+
+def _result_row(prompt_type: str, prompt_idx: int, prompt_id: str, runner: str, repetition: int, metrics: dict, extra: dict = None) -> dict:
+    failed = metrics['ttft'] == -1.0
+    if failed:
+        output_preview = f"ERROR: {metrics['error']}" if metrics.get('error') else "ERROR"
+    else:
+        output_preview = metrics['text'][:50] # Store a preview
+    row = {
+        'prompt_type': prompt_type,
+        'prompt_idx': prompt_idx,
+        'prompt_id': prompt_id,
+        'runner': runner,
+        'repetition': repetition,
+        'output_preview': output_preview,
+        'ttft': metrics['ttft'],
+        'decode_time': metrics.get('decode_time', ''),
+        'tokens_per_sec': metrics.get('tokens_per_sec', ''),
+        'finished_at': time.time(),
+    }
+    # Phase breakdown reported by the image + text runners, KV cache reuse where reported,
+    # the llama.cpp server's own timings and the resources used during the run
+    for key in (('preprocess_time', 'prefill_time', 'cached_tokens') + tuple(f"server_{k}" for k in llamacpp_runner.SERVER_TIMING_KEYS)
+                + resource_profiler.RESOURCE_KEYS):
+        if key in metrics:
+            row[key] = metrics[key]
+    # Only set when the run itself had to load the model (see _record_model_load)
+    if metrics.get('load_time'):
+        row['load_time'] = metrics['load_time']
+    if extra:
+        row.update(extra)
+    return row
 
+def _outlier_repetitions(cell_results: list[dict]) -> list[int]:
+    """Repetition indices of successful runs in one (prompt, runner) cell whose TTFT falls outside Tukey's fences."""
+    successful = [r for r in cell_results if r['ttft'] != -1.0]
+    flags = stats.outlier_flags([r['ttft'] for r in successful])
+    return [r['repetition'] for r, is_outlier in zip(successful, flags) if is_outlier]
+
+def _run_cell(sink: results_store.ResultSink, prompt_type: str, prompt_idx: int, prompt_id: str, runner_name: str, display_name: str, target: str, run_once, extra: dict = None) -> list[dict]:
+    """
+    Runs the repetitions of one (prompt, runner) cell, appending each to `sink` as it completes.
+    Cells already finished in a resumed results file are skipped; partially finished ones continue
+    from their stored repetitions. Returns the cell's result rows.
+    """
+    if sink.is_cell_done(prompt_id, runner_name):
+        print(f"Skipping {display_name} ({target}): already completed")
+        return sink.cell_results(prompt_id, runner_name)
+
+    print(f"Running {display_name} ({target})...")
+    cell_results = sink.cell_results(prompt_id, runner_name)
+    if cell_results:
+        print(f"Resuming after {len(cell_results)} stored repetition(s)")
+
+    def record(metrics: dict):
+        row = _result_row(prompt_type, prompt_idx, prompt_id, runner_name, len(cell_results), metrics, extra)
+        sink.append(row)
+        cell_results.append(row)
+
+    stats.run_repetitions(
+        run_once,
+        warmup_runs=config.WARMUP_RUNS,
+        min_repetitions=config.MIN_REPETITIONS,
+        max_repetitions=config.MAX_REPETITIONS,
+        target_rel_ci_width=config.TARGET_REL_CI_WIDTH,
+        previous=list(cell_results),
+        on_result=record
+    )
+    sink.finish_cell(prompt_id, runner_name, _outlier_repetitions(cell_results))
+
+    successful = [r for r in cell_results if r['ttft'] != -1.0]
+    if not successful:
+        print(f"{display_name} inference failed.")
+    elif 'prefill_time' in successful[0]:
+        print(f"{display_name} TTFT: median {stats.percentile([r['ttft'] for r in successful], 50):.4f}s "
+              f"(preprocess {stats.percentile([r['preprocess_time'] for r in successful], 50):.4f}s, "
+              f"prefill {stats.percentile([r['prefill_time'] for r in successful], 50):.4f}s) "
+              f"over {len(successful)}/{len(cell_results)} run(s)")
+    else:
+        print(f"{display_name} TTFT: median {stats.percentile([r['ttft'] for r in successful], 50):.4f}s over {len(successful)}/{len(cell_results)} run(s)")
+    return cell_results
+
+def _load_baseline_model(sink, label: str, model_name: str, model_options: dict = None, multimodal: bool = False) -> bool:
+    """Loads one baseline model and records its load time and memory footprint as a cold start. Returns False on failure."""
+    print(f"Loading baseline model ({model_name}{_describe_options(model_options or {})})...")
+    try:
+        rss_before = scheduler.current_rss_mb()
+        _, model, load_time = baseline_runner.get_model(model_name, multimodal=multimodal, **_with_cache_limit(model_options))
+        weights_mb = baseline_runner.model_weights_mb(model)
+        rss_delta_mb = scheduler.current_rss_mb() - rss_before
+        sink.record_cold_start(label, load_time, weights_mb, rss_delta_mb)
+        print(f"Baseline cold start: {load_time:.4f}s (weights {weights_mb:.1f} MB, RSS +{rss_delta_mb:.1f} MB)")
+        return True
+    except Exception as e:
+        print(f"Failed to load baseline model: {e}")
+        return False
+
+def _setup_baseline(sink, items: list[dict] = None, runner_name: str = 'baseline', model_options: dict = None):
+    """
+    Loads the baseline models the pending `items` need (all of them when None) once, so their load time
+    and memory footprint are recorded as cold start metrics instead of being folded into the first
+    prompt's TTFT, then runs the untimed warm-up generations. The image + text model is recorded as
+    "<runner> vlm"; it is only preloaded when the cache can also hold the text model, otherwise its
+    load happens in the first image run and is recorded from there (see _record_model_load).
+    """
+    needs_text = items is None or any('image' not in item for item in items)
+    needs_vlm = items is not None and any('image' in item for item in items)
+    if needs_vlm and (not needs_text or config.BASELINE_MAX_CACHED_MODELS >= 2):
+        _load_baseline_model(sink, f"{runner_name} vlm", config.BASELINE_VLM_MODEL_NAME, model_options, multimodal=True)
+    if not needs_text or not _load_baseline_model(sink, runner_name, config.BASELINE_MODEL_NAME, model_options):
+        return
+    if config.BASELINE_WARMUP_RUNS > 0:
+        print(f"Warming up baseline ({config.BASELINE_WARMUP_RUNS} run(s), excluded from stats)...")
+        try:
+            baseline_runner.warmup_baseline(
+                config.BASELINE_MODEL_NAME,
+                config.WARMUP_PROMPT,
+                n_runs=config.BASELINE_WARMUP_RUNS,
+                max_new_tokens=config.MAX_NEW_TOKENS_FOR_TTFT,
+                model_options=_with_cache_limit(model_options)
+            )
+        except Exception as e:
+            print(f"Failed to warm up baseline model: {e}")
+
+def _record_model_load(sink, label: str, metrics: dict) -> dict:
+    """
+    Records a model load that happened inside a measured run (a model first needed there, or one
+    reloaded after being evicted from the cache) as a cold start; runners keep load_time out of TTFT.
+    """
+    if metrics.get('load_time'):
+        sink.record_cold_start(label, metrics['load_time'])
+        print(f"Model loaded during the run ({label}): {metrics['load_time']:.4f}s, recorded as a cold start")
+    return metrics
+
+configure_runners()
+
+def _runner_isolation() -> tuple[dict, dict]:
+    """
+    RUNNER_CPUS and RUNNER_NUM_THREADS extended to the baseline variants, which inherit the
+    "baseline" entries; a variant's own num_threads takes precedence.
+    """
+    cpus = dict(config.RUNNER_CPUS)
+    num_threads = dict(config.RUNNER_NUM_THREADS)
+    for name, options in (config.BASELINE_VARIANTS or {}).items():
+        cpus[f"baseline-{name}"] = cpus.get('baseline')
+        num_threads[f"baseline-{name}"] = options.get('num_threads') or num_threads.get('baseline')
+    return cpus, num_threads
+
+def _profiled(run_once, item: dict, prime=None) -> dict:
+    """
+    Runs one inference inside a ResourceProfiler and adds its resource figures to the metrics.
+    `prime` (e.g. sending a shared prefix to warm the server's cache) runs first, outside the profile.
+    """
+    if prime:
+        prime(item)
+    if not config.RESOURCE_PROFILE_INTERVAL:
+        return run_once(item)
+    profiler = resource_profiler.ResourceProfiler(config.LLAMACPP_SERVER_PID, config.RESOURCE_PROFILE_INTERVAL)
+    with profiler:
+        metrics = run_once(item)
+    metrics = dict(metrics)
+    metrics.update(profiler.summary())
+    return metrics
+
+def run_phase(sink, runner_name: str, workload: list[dict]):
+    """
+    Runs every workload item on one runner. This is the unit the scheduler places in a worker process,
+    so nothing belonging to other runners is loaded while it runs. Items carrying a 'runner' key
+    (length sweep prompts built with one runner's tokenizer) only run on that runner.
+    `sink` is a results_store.ResultSink or a scheduler proxy forwarding to one.
+    """
+    print(f"\n=== Phase: {RUNNERS[runner_name][0]} ===")
+    items = [item for item in workload if item.get('runner', runner_name) == runner_name]
+    pending = [item for item in items if not sink.is_cell_done(item['prompt_id'], runner_name)]
+    if runner_name in RUNNER_SETUP and pending:
+        RUNNER_SETUP[runner_name](sink, pending)
+    # Recorded with every result so runs can be compared per model (see scripts/compare.py)
+    served_model = None
+    if runner_name == 'llamacpp' and pending:
+        served_model = config.LLAMACPP_MODEL_ALIAS or llamacpp_runner.served_model(config.LLAMACPP_API_BASE_URL)
+
+    for item in items:
+        if runner_name not in _runners_for(item):
+            print(f"\n--- {RUNNERS[runner_name][0]} does not support {item['prompt_type']} prompts; skipping ---")
+            continue
+        display_name, target, run_once = _runners_for(item)[runner_name]
+        print(f"\n--- {display_name}: {item['prompt_type']} prompt {item['prompt_idx']+1} ---")
+        extra = {}
+        if runner_name == 'llamacpp':
+            if served_model:
+                extra['model'] = served_model
+        else:
+            extra['model'] = config.BASELINE_VLM_MODEL_NAME if 'image' in item else config.BASELINE_MODEL_NAME
+        if 'image' in item:
+            extra['image_path'] = item['image']
+        if 'input_tokens' in item:
+            extra['input_tokens'] = item['input_tokens']
+        load_label = f"{runner_name} vlm" if 'image' in item else runner_name
+        prime = PREFIX_PRIMERS.get(runner_name) if 'cache_mode' in item else None
+        _run_cell(sink, item['prompt_type'], item['prompt_idx'], item['prompt_id'], runner_name, display_name, target,
+                  lambda: _record_model_load(sink, load_label, _profiled(run_once, item, prime)), extra=extra or None)
+
+def _enabled_runners() -> list[str]:
+    """Runner names selected by ENABLED_RUNNERS, in table order; "baseline" selects every baseline variant."""
+    if config.ENABLED_RUNNERS is None:
+        return list(RUNNERS)
+    enabled = set(config.ENABLED_RUNNERS)
+    return [name for name in RUNNERS if name in enabled or (name.startswith('baseline-') and 'baseline' in enabled)]
+
+def _run_phase_with_settings(settings: dict, sink, runner_name: str, workload: list[dict]):
+    """
+    run_phase under the given config overrides. This is what the scheduler runs, so a spawned worker,
+    which starts from the plain src/config.py, sees the same settings as the benchmark process.
+    """
+    try:
+        with experiment.apply_settings(settings):
+            configure_runners()
+            run_phase(sink, runner_name, workload)
+    finally:
+        configure_runners()
+
+def run_benchmark(settings: dict = None, tags: dict = None, csv_prefix: str = "benchmark_results", stop_on_interrupt: bool = False) -> list[dict]:
+    """
+    Runs the whole benchmark with `settings` ({config constant: value}) applied on top of src/config.py,
+    then prints the reports and saves the CSV. `tags` are added to every result record (e.g. the
+    experiment cell). With `stop_on_interrupt`, Ctrl-C is re-raised after the partial results are
+    reported so a caller running several benchmarks stops too. Returns the result rows.
+    """
+    settings = settings or {}
+    try:
+        with experiment.apply_settings(settings):
+            configure_runners()
+            return _run_benchmark(settings, tags, csv_prefix, stop_on_interrupt)
+    finally:
+        configure_runners()
+
+def _run_benchmark(settings: dict, tags: dict, csv_prefix: str, stop_on_interrupt: bool) -> list[dict]:
+    print("Starting VLM Performance Benchmark...")
+    print(f"Baseline Model: {config.BASELINE_MODEL_NAME}")
+    print(f"Llama.cpp API URL: {config.LLAMACPP_API_BASE_URL}")
+    if config.LLAMACPP_MODEL_ALIAS:
+        print(f"Llama.cpp Model Alias: {config.LLAMACPP_MODEL_ALIAS}")
+    print(f"Max new tokens for TTFT: {config.MAX_NEW_TOKENS_FOR_TTFT}")
+    print(f"Repetitions per prompt: {config.MIN_REPETITIONS}-{config.MAX_REPETITIONS} (+{config.WARMUP_RUNS} warm-up)")
+    print(f"Runner isolation: {config.ISOLATION_MODE}")
+    print("-" * 30)
+
+    if config.RESUME_RESULTS_FILE:
+        results_file = config.RESUME_RESULTS_FILE
+    else:
+        results_file = config.RESULTS_FILE or f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    live = live_view.LiveMonitor(config.LIVE_PROGRESS_INTERVAL, config.ABORT_FAILURE_RATE, config.ABORT_TTFT_P99, config.ABORT_MIN_RESULTS)
+    sink = results_store.ResultSink(results_file, resume=bool(config.RESUME_RESULTS_FILE), tags=tags, on_result=live.add)
+    print(f"Streaming results to: {results_file}" + (" (resuming)" if config.RESUME_RESULTS_FILE else ""))
+
+    monitor = None
+    interrupted = False
+    try:
+        workload = build_workload(sink)
+        if config.LLAMACPP_SERVER_PID and config.LLAMACPP_SERVER_CPUS:
+            scheduler.pin_process(config.LLAMACPP_SERVER_PID, config.LLAMACPP_SERVER_CPUS)
+        if config.HARNESS_OVERHEAD_CALIBRATION:
+            print("Measuring harness overhead against a zero-cost mock server...")
+            sink.record_harness_overhead(mock_server.measure_harness_overhead(config.HARNESS_OVERHEAD_REQUESTS, config.MAX_NEW_TOKENS_FOR_TTFT))
+        if config.SERVER_MONITOR_INTERVAL:
+            monitor = server_monitor.ServerMonitor(config.LLAMACPP_API_BASE_URL, config.SERVER_MONITOR_INTERVAL).start()
+        if workload:
+            cpus, num_threads = _runner_isolation()
+            scheduler.run_phases(
+                sink,
+                partial(_run_phase_with_settings, settings),
+                _enabled_runners(),
+                workload,
+                mode=config.ISOLATION_MODE,
+                cpus=cpus,
+                num_threads=num_threads,
+                torch_runners=TORCH_RUNNERS
+            )
+    except KeyboardInterrupt:
+        interrupted = True
+        print(f"\nInterrupted. Completed repetitions are saved in {results_file}; "
+              f"set RESUME_RESULTS_FILE to that path to continue where this run stopped.")
+    except live_view.RunAborted as e:
+        print(f"\nAborted early: {e}. Results measured so far are saved in {results_file}.")
+    finally:
+        if monitor is not None:
+            sink.record_server_samples(monitor.stop())
+        sink.close()
 
     print("\n" + "=" * 30)
     print("Benchmark Finished.")
     print("=" * 30)
 
-    if results: # 'results' is the list collected in the loops
-        print_summary_report(results)
-        save_results_to_csv(results)
+    results = results_store.load_results(results_file)
+    if results:
+        harness_overhead = results_store.load_harness_overhead(results_file)
+        print_summary_report(results, results_store.load_cold_starts(results_file), results_store.load_phase_usage(results_file), harness_overhead,
+                             results_store.load_model_memory(results_file))
+        print_latency_breakdown(results, harness_overhead)
+        print_server_metrics(results_store.load_server_samples(results_file))
+        print_resource_report(results)
+        if config.RUN_LENGTH_SWEEP:
+            print_length_sweep_report(results)
+        if config.RUN_PREFIX_CACHE_BENCHMARK:
+            print_prefix_cache_report(results)
+        save_results_to_csv(results, csv_prefix)
     else:
         print("No results collected to report.")
-    
-    # The main function can still return results if needed, but its primary job is to orchestrate and report.
+
+    if interrupted and stop_on_interrupt:
+        raise KeyboardInterrupt
     return results
 
+def _run_experiment_cell(settings: dict, cell_id: str, path_stem: str, resume: bool) -> list[dict]:
+    """Runs one experiment cell, streaming its results to <path_stem>.jsonl with every record tagged by cell."""
+    results_file = f"{path_stem}.jsonl"
+    settings = dict(settings)
+    settings['RESULTS_FILE'] = results_file
+    settings['RESUME_RESULTS_FILE'] = results_file if resume and os.path.exists(results_file) else None
+    return run_benchmark(settings, tags={'cell': cell_id}, csv_prefix=path_stem, stop_on_interrupt=True)
+
+def main(argv: list[str] = None):
+    return experiment.cli(
+        "Benchmark TTFT of the transformers baseline and a llama.cpp server. Settings default to src/config.py.",
+        run_benchmark,
+        _run_experiment_cell,
+        argv
+    )
+
 def calculate_stats(results: list[dict], prompt_filter: str, runner_filter: str) -> tuple[float, int, int]:
     """Helper to calculate stats for a specific prompt type and runner."""
     filtered_runs = [
@@ -160,27 +782,216 @@ def calculate_stats(results: list[dict], prompt_filter: str, runner_filter: str)
     
     return avg_ttft, len(successful_runs), len(filtered_runs)
 
-def print_summary_report(results: list[dict]):
+def calculate_distribution_stats(results: list[dict], prompt_filter: str, runner_filter: str) -> dict:
+    """TTFT distribution (see stats.summarize) over the successful runs of a prompt type and runner."""
+    ttfts = [
+        r['ttft'] for r in results
+        if r['prompt_type'] == prompt_filter and r['runner'] == runner_filter and r['ttft'] != -1.0
+    ]
+    return stats.summarize(ttfts)
+
+def _group_by_cell(results: list[dict], *keys: str) -> dict:
+    """Result rows grouped by the values of `keys` (default prompt_type, runner), in one pass."""
+    keys = keys or ('prompt_type', 'runner')
+    groups = {}
+    for r in results:
+        groups.setdefault(tuple(r[key] for key in keys), []).append(r)
+    return groups
+
+def print_summary_report(results: list[dict], cold_starts: dict = None, phase_usage: dict = None, harness_overhead: dict = None,
+                         model_memory: dict = None):
     """Prints a formatted summary report of the benchmark results."""
-    print("\n" + "=" * 40)
+    width = 115
+    print("\n" + "=" * width)
     print("        Benchmark Summary Report")
-    print("=" * 40)
-    print(f"{'Prompt Type':<12} | {'Runner':<9} | {'Avg TTFT (s)':<12} | {'Success Rate':<12}")
-    print("-" * 40)
+    print("=" * width)
+    print(f"{'Prompt Type':<12} | {'Runner':<20} | {'Avg TTFT (s)':<12} | {'p50':<7} | {'p90':<7} | {'p99':<7} | {'Stddev':<7} | {'95% CI':<15} | {'Outl.':<5} | {'Success Rate':<12}")
+    print("-" * width)
 
-    prompt_types = sorted(list(set(r['prompt_type'] for r in results)))
-    runners = sorted(list(set(r['runner'] for r in results)))
+    # Grouped once up front; filtering the full list per (prompt type, runner) pair is quadratic on long runs
+    cells = _group_by_cell(results)
+    # Length sweep prompts span orders of magnitude in size and get their own report
+    prompt_types = sorted(set(p_type for p_type, _ in cells if p_type != 'sweep'))
+    runners = sorted(set(runner_name for _, runner_name in cells))
 
     for p_type in prompt_types:
         for runner_name in runners:
-            avg_ttft, num_successful, num_total = calculate_stats(results, p_type, runner_name)
+            cell = cells.get((p_type, runner_name), [])
+            avg_ttft, num_successful, num_total = calculate_stats(cell, p_type, runner_name)
+            if num_total == 0:
+                continue
+            dist = calculate_distribution_stats(cell, p_type, runner_name)
             success_rate_str = f"{num_successful}/{num_total}"
-            print(f"{p_type.capitalize():<12} | {runner_name.capitalize():<9} | {avg_ttft:<12.4f} | {success_rate_str:<12}")
+            ci_str = f"{dist['ci_low']:.4f}-{dist['ci_high']:.4f}"
+            print(f"{p_type.capitalize():<12} | {runner_name.capitalize():<20} | {avg_ttft:<12.4f} | {dist['p50']:<7.4f} | {dist['p90']:<7.4f} | {dist['p99']:<7.4f} | {dist['stddev']:<7.4f} | {ci_str:<15} | {dist['n_outliers']:<5} | {success_rate_str:<12}")
         if p_type != prompt_types[-1]: # Add a separator between prompt types
-            print("-" * 40)
-            
-    print("=" * 40)
-    print("(Note: TTFT averages are for successful runs only)")
+            print("-" * width)
+
+    print("=" * width)
+    if cold_starts:
+        model_memory = model_memory or {}
+        for runner_name, load_time in sorted(cold_starts.items()):
+            memory = model_memory.get(runner_name)
+            memory_str = f" (weights {memory['weights_mb']:.1f} MB, RSS +{memory['rss_delta_mb']:.1f} MB)" if memory else ""
+            print(f"Cold start ({runner_name.capitalize()} model load): {load_time:.4f}s{memory_str}")
+        print("=" * width)
+    if phase_usage:
+        print(f"{'Phase':<20} | {'Wall (s)':<9} | {'CPU (s)':<9} | {'CPU util':<8} | {'Peak RSS (MB)':<13} | {'CPUs':<20} | {'Threads':<7}")
+        print("-" * width)
+        for runner_name, usage in sorted(phase_usage.items()):
+            cpus_str = ",".join(str(c) for c in usage['cpus']) if usage['cpus'] else "all"
+            threads_str = str(usage['num_threads']) if usage['num_threads'] else "default"
+            print(f"{runner_name.capitalize():<20} | {usage['wall_time']:<9.2f} | {usage['cpu_time']:<9.2f} | {usage['cpu_util']:<8.2f} | {usage['peak_rss_mb']:<13.1f} | {cpus_str:<20} | {threads_str:<7}")
+        print("=" * width)
+    if harness_overhead:
+        print(f"Harness overhead (zero-cost mock server, {harness_overhead['n_requests']} requests): "
+              f"TTFT p50 {harness_overhead['ttft_p50'] * 1000:.2f} ms, p99 {harness_overhead['ttft_p99'] * 1000:.2f} ms; "
+              f"ITL p50 {harness_overhead['itl_p50'] * 1000:.3f} ms, p99 {harness_overhead['itl_p99'] * 1000:.3f} ms")
+        print("=" * width)
+    print("(Note: TTFT statistics are for successful runs only, across all repetitions; CI is the bootstrap 95% CI of the mean)")
+
+def print_latency_breakdown(results: list[dict], harness_overhead: dict = None):
+    """
+    Prints the median TTFT split (see llamacpp_runner.latency_breakdown) of every prompt type and
+    runner whose results carry server timings. Client overhead is the calibrated harness overhead.
+    """
+    client_overhead = harness_overhead['ttft_p50'] if harness_overhead else 0.0
+    cells = {}
+    for r in results:
+        breakdown = llamacpp_runner.latency_breakdown(r, client_overhead)
+        if breakdown is not None:
+            cells.setdefault((r['prompt_type'], r['runner']), []).append((r['ttft'], breakdown))
+    if not cells:
+        return
+    width = 88
+    print("\n" + "=" * width)
+    print("        TTFT Breakdown (medians, seconds)")
+    print("=" * width)
+    print(f"{'Prompt Type':<12} | {'Runner':<9} | {'TTFT':<8} | {'Client':<8} | {'Net/Queue':<9} | {'Prefill':<8} | {'Neg':<4} | {'Runs':<5}")
+    print("-" * width)
+    for (p_type, runner_name), cell in sorted(cells.items()):
+        def median(key):
+            return stats.percentile([b[key] for _, b in cell], 50)
+        print(f"{p_type.capitalize():<12} | {runner_name.capitalize():<9} | {stats.percentile([t for t, _ in cell], 50):<8.4f} | "
+              f"{median('client_overhead'):<8.4f} | {median('network_queue'):<9.4f} | {median('server_prefill'):<8.4f} | "
+              f"{sum(b['negative_remainder'] for _, b in cell):<4} | {len(cell):<5}")
+    print("=" * width)
+    if not harness_overhead:
+        print("(Client overhead is 0 without a harness overhead measurement; it is then part of Net/Queue)")
+    print("(Prefill comes from llama-server's timings; Net/Queue is the remainder of TTFT, so Client + Net/Queue + Prefill = TTFT per run)")
+    if any(b['negative_remainder'] for cell in cells.values() for _, b in cell):
+        print("(Neg = runs whose remainder is negative: client overhead plus prefill exceed the measured TTFT, so the overhead calibration or server timings are off)")
+
+def print_server_metrics(samples: list[dict]):
+    """Prints server-side throughput and pressure collected from /metrics and /slots during the run."""
+    if not samples:
+        return
+    summary = server_monitor.summarize_server_samples(samples)
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "n/a"
+
+    print(f"\nServer metrics ({summary['n_samples']} samples): "
+          f"prompt {fmt(summary['prompt_tokens_per_sec'], '.1f')} tok/s, "
+          f"generation {fmt(summary['predicted_tokens_per_sec'], '.1f')} tok/s, "
+          f"peak processing {fmt(summary['max_requests_processing'], '.0f')}, "
+          f"peak deferred {fmt(summary['max_requests_deferred'], '.0f')}, "
+          f"mean KV cache usage {fmt(summary['mean_kv_cache_usage'], '.1%')}, "
+          f"peak busy slots {fmt(summary['max_slots_busy'], '.0f')}/{fmt(summary['slots_total'], '.0f')}")
+
+def print_length_sweep_report(results: list[dict]):
+    """
+    Prints TTFT and prefill throughput against input length for each runner's length sweep, with the
+    local scaling exponent of TTFT between consecutive lengths (about 1 = linear, near 2 = quadratic).
+    """
+    sweep_results = [r for r in results if r['prompt_type'] == 'sweep']
+    if not sweep_results:
+        return
+    width = 88
+    print("\n" + "=" * width)
+    print("        Prompt Length Sweep")
+    print("=" * width)
+    print(f"{'Runner':<9} | {'Input tok':<9} | {'TTFT p50 (s)':<12} | {'TTFT p90 (s)':<12} | {'Prefill tok/s':<13} | {'Scaling':<7} | {'Success':<8}")
+    print("-" * width)
+    cells = _group_by_cell(sweep_results, 'runner', 'input_tokens')
+    for runner_name in sorted(set(runner_name for runner_name, _ in cells)):
+        previous = None
+        for input_tokens in sorted(n for name, n in cells if name == runner_name):
+            cell = cells[(runner_name, input_tokens)]
+            ttfts = [r['ttft'] for r in cell if r['ttft'] != -1.0]
+            success_str = f"{len(ttfts)}/{len(cell)}"
+            if not ttfts:
+                print(f"{runner_name.capitalize():<9} | {input_tokens:<9} | {'failed (context limit?)':<43} | {'':<7} | {success_str:<8}")
+                previous = None
+                continue
+            ttft_p50 = stats.percentile(ttfts, 50)
+            scaling_str = f"{workloads.scaling_exponent(previous[0], previous[1], input_tokens, ttft_p50):.2f}" if previous else "-"
+            print(f"{runner_name.capitalize():<9} | {input_tokens:<9} | {ttft_p50:<12.4f} | {stats.percentile(ttfts, 90):<12.4f} | {input_tokens / ttft_p50:<13.1f} | {scaling_str:<7} | {success_str:<8}")
+            previous = (input_tokens, ttft_p50)
+        print("-" * width)
+    print("(Prefill tok/s = input tokens / median TTFT; Scaling = exponent k in TTFT ~ n^k since the previous length)")
+
+def print_prefix_cache_report(results: list[dict]):
+    """Prints cold vs warm prefix cache TTFT per runner and prompt family, with the prompt tokens reused from the cache."""
+    prefix_results = [r for r in results if r['prompt_type'] in ('prefix-cold', 'prefix-warm')]
+    if not prefix_results:
+        return
+    width = 88
+    print("\n" + "=" * width)
+    print("        Prefix Cache Reuse")
+    print("=" * width)
+    print(f"{'Runner':<9} | {'Family':<6} | {'Cold TTFT p50':<13} | {'Warm TTFT p50':<13} | {'Speedup':<7} | {'Cached tok (warm)':<17} | {'Cached tok (cold)':<17}")
+    print("-" * width)
+    cells = _group_by_cell(prefix_results, 'runner', 'prompt_idx', 'prompt_type')
+    for runner_name, family in sorted({(runner_name, family) for runner_name, family, _ in cells}):
+        row = {}
+        for cache_mode in ('cold', 'warm'):
+            cell = [r for r in cells.get((runner_name, family, f'prefix-{cache_mode}'), []) if r['ttft'] != -1.0]
+            cached = [r['cached_tokens'] for r in cell if r.get('cached_tokens') is not None]
+            row[cache_mode] = (
+                stats.percentile([r['ttft'] for r in cell], 50) if cell else None,
+                f"{stats.percentile(cached, 50):.0f}" if cached else "n/a"
+            )
+        cold_ttft, warm_ttft = row['cold'][0], row['warm'][0]
+        cold_str = f"{cold_ttft:.4f}" if cold_ttft is not None else "failed"
+        warm_str = f"{warm_ttft:.4f}" if warm_ttft is not None else "failed"
+        speedup_str = f"{cold_ttft / warm_ttft:.2f}x" if cold_ttft and warm_ttft else "-"
+        print(f"{runner_name.capitalize():<9} | {family + 1:<6} | {cold_str:<13} | {warm_str:<13} | {speedup_str:<7} | {row['warm'][1]:<17} | {row['cold'][1]:<17}")
+    print("=" * width)
+    print("(Cached tok = median prompt tokens served from the KV cache, as reported by llama-server's timings/usage; n/a if not reported)")
+
+def print_resource_report(results: list[dict]):
+    """
+    Prints the median CPU use, peak memory and resource efficiency (see resource_profiler.efficiency)
+    of every prompt type and runner whose successful results carry resource figures.
+    """
+    cells = {}
+    for r in results:
+        if r['ttft'] != -1.0 and 'cpu_util' in r:
+            cells.setdefault((r['prompt_type'], r['runner']), []).append(r)
+    if not cells:
+        return
+    width = 107
+    print("\n" + "=" * width)
+    print("        Resource Use (medians per run)")
+    print("=" * width)
+    print(f"{'Prompt Type':<12} | {'Runner':<20} | {'CPU (cores)':<11} | {'Peak RSS (MB)':<13} | {'Tok/s':<8} | {'Tok/s/core':<10} | {'Tok/s/GB':<8}")
+    print("-" * width)
+
+    def median(values):
+        values = [v for v in values if v is not None]
+        return f"{stats.percentile(values, 50):.2f}" if values else "n/a"
+
+    for (p_type, runner_name), cell in sorted(cells.items()):
+        prefix = "server_" if runner_name == 'llamacpp' else ""
+        efficiencies = [resource_profiler.efficiency(r, server_side=bool(prefix)) for r in cell]
+        cores = median([r.get(f"{prefix}cpu_util") for r in cell])
+        peak_rss = median([r.get(f"{prefix}peak_rss_mb") for r in cell])
+        tokens_per_sec = median([r['tokens_per_sec'] for r in cell if isinstance(r.get('tokens_per_sec'), (int, float))])
+        print(f"{p_type.capitalize():<12} | {runner_name.capitalize():<20} | {cores:<11} | {peak_rss:<13} | {tokens_per_sec:<8} | "
+              f"{median([e['tokens_per_sec_per_core'] for e in efficiencies]):<10} | {median([e['tokens_per_sec_per_gb'] for e in efficiencies]):<8}")
+    print("=" * width)
+    print("(llama.cpp rows show the llama-server process's CPU and memory, available when LLAMACPP_SERVER_PID is set)")
 
 def save_results_to_csv(results: list[dict], filename_prefix: str = "benchmark_results"):
     """Saves the detailed benchmark results to a timestamped CSV file."""
@@ -191,8 +1002,12 @@ def save_results_to_csv(results: list[dict], filename_prefix: str = "benchmark_r
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{filename_prefix}_{timestamp}.csv"
     
-    # Assuming all dictionaries in results have the same keys
-    headers = results[0].keys()
+    # Runners may report different metrics, so use the union of keys in first-seen order
+    headers = []
+    for r in results:
+        for key in r:
+            if key not in headers:
+                headers.append(key)
     
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -0,0 +1,86 @@
+import sys
+import os
+import argparse
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from src import regression
+
+def _fmt_change(comparison: dict, key: str) -> str:
+    return f"{comparison[key]:+.1%}" if key in comparison else "n/a"
+
+def print_comparison_report(comparisons: list[dict]):
+    """Prints one row per aligned cell with the relative change of each gated metric and its verdict."""
+    width = 124
+    print("\n" + "=" * width)
+    print("        Regression Check (current vs baseline)")
+    print("=" * width)
+    print(f"{'Workload':<14} | {'Runner':<20} | {'Model':<24} | {'Runs':<9} | {'TTFT p50':<8} | {'p-value':<7} | {'TTFT p99':<8} | {'Tok/s':<7} | {'Status':<10}")
+    print("-" * width)
+    for c in comparisons:
+        workload = f"{c['cell']}/{c['workload']}" if c['cell'] else c['workload']
+        runs = f"{c['n_base']}/{c['n_current']}" if 'n_base' in c else "-"
+        p_value = f"{c['ttft_p_value']:.3f}" if 'ttft_p_value' in c else "n/a"
+        print(f"{workload[:14]:<14} | {c['runner'][:20]:<20} | {(c['model'] or '-')[-24:]:<24} | {runs:<9} | {_fmt_change(c, 'ttft_p50_change'):<8} | "
+              f"{p_value:<7} | {_fmt_change(c, 'ttft_p99_change'):<8} | {_fmt_change(c, 'throughput_change'):<7} | {c['status']:<10}")
+        if c.get('regressions'):
+            print(f"{'':<14}   -> regressed: {', '.join(c['regressions'])}")
+    print("=" * width)
+    print("(Changes are current relative to baseline; positive TTFT and negative Tok/s changes are slower. Runs = successful baseline/current runs)")
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare a benchmark run against a stored baseline result set and fail on significant regressions.")
+    parser.add_argument("baseline", help="baseline results: a .jsonl results file, a saved .csv or an experiment output directory")
+    parser.add_argument("current", help="results to check, in any of the same forms")
+    parser.add_argument("--ttft-p50", type=float, default=config.REGRESSION_TTFT_P50_THRESHOLD,
+                        help="allowed relative increase of median TTFT (default: %(default)s)")
+    parser.add_argument("--ttft-p99", type=float, default=config.REGRESSION_TTFT_P99_THRESHOLD,
+                        help="allowed relative increase of p99 TTFT (default: %(default)s)")
+    parser.add_argument("--throughput", type=float, default=config.REGRESSION_THROUGHPUT_THRESHOLD,
+                        help="allowed relative drop of median tokens/sec (default: %(default)s)")
+    parser.add_argument("--alpha", type=float, default=config.REGRESSION_ALPHA,
+                        help="significance level of the tests (default: %(default)s)")
+    parser.add_argument("--ignore-model", action="store_true",
+                        help="align runs of different models, e.g. to check a new GGUF quant against the old one")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="pass even if cells of the baseline are missing from the current results (e.g. a deliberately smaller run)")
+    args = parser.parse_args(argv)
+
+    try:
+        base_rows = regression.load_result_set(args.baseline)
+        current_rows = regression.load_result_set(args.current)
+    except (OSError, KeyError) as e:
+        print(f"Error loading result sets: {e}")
+        return 2
+
+    comparisons = regression.compare_result_sets(
+        base_rows,
+        current_rows,
+        ttft_p50_threshold=args.ttft_p50,
+        ttft_p99_threshold=args.ttft_p99,
+        throughput_threshold=args.throughput,
+        alpha=args.alpha,
+        ignore_model=args.ignore_model
+    )
+    print_comparison_report(comparisons)
+
+    compared = [c for c in comparisons if c['status'] in ("ok", "regression")]
+    regressed = [c for c in comparisons if c['status'] == "regression"]
+    # A cell that vanished (e.g. a runner whose phase crashed) fails the gate unless explicitly allowed
+    missing = [] if args.allow_missing else [c for c in comparisons if c['status'] == "missing"]
+    if not compared:
+        print("No cells in common between the two result sets (different models? try --ignore-model).")
+        return 2
+    if regressed or missing:
+        print(f"FAIL: {len(regressed)} of {len(compared)} cell(s) regressed, {len(missing)} baseline cell(s) missing from the current results.")
+        return 1
+    print(f"PASS: no significant regressions in {len(compared)} cell(s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
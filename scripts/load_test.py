@@ -0,0 +1,115 @@
+import sys
+import os
+import csv
+import glob
+from datetime import datetime
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from src import load_generator
+from src import experiment
+from src.workloads import load_prompts
+
+def print_load_report(summaries: list[dict]):
+    """Prints one row per load level with throughput, latency percentiles and error rate."""
+    width = 118
+    print("\n" + "=" * width)
+    print("        Load Test Report")
+    print("=" * width)
+    print(f"{'Level':<12} | {'Req/s':<7} | {'Tok/s':<8} | {'TTFT p50':<8} | {'TTFT p90':<8} | {'TTFT p99':<8} | {'E2E p50':<8} | {'E2E p99':<8} | {'Queue p50':<9} | {'Prefill p50':<11} | {'Errors':<6}")
+    print("-" * width)
+    for s in summaries:
+        level = f"c={s['concurrency']}" if s['mode'] == "closed" else f"qps={s['qps']}"
+        print(f"{level:<12} | {s['throughput_rps']:<7.2f} | {s['throughput_tps']:<8.1f} | {s['ttft_p50']:<8.4f} | {s['ttft_p90']:<8.4f} | {s['ttft_p99']:<8.4f} | {s['e2e_p50']:<8.4f} | {s['e2e_p99']:<8.4f} | {s['network_queue_p50']:<9.4f} | {s['server_prefill_p50']:<11.4f} | {s['error_rate']:<6.1%}")
+    print("=" * width)
+    print("(Latencies in seconds, over successful requests; open-loop latencies include client-side queueing)")
+    print("(Queue = TTFT not spent in client queueing, server prefill or first decode; Prefill from llama-server timings)")
+
+def save_load_report_to_csv(summaries: list[dict], filename_prefix: str = "load_test_results"):
+    """Saves the per-level load test summaries to a timestamped CSV file."""
+    if not summaries:
+        print("No results to save to CSV.")
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{filename_prefix}_{timestamp}.csv"
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=summaries[0].keys())
+            writer.writeheader()
+            writer.writerows(summaries)
+        print(f"\nLoad test results saved to: {os.path.join(os.getcwd(), filename)}")
+    except IOError as e:
+        print(f"Error saving results to CSV: {e}")
+
+def run_load_test(settings: dict = None, tags: dict = None, csv_prefix: str = "load_test_results") -> list[dict]:
+    """
+    Runs the load test sweep with `settings` ({config constant: value}) applied on top of src/config.py,
+    prints the report and saves the CSV. `tags` are added as columns to every level's summary.
+    """
+    with experiment.apply_settings(settings or {}):
+        return _run_load_test(tags, csv_prefix)
+
+def _run_load_test(tags: dict, csv_prefix: str) -> list[dict]:
+    print("Starting llama.cpp Load Test...")
+    print(f"Llama.cpp API URL: {config.LLAMACPP_API_BASE_URL}")
+    print(f"Mode: {config.LOAD_TEST_MODE}")
+    print("-" * 30)
+
+    prompt_files = {"short": config.SHORT_PROMPTS_FILE, "long": config.LONG_PROMPTS_FILE}
+    prompts = [prompt for prompt_type, filepath in prompt_files.items() if prompt_type in config.TEXT_WORKLOADS for prompt in load_prompts(filepath)]
+    if not prompts:
+        print("No prompts found. Aborting load test.")
+        return []
+
+    if config.LOAD_TEST_MODE == "open":
+        summaries = load_generator.run_qps_sweep(
+            config.LLAMACPP_API_BASE_URL,
+            prompts,
+            config.LOAD_TEST_QPS_LEVELS,
+            config.LOAD_TEST_REQUESTS_PER_LEVEL,
+            model_alias=config.LLAMACPP_MODEL_ALIAS,
+            n_predict=config.MAX_NEW_TOKENS_FOR_TTFT,
+            max_in_flight=config.LOAD_TEST_MAX_IN_FLIGHT,
+            monitor_interval=config.SERVER_MONITOR_INTERVAL,
+            timeout=config.LLAMACPP_REQUEST_TIMEOUT
+        )
+    else:
+        summaries = load_generator.run_concurrency_sweep(
+            config.LLAMACPP_API_BASE_URL,
+            prompts,
+            config.LOAD_TEST_CONCURRENCY_LEVELS,
+            config.LOAD_TEST_REQUESTS_PER_LEVEL,
+            model_alias=config.LLAMACPP_MODEL_ALIAS,
+            n_predict=config.MAX_NEW_TOKENS_FOR_TTFT,
+            monitor_interval=config.SERVER_MONITOR_INTERVAL,
+            timeout=config.LLAMACPP_REQUEST_TIMEOUT
+        )
+
+    for summary in summaries:
+        summary.update(tags or {})
+    print_load_report(summaries)
+    save_load_report_to_csv(summaries, csv_prefix)
+    return summaries
+
+def _run_experiment_cell(settings: dict, cell_id: str, path_stem: str, resume: bool) -> list[dict]:
+    """Runs one experiment cell, saving its per-level summaries (tagged by cell) next to path_stem."""
+    if resume and glob.glob(f"{glob.escape(path_stem)}_*.csv"):
+        print(f"Skipping cell {cell_id}: already completed")
+        return []
+    return run_load_test(settings, tags={'cell': cell_id}, csv_prefix=path_stem)
+
+def main(argv: list[str] = None):
+    return experiment.cli(
+        "Load test a llama.cpp server at increasing concurrency or request rate. Settings default to src/config.py.",
+        run_load_test,
+        _run_experiment_cell,
+        argv
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import sys
+import os
+import time
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import config
+from src import mock_server
+
+def main():
+    profile = mock_server.LatencyProfile(
+        prefill_per_token=config.MOCK_PREFILL_PER_TOKEN,
+        decode_per_token=config.MOCK_DECODE_PER_TOKEN,
+        batch_slowdown=config.MOCK_BATCH_SLOWDOWN,
+        n_slots=config.MOCK_N_SLOTS,
+        max_queue=config.MOCK_MAX_QUEUE,
+        image_tokens=config.MOCK_IMAGE_TOKENS
+    )
+    server, base_url = mock_server.start_mock_server(profile, host="0.0.0.0", port=config.MOCK_SERVER_PORT)
+    print(f"Mock llama.cpp server listening on port {config.MOCK_SERVER_PORT}")
+    print(f"Profile: {profile}")
+    print(f"Point LLAMACPP_API_BASE_URL at http://localhost:{config.MOCK_SERVER_PORT} to benchmark against it. Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
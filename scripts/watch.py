@@ -0,0 +1,60 @@
+import sys
+import os
+import argparse
+import glob
+import time
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import aggregator
+from src import live_view
+from src import results_store
+
+_CLEAR_SCREEN = "\033[2J\033[H"
+
+def _results_files(path: str) -> list[str]:
+    """The results file itself, or every .jsonl in an experiment output directory (new cells appear as they start)."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.jsonl")))
+    return [path] if os.path.exists(path) else []
+
+def poll(path: str, results: aggregator.ResultAggregator, offsets: dict) -> int:
+    """Adds the result records written since the last poll to `results`; returns how many were added."""
+    added = 0
+    for results_file in _results_files(path):
+        records, offsets[results_file] = results_store.read_new_records(results_file, offsets.get(results_file, 0))
+        for record in records:
+            if record.get('kind') == 'result':
+                # Experiment cells share prompt types and runners; keep them apart
+                row = dict(record, prompt_type=f"{record['cell']}/{record['prompt_type']}") if record.get('cell') else record
+                results.add(row)
+                added += 1
+    return added
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Live dashboard of a running benchmark: follows its results file and aggregates each result as it is written.")
+    parser.add_argument("path", help="results file (.jsonl) of scripts/benchmark.py, or an experiment output directory")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between refreshes (default: %(default)s)")
+    parser.add_argument("--once", action="store_true", help="print the dashboard once and exit")
+    args = parser.parse_args(argv)
+
+    results = aggregator.ResultAggregator()
+    offsets = {}
+    try:
+        while True:
+            poll(args.path, results, offsets)
+            dashboard = live_view.render_dashboard(results, title=args.path)
+            if args.once:
+                print(dashboard)
+                return 0
+            print(_CLEAR_SCREEN + dashboard + "\n(Ctrl-C to exit; stopping the benchmark with Ctrl-C keeps its results for a resumed run)", flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
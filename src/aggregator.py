@@ -0,0 +1,157 @@
+import math
+import time
+
+class RunningStats:
+    """Online count, mean, sample variance, min and max (Welford's algorithm) in constant memory."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1 denominator, as stats.stddev), 0.0 for fewer than two values."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram in the style of HDR histograms / DDSketch: bucket i holds values in
+    (gamma^(i-1), gamma^i] with gamma = (1 + relative_error) / (1 - relative_error), so every
+    percentile is reported within `relative_error` of a recorded value. Memory grows with the
+    range of values (a few hundred buckets per six decades at 1%), not with their number.
+    """
+
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self._gamma = (1.0 + relative_error) / (1.0 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = {}
+        self._zero_count = 0 # Values <= 0 (e.g. a mock server answering instantly)
+        self.n = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.n += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= 0:
+            self._zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def _value_at(self, rank: int) -> float:
+        """Estimate of the rank-th smallest value (exact for the smallest and largest)."""
+        if rank <= 0:
+            return self.min
+        if rank >= self.n - 1:
+            return self.max
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                estimate = 2.0 * self._gamma ** index / (self._gamma + 1.0)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def percentile(self, q: float) -> float:
+        """The q-th percentile (0-100), interpolated between closest ranks as stats.percentile; 0.0 when empty."""
+        if not self.n:
+            return 0.0
+        rank = (self.n - 1) * q / 100.0
+        lower = int(rank)
+        low, high = self._value_at(lower), self._value_at(lower + 1)
+        return low + (high - low) * (rank - lower)
+
+class CellAggregate:
+    """Streaming summary of one (prompt type, runner) cell, updated with each result row."""
+
+    def __init__(self, relative_error: float = 0.01):
+        self.n_total = 0
+        self.ttft = RunningStats()
+        self.ttft_histogram = LatencyHistogram(relative_error)
+        self.tokens_per_sec = RunningStats()
+        self.first_seen = None
+        self.last_seen = None
+
+    def add(self, row: dict, now: float):
+        self.n_total += 1
+        if self.first_seen is None:
+            self.first_seen = now
+        self.last_seen = now
+        ttft = row.get('ttft')
+        if ttft is not None and ttft != -1.0:
+            self.ttft.add(ttft)
+            self.ttft_histogram.add(ttft)
+        if row.get('tokens_per_sec'):
+            self.tokens_per_sec.add(row['tokens_per_sec'])
+
+    @property
+    def failure_rate(self) -> float:
+        return (self.n_total - self.ttft.n) / self.n_total if self.n_total else 0.0
+
+    def summary(self) -> dict:
+        """
+        n (successful runs), n_total, TTFT mean, stddev, min, max, p50, p90, p99, mean tokens_per_sec
+        (None if the runner does not report it) and results_per_sec since the cell's first result.
+        """
+        elapsed = (self.last_seen - self.first_seen) if self.first_seen is not None else 0.0
+        return {
+            "n": self.ttft.n,
+            "n_total": self.n_total,
+            "mean": self.ttft.mean,
+            "stddev": self.ttft.stddev,
+            "min": self.ttft.min or 0.0,
+            "max": self.ttft.max or 0.0,
+            "p50": self.ttft_histogram.percentile(50),
+            "p90": self.ttft_histogram.percentile(90),
+            "p99": self.ttft_histogram.percentile(99),
+            "tokens_per_sec": self.tokens_per_sec.mean if self.tokens_per_sec.n else None,
+            "results_per_sec": (self.n_total - 1) / elapsed if elapsed > 0 else 0.0,
+        }
+
+class ResultAggregator:
+    """
+    CellAggregates of every (prompt type, runner) pair seen so far, fed one result row at a time.
+    `current` is the key of the cell that received the latest result. Rows are timed by their
+    finished_at wall clock time where they carry one, otherwise by `clock` when they are added.
+    """
+
+    def __init__(self, relative_error: float = 0.01, clock=time.time):
+        self.relative_error = relative_error
+        self._clock = clock
+        self.cells = {}
+        self.current = None
+        self.n_results = 0
+        self.started = clock()
+
+    def add(self, row: dict) -> tuple:
+        """Adds one result row and returns its (prompt_type, runner) key."""
+        key = (row['prompt_type'], row['runner'])
+        if key not in self.cells:
+            self.cells[key] = CellAggregate(self.relative_error)
+        self.cells[key].add(row, row.get('finished_at') or self._clock())
+        self.current = key
+        self.n_results += 1
+        return key
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
@@ -1,15 +1,120 @@
+import copy
+import gc
 import time
+from collections import OrderedDict
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from PIL import Image
+from transformers import AutoTokenizer, AutoModelForCausalLM, AutoProcessor, AutoModelForImageTextToText
 
-def run_baseline_inference(model_name_or_path: str, prompt: str, max_new_tokens: int = 10) -> tuple[str, float]:
+from src.stats import percentile
+
+# Loaded (tokenizer, model) pairs keyed by (model_name_or_path, dtype, device, multimodal, quantization, compile).
+# For multimodal models the "tokenizer" is the model's processor.
+# Ordered from least to most recently used so eviction pops from the front.
+_MODEL_CACHE = OrderedDict()
+
+# Prefilled KV caches of shared prompt prefixes keyed by (id of the cached model, prefix), each a
+# (prefix input_ids, past_key_values) pair. Requests work on a copy. Entries leave together with
+# their model (see _evict_prefix_caches), so an id is never reused while it is a key here.
+_PREFIX_CACHE = {}
+
+# Supported values of get_model's `quantization` argument
+QUANTIZATION_MODES = (None, "dynamic-int8")
+
+def get_model(model_name_or_path: str, dtype: str = None, device: str = "cpu", max_cached_models: int = 1, multimodal: bool = False, quantization: str = None, compile: bool = False) -> tuple:
+    """
+    Returns a (tokenizer, model, load_time) tuple, loading the weights only on the first request
+    for a given (model, dtype, device, quantization, compile). Later calls reuse the resident model and
+    report a load_time of 0.0, so cold start can be reported separately from TTFT.
+    When more than `max_cached_models` are resident, the least recently used one is evicted.
+    With `multimodal=True` the model is loaded as an image-text-to-text model and the
+    processor is returned in place of the tokenizer.
+    `quantization="dynamic-int8"` applies torch dynamic quantization to the model's nn.Linear layers
+    (CPU only; models built from other layer types, such as GPT-2's Conv1D, are left as they are).
+    `compile=True` wraps the forward pass in torch.compile; compilation happens on the first calls,
+    so it is paid during warm-up rather than in load_time.
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+    key = (model_name_or_path, dtype, device, multimodal, quantization, compile)
+    if key in _MODEL_CACHE:
+        _MODEL_CACHE.move_to_end(key)
+        tokenizer, model = _MODEL_CACHE[key]
+        return tokenizer, model, 0.0
+
+    while _MODEL_CACHE and len(_MODEL_CACHE) >= max_cached_models:
+        evicted_key, (_, evicted_model) = _MODEL_CACHE.popitem(last=False)
+        _evict_prefix_caches(evicted_model)
+        print(f"Evicting baseline model from cache: {evicted_key[0]} ({evicted_key[1] or 'default'}, {evicted_key[2]})")
+
+    start_time = time.perf_counter()
+    model_kwargs = {}
+    if dtype:
+        model_kwargs["dtype"] = getattr(torch, dtype)
+    if multimodal:
+        tokenizer = AutoProcessor.from_pretrained(model_name_or_path)
+        model = AutoModelForImageTextToText.from_pretrained(model_name_or_path, **model_kwargs)
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+        model = AutoModelForCausalLM.from_pretrained(model_name_or_path, **model_kwargs)
+    model.to(device)
+    model.eval()
+    if quantization == "dynamic-int8":
+        if not any(isinstance(module, torch.nn.Linear) for module in model.modules()):
+            print(f"{model_name_or_path} has no nn.Linear layers; dynamic int8 quantization leaves it unchanged.")
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if compile:
+        model.forward = torch.compile(model.forward)
+    load_time = time.perf_counter() - start_time
+
+    _MODEL_CACHE[key] = (tokenizer, model)
+    return tokenizer, model, load_time
+
+def _tensor_bytes(value) -> int:
+    if isinstance(value, torch.Tensor):
+        return value.nelement() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        # Dynamically quantized layers store their weights as packed (weight, bias) tuples
+        return sum(_tensor_bytes(v) for v in value)
+    return 0
+
+def model_weights_mb(model) -> float:
+    """Size of a model's parameters and buffers in MB, counting quantized weights at their stored precision."""
+    return sum(_tensor_bytes(value) for value in model.state_dict().values()) / (1024 * 1024)
+
+def load_tokenizer(model_name_or_path: str):
+    """Loads only a model's tokenizer, e.g. to build prompts of an exact token length without loading weights."""
+    return AutoTokenizer.from_pretrained(model_name_or_path)
+
+def _evict_prefix_caches(model):
+    """Drops the prefix KV caches built with `model`, which would otherwise outlive it in memory."""
+    for key in [key for key in _PREFIX_CACHE if key[0] == id(model)]:
+        del _PREFIX_CACHE[key]
+
+def clear_model_cache() -> int:
+    """Drops every cached model and prefix KV cache and reclaims their memory. Returns the number of models dropped."""
+    n_models = len(_MODEL_CACHE)
+    _MODEL_CACHE.clear()
+    _PREFIX_CACHE.clear()
+    gc.collect()
+    return n_models
+
+def warmup_baseline(model_name_or_path: str, prompt: str, n_runs: int = 1, max_new_tokens: int = 10, model_options: dict = None):
+    """
+    Runs `n_runs` untimed generations so that one-off costs (allocator growth, kernel selection,
+    lazy initialisation, torch.compile) are paid before measurement. Results are discarded.
+    """
+    for _ in range(n_runs):
+        run_baseline_streaming_inference(model_name_or_path, prompt, max_new_tokens=max_new_tokens, model_options=model_options)
+
+def run_baseline_inference(model_name_or_path: str, prompt: str, max_new_tokens: int = 10, model_options: dict = None) -> tuple[str, float]:
     """
     Runs baseline inference using Hugging Face Transformers and measures Time To First Token (TTFT).
     Returns the generated text (or part of it) and TTFT in seconds.
+    `model_options` are passed on to get_model (dtype, quantization, compile, ...).
     """
     try:
-        tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
-        model = AutoModelForCausalLM.from_pretrained(model_name_or_path)
+        tokenizer, model, _ = get_model(model_name_or_path, **(model_options or {}))
 
         # Ensure model is on GPU if available, for fair comparison later
         # device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -20,7 +125,7 @@ def run_baseline_inference(model_name_or_path: str, prompt: str, max_new_tokens:
         start_time = time.perf_counter()
 
         # Generate a small number of tokens to approximate TTFT
-        # For more accurate TTFT, a streaming approach or custom generation loop might be needed
+        # For prefill/decode separation see run_baseline_streaming_inference
         outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, pad_token_id=tokenizer.eos_token_id)
 
         end_time = time.perf_counter()
@@ -35,6 +140,337 @@ def run_baseline_inference(model_name_or_path: str, prompt: str, max_new_tokens:
         print(f"Error during baseline inference: {e}")
         return "", -1.0 # Indicate error
 
+def _synchronize(device: torch.device):
+    """Waits for queued kernels on the device so that host-side timers are accurate."""
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+    elif device.type == "mps":
+        torch.mps.synchronize()
+
+def _measured_generate(model, model_inputs: dict, max_new_tokens: int, eos_token_id: int = None, streamer=None) -> dict:
+    """
+    Greedy generation loop that times the prefill forward pass separately from each decode step.
+    The prefill pass and the first sampled token make up TTFT; every later step reuses
+    past_key_values and is timed on its own to give inter-token latencies (ITL).
+    `streamer` follows the transformers streamer interface (put/end, e.g. TextIteratorStreamer with
+    skip_prompt=True): it first receives the prompt ids, then each new token. The time spent in its
+    calls is measured and taken out of TTFT and ITL.
+    Returns a dict with keys: token_ids, ttft, itl, decode_time, tokens_per_sec, n_tokens.
+    """
+    device = model.device
+    attention_mask = model_inputs.get("attention_mask")
+    token_ids = []
+    token_times = []
+    streamer_time = 0.0 # Spent in streamer calls so far; subtracted from every later timestamp
+
+    def stream(tokens):
+        nonlocal streamer_time
+        if streamer is None:
+            return
+        put_start = time.perf_counter()
+        streamer.put(tokens.cpu())
+        streamer_time += time.perf_counter() - put_start
+
+    with torch.inference_mode():
+        if streamer is not None:
+            streamer.put(model_inputs["input_ids"].cpu()) # Before timing starts
+        _synchronize(device)
+        start_time = time.perf_counter()
+        outputs = model(**model_inputs, use_cache=True)
+        next_token = outputs.logits[:, -1, :].argmax(dim=-1, keepdim=True)
+        _synchronize(device)
+        token_times.append(time.perf_counter() - streamer_time)
+        token_ids.append(next_token.item())
+        stream(next_token)
+
+        past_key_values = outputs.past_key_values
+        while len(token_ids) < max_new_tokens and token_ids[-1] != eos_token_id:
+            if attention_mask is not None:
+                attention_mask = torch.cat([attention_mask, attention_mask.new_ones((attention_mask.shape[0], 1))], dim=-1)
+            outputs = model(
+                input_ids=next_token,
+                attention_mask=attention_mask,
+                past_key_values=past_key_values,
+                use_cache=True,
+            )
+            next_token = outputs.logits[:, -1, :].argmax(dim=-1, keepdim=True)
+            _synchronize(device)
+            token_times.append(time.perf_counter() - streamer_time)
+            token_ids.append(next_token.item())
+            past_key_values = outputs.past_key_values
+            stream(next_token)
+
+    if streamer is not None:
+        streamer.end()
+
+    itl = [later - earlier for earlier, later in zip(token_times, token_times[1:])]
+    decode_time = token_times[-1] - token_times[0]
+    return {
+        "token_ids": token_ids,
+        "ttft": token_times[0] - start_time,
+        "itl": itl,
+        "decode_time": decode_time,
+        "tokens_per_sec": len(itl) / decode_time if decode_time > 0 else 0.0,
+        "n_tokens": len(token_ids),
+    }
+
+def run_baseline_streaming_inference(model_name_or_path: str, prompt: str, max_new_tokens: int = 10, streamer=None, model_options: dict = None) -> dict:
+    """
+    Runs baseline inference with a measured generation loop instead of timing a whole model.generate() call.
+    TTFT covers only the prefill forward pass and the first sampled token; decode steps are timed individually.
+    Returns a dict with keys: text, ttft, itl, decode_time, tokens_per_sec, n_tokens and load_time
+    (0.0 when the model was already cached). On failure, text is "" and ttft is -1.0.
+    `model_options` are passed on to get_model (dtype, quantization, compile, ...).
+    """
+    try:
+        tokenizer, model, load_time = get_model(model_name_or_path, **(model_options or {}))
+
+        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+
+        metrics = _measured_generate(
+            model,
+            dict(inputs),
+            max_new_tokens=max_new_tokens,
+            eos_token_id=tokenizer.eos_token_id,
+            streamer=streamer,
+        )
+        metrics["text"] = tokenizer.decode(metrics.pop("token_ids"), skip_special_tokens=True)
+        metrics["load_time"] = load_time
+        return metrics
+
+    except Exception as e:
+        print(f"Error during baseline inference: {e}")
+        return {"text": "", "ttft": -1.0, "itl": [], "decode_time": 0.0, "tokens_per_sec": 0.0, "n_tokens": 0, "load_time": 0.0}
+
+def run_baseline_vlm_inference(model_name_or_path: str, prompt: str, image_path: str, max_new_tokens: int = 10, streamer=None, model_options: dict = None) -> dict:
+    """
+    Runs image + text inference through the model's processor and an image-text-to-text model class.
+    Latency is split into phases:
+      preprocess_time - image decode plus processor work (resize, normalise, chat template, tokenisation)
+      prefill_time    - forward pass over image and text tokens (vision encoder + prefill) and first token
+      decode_time     - first token until last token, one timed step per token
+    ttft is preprocess_time + prefill_time. Other keys match run_baseline_streaming_inference.
+    On failure, text is "" and ttft is -1.0. `model_options` are passed on to get_model.
+    """
+    try:
+        processor, model, load_time = get_model(model_name_or_path, multimodal=True, **(model_options or {}))
+
+        preprocess_start = time.perf_counter()
+        image = Image.open(image_path).convert("RGB")
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "image", "image": image},
+                    {"type": "text", "text": prompt},
+                ],
+            }
+        ]
+        inputs = processor.apply_chat_template(
+            messages,
+            add_generation_prompt=True,
+            tokenize=True,
+            return_dict=True,
+            return_tensors="pt",
+        ).to(model.device)
+        preprocess_time = time.perf_counter() - preprocess_start
+
+        metrics = _measured_generate(
+            model,
+            dict(inputs),
+            max_new_tokens=max_new_tokens,
+            eos_token_id=processor.tokenizer.eos_token_id,
+            streamer=streamer,
+        )
+        metrics["text"] = processor.decode(metrics.pop("token_ids"), skip_special_tokens=True)
+        metrics["preprocess_time"] = preprocess_time
+        metrics["prefill_time"] = metrics["ttft"]
+        metrics["ttft"] += preprocess_time
+        metrics["load_time"] = load_time
+        return metrics
+
+    except Exception as e:
+        print(f"Error during baseline VLM inference: {e}")
+        return {"text": "", "ttft": -1.0, "itl": [], "decode_time": 0.0, "tokens_per_sec": 0.0, "n_tokens": 0,
+                "load_time": 0.0, "preprocess_time": 0.0, "prefill_time": -1.0}
+
+def _get_prefix_cache(tokenizer, model, prefix: str) -> tuple:
+    """
+    Returns (prefix input_ids, past_key_values, build_time) for `prefix`, running its prefill the
+    first time and reusing it afterwards (build_time 0.0), like llama-server keeping a slot's KV cache.
+    """
+    key = (id(model), prefix)
+    if key in _PREFIX_CACHE:
+        prefix_ids, past_key_values = _PREFIX_CACHE[key]
+        return prefix_ids, past_key_values, 0.0
+
+    start_time = time.perf_counter()
+    prefix_ids = tokenizer(prefix, return_tensors="pt").input_ids.to(model.device)
+    with torch.inference_mode():
+        past_key_values = model(input_ids=prefix_ids, use_cache=True).past_key_values
+    _synchronize(model.device)
+    build_time = time.perf_counter() - start_time
+    _PREFIX_CACHE[key] = (prefix_ids, past_key_values)
+    return prefix_ids, past_key_values, build_time
+
+def run_baseline_prefix_inference(model_name_or_path: str, prefix: str, suffix: str, max_new_tokens: int = 10, reuse_prefix: bool = True, streamer=None, model_options: dict = None) -> dict:
+    """
+    Runs the prompt `prefix + suffix`, the shape of requests sharing a long system prompt.
+    With `reuse_prefix=True`, the prefix's past_key_values are computed once (outside the timed
+    region) and every request only prefills its suffix on a copy of them, matching llama.cpp's
+    cache_prompt. With `reuse_prefix=False` the whole prompt is prefilled, as with a cold cache.
+    The token IDs are identical either way: the prefix is tokenized on its own and the suffix
+    without special tokens.
+    Returns the keys of run_baseline_streaming_inference plus cached_tokens (prefix tokens reused)
+    and prefix_build_time (0.0 unless this call built the prefix cache).
+    On failure, text is "" and ttft is -1.0. `model_options` are passed on to get_model.
+    """
+    try:
+        tokenizer, model, load_time = get_model(model_name_or_path, **(model_options or {}))
+
+        suffix_ids = tokenizer(suffix, add_special_tokens=False, return_tensors="pt").input_ids.to(model.device)
+        if reuse_prefix:
+            prefix_ids, past_key_values, prefix_build_time = _get_prefix_cache(tokenizer, model, prefix)
+            model_inputs = {
+                "input_ids": suffix_ids,
+                "attention_mask": torch.ones((1, prefix_ids.shape[1] + suffix_ids.shape[1]), dtype=torch.long, device=model.device),
+                # Decoding appends to the cache in place, so each request gets its own copy
+                "past_key_values": copy.deepcopy(past_key_values),
+            }
+            cached_tokens = prefix_ids.shape[1]
+        else:
+            prefix_ids = tokenizer(prefix, return_tensors="pt").input_ids.to(model.device)
+            input_ids = torch.cat([prefix_ids, suffix_ids], dim=-1)
+            model_inputs = {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+            prefix_build_time = 0.0
+            cached_tokens = 0
+
+        metrics = _measured_generate(
+            model,
+            model_inputs,
+            max_new_tokens=max_new_tokens,
+            eos_token_id=tokenizer.eos_token_id,
+            streamer=streamer,
+        )
+        metrics["text"] = tokenizer.decode(metrics.pop("token_ids"), skip_special_tokens=True)
+        metrics["load_time"] = load_time
+        metrics["cached_tokens"] = cached_tokens
+        metrics["prefix_build_time"] = prefix_build_time
+        return metrics
+
+    except Exception as e:
+        print(f"Error during baseline prefix inference: {e}")
+        return {"text": "", "ttft": -1.0, "itl": [], "decode_time": 0.0, "tokens_per_sec": 0.0, "n_tokens": 0,
+                "load_time": 0.0, "cached_tokens": 0, "prefix_build_time": 0.0}
+
+class _TokenTimer:
+    """Minimal generate() streamer that timestamps every put(); the first put is the prompt, the second the first new tokens."""
+
+    def __init__(self):
+        self.times = []
+
+    def put(self, value):
+        self.times.append(time.perf_counter())
+
+    def end(self):
+        pass
+
+def _length_batches(lengths: list[int], batch_size: int, bucket_by_length: bool) -> list[list[int]]:
+    """Splits request indices into batches, grouping similar lengths together when `bucket_by_length` so less padding is needed."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i]) if bucket_by_length else list(range(len(lengths)))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+def run_baseline_batched_inference(model_name_or_path: str, prompts: list[str], batch_size: int, max_new_tokens: int = 10, bucket_by_length: bool = True,
+                                   model_options: dict = None) -> dict:
+    """
+    Offline batched throughput run: all `prompts` are available at once and go through model.generate()
+    `batch_size` at a time (left padded; sorted into length buckets first when `bucket_by_length`).
+    Every request generates exactly `max_new_tokens` tokens, like llama.cpp with n_predict and no early
+    stop, so generated tokens/sec compare directly with the load generator's figures.
+    Returns a dict with: batch_size, n_requests, n_batches, total_time, generated_tokens, throughput_tps,
+    throughput_rps, padding_ratio (pad share of the input tokens), batch_ttft_p50 (prefill + first token
+    of a batch), latency_p50/p90/p99 (each request's own batch time) and completion_p50/p99 (time from
+    the start of the run, including waiting for earlier batches), plus load_time (0.0 unless the model
+    had to be loaded, which happens before the run's clock starts). `model_options` are passed on to
+    get_model. On failure n_errors is set and the throughput figures are 0.0.
+    """
+    summary = {"batch_size": batch_size, "n_requests": len(prompts), "n_errors": 0, "load_time": 0.0}
+    try:
+        tokenizer, model, load_time = get_model(model_name_or_path, **(model_options or {}))
+        summary["load_time"] = load_time
+        # Decoder-only models must be padded on the left so every row continues from its own last token
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        lengths = [len(tokenizer(prompt).input_ids) for prompt in prompts]
+        batches = _length_batches(lengths, batch_size, bucket_by_length)
+
+        latencies = []
+        completions = []
+        batch_ttfts = []
+        padded_tokens = 0
+        run_start = time.perf_counter()
+        for batch in batches:
+            inputs = tokenizer([prompts[i] for i in batch], return_tensors="pt", padding=True).to(model.device)
+            padded_tokens += inputs.input_ids.numel()
+            timer = _TokenTimer()
+            _synchronize(model.device)
+            batch_start = time.perf_counter()
+            with torch.inference_mode():
+                model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    min_new_tokens=max_new_tokens,
+                    do_sample=False,
+                    pad_token_id=tokenizer.pad_token_id,
+                    streamer=timer,
+                )
+            _synchronize(model.device)
+            batch_end = time.perf_counter()
+            if len(timer.times) > 1:
+                batch_ttfts.append(timer.times[1] - batch_start)
+            latencies.extend([batch_end - batch_start] * len(batch))
+            completions.extend([batch_end - run_start] * len(batch))
+        total_time = time.perf_counter() - run_start
+
+        generated_tokens = len(prompts) * max_new_tokens
+        summary.update({
+            "n_batches": len(batches),
+            "total_time": total_time,
+            "generated_tokens": generated_tokens,
+            "throughput_tps": generated_tokens / total_time if total_time > 0 else 0.0,
+            "throughput_rps": len(prompts) / total_time if total_time > 0 else 0.0,
+            "padding_ratio": 1.0 - sum(lengths) / padded_tokens if padded_tokens else 0.0,
+            "batch_ttft_p50": percentile(batch_ttfts, 50),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p90": percentile(latencies, 90),
+            "latency_p99": percentile(latencies, 99),
+            "completion_p50": percentile(completions, 50),
+            "completion_p99": percentile(completions, 99),
+        })
+        return summary
+
+    except Exception as e:
+        print(f"Error during batched baseline inference (batch size {batch_size}): {e}")
+        summary.update({"n_errors": len(prompts), "n_batches": 0, "total_time": 0.0, "generated_tokens": 0,
+                        "throughput_tps": 0.0, "throughput_rps": 0.0, "padding_ratio": 0.0, "batch_ttft_p50": 0.0,
+                        "latency_p50": 0.0, "latency_p90": 0.0, "latency_p99": 0.0, "completion_p50": 0.0, "completion_p99": 0.0})
+        return summary
+
+def run_baseline_batch_sweep(model_name_or_path: str, prompts: list[str], batch_sizes: list[int], max_new_tokens: int = 10, bucket_by_length: bool = True,
+                             model_options: dict = None) -> tuple[list[dict], float]:
+    """
+    Runs run_baseline_batched_inference once per batch size after one untimed warm-up batch.
+    Returns one summary per batch size and the cold start (model load time) paid by the warm-up batch.
+    """
+    warmup = run_baseline_batched_inference(model_name_or_path, prompts[:max(batch_sizes)], max(batch_sizes), max_new_tokens, bucket_by_length, model_options)
+    summaries = []
+    for batch_size in batch_sizes:
+        print(f"Baseline batched: batch_size={batch_size}, requests={len(prompts)}")
+        summaries.append(run_baseline_batched_inference(model_name_or_path, prompts, batch_size, max_new_tokens, bucket_by_length, model_options))
+    return summaries, warmup["load_time"]
+
 if __name__ == '__main__':
     # Example usage (optional, for direct testing of the module)
     # model_id = "gpt2" # Replace with a small model for testing, e.g., "gpt2"
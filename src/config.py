@@ -5,6 +5,34 @@
 # Example: "gpt2", "EleutherAI/pythia-70m-deduped"
 BASELINE_MODEL_NAME = "gpt2"
 
+# Use the measured generation loop, which times prefill and each decode step
+# separately, instead of timing a whole model.generate() call.
+BASELINE_USE_MEASURED_GENERATION = True
+
+# Number of baseline models kept resident at once. Each (model, dtype, device)
+# is loaded once per process; the least recently used one is evicted when
+# this limit is exceeded.
+BASELINE_MAX_CACHED_MODELS = 1
+
+# Untimed baseline generations run after loading the model and before the
+# first measured prompt. They are excluded from all statistics.
+BASELINE_WARMUP_RUNS = 1
+WARMUP_PROMPT = "Hello, how are you?"
+
+# Precision / quantization variants of the baseline model. Each entry is
+# benchmarked and reported as its own runner ("baseline-<name>") with its load
+# time and memory footprint. Options: "dtype" (torch dtype name),
+# "quantization" (None or "dynamic-int8", which quantizes nn.Linear layers),
+# "compile" (wrap forward in torch.compile) and "num_threads". Leave empty for
+# a single default "baseline" runner. Example:
+# BASELINE_VARIANTS = {
+#     "fp32": {"dtype": "float32"},
+#     "bf16": {"dtype": "bfloat16"},
+#     "int8": {"quantization": "dynamic-int8"},
+#     "fp32-compile": {"dtype": "float32", "compile": True, "num_threads": 4},
+# }
+BASELINE_VARIANTS = {}
+
 # --- Llama.cpp API Configuration ---
 # Base URL of your llama.cpp server API
 # Example: "http://localhost:8000"
@@ -15,12 +43,184 @@ LLAMACPP_API_BASE_URL = "http://localhost:8000"
 # Example: "mistral-7b-instruct-v0.1.Q4_K_M.gguf"
 LLAMACPP_MODEL_ALIAS = None # Or specify a model alias string
 
+# Use the streaming (SSE) client so TTFT is measured at the first token
+# instead of at the end of the whole response. Set to False to fall back to
+# the non-streaming request.
+LLAMACPP_USE_STREAMING = True
+
+# (connect, read) timeout in seconds of every llama.cpp inference request. The
+# read timeout is the longest wait for the next chunk of a response, so a
+# stalled server fails the request instead of hanging the benchmark.
+LLAMACPP_REQUEST_TIMEOUT = (10.0, 300.0)
+
+# Runners to benchmark: "baseline" (every baseline variant) and/or "llamacpp",
+# or a single variant such as "baseline-int8". None runs all of them.
+ENABLED_RUNNERS = None
+
 # --- Input Data Configuration ---
 # Paths to the prompt files
 SHORT_PROMPTS_FILE = "data/short_prompts.txt"
 LONG_PROMPTS_FILE = "data/long_prompts.txt"
+# Which of the prompt files above to run ("short" and/or "long")
+TEXT_WORKLOADS = ["short", "long"]
+
+# --- Multimodal (image + text) Configuration ---
+# Set to True to also run the image + text workload on both runners.
+# The llama.cpp server must be started with a multimodal projector,
+# e.g. `llama-server -hf ggml-org/gemma-3-4b-it-GGUF`.
+RUN_VLM_BENCHMARK = False
+# Hugging Face vision-language model used for the baseline image + text runs
+BASELINE_VLM_MODEL_NAME = "google/gemma-3-4b-it"
+# JSON Lines file, one {"image": <path>, "prompt": <text>} object per line
+VLM_PROMPTS_FILE = "data/vlm_prompts.jsonl"
+
+# Images are decoded, resized and base64-encoded once before the timed loop
+# and cached on disk by content hash. Set IMAGE_CACHE_DIR to None to encode
+# each image inside the timed request instead.
+IMAGE_CACHE_DIR = ".cache/images"
+# Longest image side in pixels after resizing; None sends the original image
+IMAGE_MAX_SIDE = None
+# Format used when re-encoding resized images ("PNG" or "JPEG")
+IMAGE_CACHE_FORMAT = "PNG"
+# Worker processes for image preprocessing (None = one per CPU)
+IMAGE_PREPROCESS_WORKERS = None
 
 # --- Benchmarking Parameters ---
 # Number of new tokens to request for TTFT measurement (should be small)
 # This value will be used for both baseline and llama.cpp runners.
 MAX_NEW_TOKENS_FOR_TTFT = 10
+
+# --- Prompt Length Sweep ---
+# Adds synthetic prompts of exact token counts, from LENGTH_SWEEP_MIN_TOKENS
+# doubling up to LENGTH_SWEEP_MAX_TOKENS, built with each runner's own tokenizer
+# (llama.cpp's through the server's /tokenize endpoint). Reports TTFT and prefill
+# tokens/sec against input length. Lengths beyond a model's context fail and
+# are shown as such.
+RUN_LENGTH_SWEEP = False
+LENGTH_SWEEP_MIN_TOKENS = 32
+LENGTH_SWEEP_MAX_TOKENS = 32768
+
+# --- Prefix Cache Reuse ---
+# Adds families of prompts sharing a long prefix (like a common system prompt)
+# with a different suffix per request. Each family is measured twice:
+#   "prefix-cold" - full prefill every time (llama.cpp cache_prompt disabled)
+#   "prefix-warm" - the prefix comes from the KV cache (llama.cpp cache_prompt,
+#                   reused past_key_values for the baseline)
+# Prefix and suffix lengths are in words of synthetic text.
+RUN_PREFIX_CACHE_BENCHMARK = False
+PREFIX_CACHE_FAMILIES = 2
+PREFIX_CACHE_PREFIX_WORDS = 768
+PREFIX_CACHE_SUFFIX_WORDS = 24
+
+# --- Repetition Parameters ---
+# Each (prompt, runner) cell is run WARMUP_RUNS times unmeasured, then
+# between MIN_REPETITIONS and MAX_REPETITIONS times measured. Once the minimum
+# is reached, repetition stops early when the bootstrap 95% CI of the mean TTFT
+# is narrower than TARGET_REL_CI_WIDTH (as a fraction of the mean).
+# Set TARGET_REL_CI_WIDTH to None to always run MAX_REPETITIONS.
+WARMUP_RUNS = 1
+MIN_REPETITIONS = 3
+MAX_REPETITIONS = 10
+TARGET_REL_CI_WIDTH = 0.05
+
+# --- Runner Isolation ---
+# How runner phases (one runner over the whole workload) are executed:
+#   "none"       - in the benchmark process, one after the other
+#   "sequential" - each in its own fresh worker process, one after the other,
+#                  so the baseline model is never resident while llama.cpp runs
+#   "concurrent" - all at the same time in separate worker processes; give
+#                  them disjoint RUNNER_CPUS so they don't compete for cores
+ISOLATION_MODE = "none"
+# CPU cores each runner's worker is pinned to (None = unrestricted),
+# e.g. {"baseline": [0, 1, 2, 3], "llamacpp": [4]}
+RUNNER_CPUS = {"baseline": None, "llamacpp": None}
+# Intra-op thread count for each runner's worker (torch / OpenMP / BLAS; None = library default)
+RUNNER_NUM_THREADS = {"baseline": None, "llamacpp": None}
+# Optionally pin a locally running llama-server process to its own cores.
+# Its thread count is set when launching it (llama-server -t/--threads).
+LLAMACPP_SERVER_PID = None
+LLAMACPP_SERVER_CPUS = None
+
+# --- Harness Overhead Calibration ---
+# Before the benchmark, time the streaming client against a built-in mock
+# llama.cpp server that answers instantly. The measured TTFT/ITL is pure
+# harness + HTTP + SSE-parsing overhead and is shown next to the results.
+HARNESS_OVERHEAD_CALIBRATION = True
+HARNESS_OVERHEAD_REQUESTS = 50
+
+# --- Baseline Batched Throughput (scripts/batch_test.py) ---
+# The transformers baseline runs LOAD_TEST_REQUESTS_PER_LEVEL requests through
+# model.generate() at each batch size, for a like-for-like throughput comparison
+# with the llama.cpp load test. Bucketing sorts requests by length before
+# batching so less padding is computed.
+BASELINE_BATCH_SIZES = [1, 2, 4, 8, 16]
+BASELINE_BATCH_BUCKET_BY_LENGTH = True
+
+# --- Server Monitoring ---
+# Poll the llama.cpp server's /metrics (needs llama-server --metrics) and /slots
+# endpoints every SERVER_MONITOR_INTERVAL seconds during benchmark and load test
+# runs, for server-side throughput, queue depth and KV cache usage. None disables.
+SERVER_MONITOR_INTERVAL = 1.0
+
+# --- Resource Profiling ---
+# Sample this process's (and a local llama-server's, see LLAMACPP_SERVER_PID)
+# CPU use and resident memory during every timed run, every
+# RESOURCE_PROFILE_INTERVAL seconds. The figures are stored in each result row
+# and summarised as tokens/sec per core and per GB. None disables.
+RESOURCE_PROFILE_INTERVAL = 0.05
+
+# --- Regression Gate (scripts/compare.py) ---
+# A run fails the comparison against a baseline result set when, for some
+# (workload, runner, model), median TTFT rises by more than
+# REGRESSION_TTFT_P50_THRESHOLD, p99 TTFT by more than
+# REGRESSION_TTFT_P99_THRESHOLD or median tokens/sec drops by more than
+# REGRESSION_THROUGHPUT_THRESHOLD (relative), and the change is significant
+# at REGRESSION_ALPHA.
+REGRESSION_TTFT_P50_THRESHOLD = 0.05
+REGRESSION_TTFT_P99_THRESHOLD = 0.10
+REGRESSION_THROUGHPUT_THRESHOLD = 0.05
+REGRESSION_ALPHA = 0.05
+
+# --- Mock llama.cpp Server (scripts/mock_server.py) ---
+# A stand-in server for developing and testing the harness without a model.
+# Prompt tokens are counted as whitespace-separated words; each image counts
+# as MOCK_IMAGE_TOKENS tokens.
+MOCK_SERVER_PORT = 8090
+MOCK_PREFILL_PER_TOKEN = 0.0005 # seconds per prompt token
+MOCK_DECODE_PER_TOKEN = 0.02 # seconds per generated token with one active slot
+MOCK_BATCH_SLOWDOWN = 0.1 # extra decode cost per additional active slot
+MOCK_N_SLOTS = 1 # parallel slots (llama-server --parallel); other requests queue
+MOCK_MAX_QUEUE = None # queued requests beyond this get HTTP 503 (None = unbounded)
+MOCK_IMAGE_TOKENS = 256
+
+# --- Results Storage ---
+# Every measured repetition is appended to a JSON Lines file as soon as it
+# completes. None writes to a new timestamped benchmark_results_*.jsonl file.
+RESULTS_FILE = None
+# Path of an interrupted run's results file to continue. Finished
+# (prompt, runner) cells are skipped and partial ones pick up where they stopped.
+RESUME_RESULTS_FILE = None
+
+# --- Live Progress and Early Abort ---
+# Every result is fed into streaming aggregators (online mean/variance and a
+# log-bucketed percentile histogram) as it is recorded. A progress line for the
+# current (prompt type, runner) cell is printed at most every
+# LIVE_PROGRESS_INTERVAL seconds (None disables); scripts/watch.py shows a full
+# dashboard of a running benchmark from another terminal.
+LIVE_PROGRESS_INTERVAL = 10.0
+# Stop the run (or the current experiment cell) once a cell with at least
+# ABORT_MIN_RESULTS runs has a failure rate above ABORT_FAILURE_RATE (0-1) or a
+# TTFT p99 above ABORT_TTFT_P99 seconds. None disables a rule.
+ABORT_FAILURE_RATE = None
+ABORT_TTFT_P99 = None
+ABORT_MIN_RESULTS = 10
+
+# --- Load Test Parameters (scripts/load_test.py) ---
+# "closed": a fixed number of concurrent users, each sending its next request
+# as soon as the previous one finishes. "open": Poisson arrivals at a target QPS.
+LOAD_TEST_MODE = "closed"
+LOAD_TEST_CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+LOAD_TEST_QPS_LEVELS = [0.5, 1.0, 2.0, 4.0, 8.0]
+LOAD_TEST_REQUESTS_PER_LEVEL = 32
+# Upper bound on requests in flight in open-loop mode
+LOAD_TEST_MAX_IN_FLIGHT = 64
@@ -0,0 +1,257 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import tomllib
+from contextlib import contextmanager
+from datetime import datetime
+
+from src import config
+
+try:
+    import yaml
+except ImportError: # PyYAML is optional; TOML specs need nothing beyond the standard library
+    yaml = None
+
+# Short spec keys for the settings an experiment usually varies; any other key names a
+# src/config.py constant directly (case-insensitive)
+ALIASES = {
+    "runners": "ENABLED_RUNNERS",
+    "model": "BASELINE_MODEL_NAME",
+    "vlm_model": "BASELINE_VLM_MODEL_NAME",
+    "variants": "BASELINE_VARIANTS",
+    "endpoint": "LLAMACPP_API_BASE_URL",
+    "model_alias": "LLAMACPP_MODEL_ALIAS",
+    "workloads": "TEXT_WORKLOADS",
+    "max_new_tokens": "MAX_NEW_TOKENS_FOR_TTFT",
+    "concurrency": "LOAD_TEST_CONCURRENCY_LEVELS",
+    "qps": "LOAD_TEST_QPS_LEVELS",
+    "warmup_runs": "WARMUP_RUNS",
+    "min_repetitions": "MIN_REPETITIONS",
+    "max_repetitions": "MAX_REPETITIONS",
+}
+
+# List settings whose default (None) does not show their type; see coerce_setting
+LIST_SETTINGS = ("ENABLED_RUNNERS",)
+
+# Settings that decide which baseline model is loaded; cells are ordered by these first
+MODEL_SETTINGS = ("BASELINE_MODEL_NAME", "BASELINE_VARIANTS", "BASELINE_VLM_MODEL_NAME")
+
+def resolve_key(key: str) -> str:
+    """Maps a spec key (alias or config constant name, any case) to its config constant name."""
+    name = ALIASES.get(key.lower(), key.upper())
+    if not name.isupper() or not hasattr(config, name):
+        raise ValueError(f"Unknown setting '{key}': not an alias ({', '.join(ALIASES)}) or a src/config.py constant")
+    return name
+
+def coerce_setting(name: str, value):
+    """
+    Converts a spec or --set value to the type of the config constant it replaces: TOML and JSON
+    only have lists, so a list becomes a tuple for tuple settings (e.g. LLAMACPP_REQUEST_TIMEOUT),
+    and a single string becomes a one-element list for list settings (e.g. runners=llamacpp).
+    """
+    current = getattr(config, name)
+    if isinstance(current, tuple) and isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, str) and (isinstance(current, list) or name in LIST_SETTINGS):
+        return [value]
+    return value
+
+def parse_assignment(text: str) -> tuple[str, object]:
+    """Parses a KEY=VALUE command line override. VALUE is read as JSON where possible, else as a string."""
+    key, separator, raw_value = text.partition("=")
+    if not separator:
+        raise ValueError(f"Expected KEY=VALUE, got '{text}'")
+    try:
+        value = json.loads(raw_value)
+    except json.JSONDecodeError:
+        value = raw_value
+    return resolve_key(key.strip()), value
+
+def load_spec(path: str) -> dict:
+    """
+    Reads an experiment spec from a .toml or .yaml/.yml file:
+      name     - experiment name, used for the output directory
+      settings - {key: value} applied to every cell
+      matrix   - {key: [values]}; every combination of values is one cell
+    Keys are aliases (see ALIASES) or src/config.py constant names.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".toml":
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f) # TOMLDecodeError is a ValueError
+    elif extension in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError("YAML experiment specs need PyYAML (pip install pyyaml); TOML works without it")
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                spec = yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in {path}: {e}") from e
+    else:
+        raise ValueError(f"Unsupported experiment spec format '{extension}', expected .toml, .yaml or .yml")
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path} must contain a mapping with name, settings and matrix")
+    unknown = set(spec) - {"name", "settings", "matrix"}
+    if unknown:
+        raise ValueError(f"Unknown experiment spec section(s): {', '.join(sorted(unknown))}")
+    return spec
+
+def _format_value(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+
+def expand_matrix(spec: dict) -> list[dict]:
+    """
+    Expands a spec into its cells, one per combination of matrix values, in spec order.
+    Each cell is {'cell_id': "key=value,...", 'settings': {CONFIG_NAME: value}} with the
+    spec-wide settings included; a spec without a matrix has a single "default" cell.
+    """
+    base = {resolve_key(key): value for key, value in (spec.get("settings") or {}).items()}
+    matrix = spec.get("matrix") or {}
+    for key, values in matrix.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Matrix entry '{key}' must be a non-empty list of values")
+    names = [resolve_key(key) for key in matrix]
+
+    cells = []
+    for combination in itertools.product(*matrix.values()):
+        settings = dict(base)
+        settings.update(zip(names, combination))
+        cell_id = ",".join(f"{key}={_format_value(value)}" for key, value in zip(matrix, combination)) or "default"
+        cells.append({'cell_id': cell_id, 'settings': settings})
+    return cells
+
+def _model_identity(settings: dict) -> tuple:
+    return tuple(json.dumps(settings.get(name, getattr(config, name)), sort_keys=True) for name in MODEL_SETTINGS)
+
+def _cell_setting(cell: dict, name: str):
+    return coerce_setting(name, cell['settings'][name]) if name in cell['settings'] else getattr(config, name)
+
+def _baseline_runner_count(cell: dict) -> int:
+    """Baseline runners (one model each) a cell runs: every BASELINE_VARIANTS entry, or the plain baseline."""
+    enabled = _cell_setting(cell, "ENABLED_RUNNERS")
+    variants = _cell_setting(cell, "BASELINE_VARIANTS") or {}
+    if enabled is None or "baseline" in enabled:
+        return len(variants) or 1
+    return sum(1 for name in variants if f"baseline-{name}" in enabled)
+
+def _keeps_baseline_models(cell: dict) -> bool:
+    """
+    Whether the baseline models a cell loads are still resident when the next cell starts: only when
+    its phases run in the benchmark process (isolation mode "none"), no llama.cpp phase releases them
+    (see _setup_llamacpp in scripts/benchmark.py) and the model cache can hold all of them.
+    """
+    enabled = _cell_setting(cell, "ENABLED_RUNNERS")
+    return (_cell_setting(cell, "ISOLATION_MODE") == "none"
+            and enabled is not None and "llamacpp" not in enabled
+            and 0 < _baseline_runner_count(cell) <= _cell_setting(cell, "BASELINE_MAX_CACHED_MODELS"))
+
+def order_cells(cells: list[dict]) -> list[dict]:
+    """
+    Orders cells so those loading the same baseline model run back to back, which lets them reuse
+    the resident model where it survives between cells (see count_model_loads); the spec order is
+    kept otherwise.
+    """
+    first_seen = {}
+    for cell in cells:
+        first_seen.setdefault(_model_identity(cell['settings']), len(first_seen))
+    return sorted(cells, key=lambda cell: first_seen[_model_identity(cell['settings'])])
+
+def count_model_loads(cells: list[dict]) -> int:
+    """
+    Number of baseline models loaded when running `cells` in this order. A cell reuses the previous
+    cell's models only if it uses the same ones, both run under isolation mode "none" and the previous
+    cell kept them resident; otherwise (a fresh worker per phase under "sequential"/"concurrent"
+    isolation, or models released for a llama.cpp phase) each of its baseline runners loads its model.
+    """
+    loads = 0
+    for i, cell in enumerate(cells):
+        previous = cells[i - 1] if i else None
+        reused = (previous is not None and _keeps_baseline_models(previous)
+                  and _cell_setting(cell, "ISOLATION_MODE") == "none"
+                  and _model_identity(cell['settings']) == _model_identity(previous['settings']))
+        if not reused:
+            loads += _baseline_runner_count(cell)
+    return loads
+
+def cell_filename(index: int, cell_id: str) -> str:
+    """File name stem for a cell's outputs: its position in the run plus a filesystem-safe cell ID."""
+    slug = re.sub(r"[^A-Za-z0-9._=-]+", "_", cell_id).strip("_")[:80]
+    return f"{index:03d}_{slug}"
+
+@contextmanager
+def apply_settings(settings: dict):
+    """
+    Sets src/config.py constants (converted with coerce_setting) for the duration of the block and
+    restores them afterwards.
+    """
+    previous = {name: getattr(config, name) for name in settings}
+    try:
+        for name, value in settings.items():
+            setattr(config, name, coerce_setting(name, value))
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+def run_cells(cells: list[dict], output_dir: str, run_cell, resume: bool = False, overrides: dict = None) -> dict:
+    """
+    Runs `run_cell(settings, cell_id, path_stem, resume)` for every cell in order, where path_stem
+    is the cell's output path without extension inside `output_dir`. `overrides` are applied on top
+    of every cell's settings. A cells.json manifest maps each cell to its settings and outputs.
+    Stops at Ctrl-C; rerunning with resume=True continues from the interrupted cell.
+    Returns {cell_id: what run_cell returned}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stems = [cell_filename(index, cell['cell_id']) for index, cell in enumerate(cells)]
+    manifest = [{'cell_id': cell['cell_id'], 'settings': cell['settings'], 'outputs': stem} for cell, stem in zip(cells, stems)]
+    with open(os.path.join(output_dir, "cells.json"), 'w', encoding='utf-8') as f:
+        json.dump({'overrides': overrides or {}, 'cells': manifest}, f, indent=2)
+
+    outcomes = {}
+    try:
+        for index, (cell, stem) in enumerate(zip(cells, stems)):
+            print(f"\n##### Cell {index + 1}/{len(cells)}: {cell['cell_id']} #####")
+            settings = dict(cell['settings'])
+            settings.update(overrides or {})
+            outcomes[cell['cell_id']] = run_cell(settings, cell['cell_id'], os.path.join(output_dir, stem), resume)
+    except KeyboardInterrupt:
+        print(f"\nExperiment interrupted. Continue it with --output-dir {output_dir} --resume")
+    return outcomes
+
+def cli(description: str, run_single, run_cell, argv: list[str] = None):
+    """
+    Command line shared by the benchmark scripts. Without --spec, runs `run_single(overrides)` once
+    with the --set overrides applied. With --spec, expands the experiment matrix, orders its cells
+    to minimize model reloads and runs them through run_cells.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--spec", help="experiment spec (.toml, .yaml or .yml) whose matrix of cells is run in one invocation")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a setting (alias or src/config.py constant name) for this run; VALUE is JSON or a plain string")
+    parser.add_argument("--output-dir", help="directory for the per-cell outputs of a spec run (default: experiments/<name>_<timestamp>)")
+    parser.add_argument("--resume", action="store_true", help="continue the interrupted spec run in --output-dir")
+    parser.add_argument("--dry-run", action="store_true", help="list the cells of --spec in run order without running them")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = dict(parse_assignment(text) for text in args.overrides)
+        if not args.spec:
+            if args.output_dir or args.resume or args.dry_run:
+                parser.error("--output-dir, --resume and --dry-run need --spec")
+            return run_single(overrides)
+        spec = load_spec(args.spec)
+        cells = order_cells(expand_matrix(spec))
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    if args.resume and not args.output_dir:
+        parser.error("--resume needs the --output-dir of the run to continue")
+
+    print(f"Experiment '{spec.get('name', 'experiment')}': {len(cells)} cell(s), {count_model_loads(cells)} baseline model load(s)")
+    for index, cell in enumerate(cells):
+        print(f"  {index + 1:>3}. {cell['cell_id']}")
+    if args.dry_run:
+        return None
+    output_dir = args.output_dir or os.path.join("experiments", f"{spec.get('name', 'experiment')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    return run_cells(cells, output_dir, run_cell, resume=args.resume, overrides=overrides)
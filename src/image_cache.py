@@ -0,0 +1,96 @@
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# What decoding a truncated, corrupt or oversized image can raise (PIL.UnidentifiedImageError is an OSError)
+_IMAGE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+
+def _cache_key(image_bytes: bytes, max_side: int, image_format: str) -> str:
+    """Content hash of the source image plus the preprocessing parameters that change the output."""
+    digest = hashlib.sha256(image_bytes)
+    digest.update(f"|max_side={max_side}|format={image_format}".encode('ascii'))
+    return digest.hexdigest()
+
+def _encode_data_url(image_path: str, image_bytes: bytes, max_side: int, image_format: str) -> str:
+    """
+    Returns the image as a base64 data URL. Without `max_side` the original bytes are sent unchanged;
+    otherwise the image is decoded, shrunk so its longest side is at most `max_side`, and re-encoded.
+    """
+    if max_side is None:
+        mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
+        encoded_bytes = image_bytes
+    else:
+        image = Image.open(io.BytesIO(image_bytes))
+        image = image.convert("RGB") if image_format.upper() == "JPEG" else image
+        image.thumbnail((max_side, max_side))
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format)
+        mime_type = Image.MIME[image_format.upper()]
+        encoded_bytes = buffer.getvalue()
+    return f"data:{mime_type};base64,{base64.b64encode(encoded_bytes).decode('ascii')}"
+
+def _prepare_one(image_path: str, cache_dir: str, max_side: int, image_format: str) -> tuple[str, str, bool]:
+    """
+    Worker for prepare_images. Writes the encoded data URL to `<cache_dir>/<key>.b64` unless it is
+    already there. Returns (image_path, cache_file, was_cache_hit).
+    """
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+    cache_file = os.path.join(cache_dir, _cache_key(image_bytes, max_side, image_format) + ".b64")
+    if os.path.exists(cache_file):
+        return image_path, cache_file, True
+
+    data_url = _encode_data_url(image_path, image_bytes, max_side, image_format)
+    # Write to a temporary file first so a crash never leaves a truncated cache entry behind
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='ascii') as f:
+        f.write(data_url)
+    os.replace(tmp_file, cache_file)
+    return image_path, cache_file, False
+
+def _read_cached(cache_file: str) -> str:
+    """Reads a cache entry back as the data URL string (one plain read; the payload is needed as a str anyway)."""
+    with open(cache_file, 'r', encoding='ascii') as f:
+        return f.read()
+
+def prepare_images(image_paths: list[str], cache_dir: str, max_side: int = None, image_format: str = "PNG", workers: int = None) -> tuple[dict, dict]:
+    """
+    Decodes, resizes and base64-encodes every distinct image once, ahead of the timed loop.
+    Encoded images are kept in a content-hash keyed cache under `cache_dir`, so later runs only read them back.
+    Missing images and images PIL cannot decode are reported and left out of the result, so their
+    runs fall back to encoding the file themselves.
+    Returns ({image_path: data_url}, stats) where stats has n_images, cache_hits, cache_misses,
+    hit_rate and preprocess_time (seconds).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    unique_paths = list(dict.fromkeys(image_paths))
+    prepared = {}
+    cache_hits = 0
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_prepare_one, path, cache_dir, max_side, image_format) for path in unique_paths]
+        for future in futures:
+            try:
+                image_path, cache_file, was_hit = future.result()
+            except _IMAGE_ERRORS as e:
+                print(f"Error preparing image (cache miss, encoded at run time instead): {e}")
+                continue
+            prepared[image_path] = _read_cached(cache_file)
+            cache_hits += was_hit
+    preprocess_time = time.perf_counter() - start_time
+
+    stats = {
+        "n_images": len(prepared),
+        "cache_hits": cache_hits,
+        "cache_misses": len(prepared) - cache_hits,
+        "hit_rate": cache_hits / len(prepared) if prepared else 0.0,
+        "preprocess_time": preprocess_time,
+    }
+    return prepared, stats
@@ -0,0 +1,80 @@
+import time
+
+from src import aggregator
+
+class RunAborted(Exception):
+    """Raised by LiveMonitor when an abort rule trips, to stop the current benchmark run early."""
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def format_cell(key: tuple, summary: dict) -> str:
+    """One line with the progress, TTFT distribution and throughput of a (prompt_type, runner) cell."""
+    prompt_type, runner = key
+    tokens_per_sec = f"{summary['tokens_per_sec']:.1f}" if summary['tokens_per_sec'] is not None else "-"
+    return (f"{runner} / {prompt_type}: {summary['n']}/{summary['n_total']} ok | "
+            f"TTFT mean {summary['mean']:.4f}s sd {summary['stddev']:.4f} p50 {summary['p50']:.4f}s p99 {summary['p99']:.4f}s | "
+            f"{tokens_per_sec} tok/s | {summary['results_per_sec']:.2f} runs/s")
+
+def render_dashboard(results: aggregator.ResultAggregator, title: str = "") -> str:
+    """A table of every cell aggregated so far; the cell that received the latest result is marked with '>'."""
+    width = 118
+    lines = [
+        "=" * width,
+        f"        Live Benchmark Progress{' - ' + title if title else ''} ({results.n_results} results)",
+        "=" * width,
+        f"  {'Prompt Type':<12} | {'Runner':<20} | {'OK/Runs':<9} | {'Mean TTFT':<9} | {'Stddev':<7} | {'p50':<7} | {'p90':<7} | {'p99':<7} | {'Tok/s':<7} | {'Runs/s':<6}",
+        "-" * width,
+    ]
+    for key, cell in results.cells.items():
+        s = cell.summary()
+        marker = ">" if key == results.current else " "
+        tokens_per_sec = f"{s['tokens_per_sec']:.1f}" if s['tokens_per_sec'] is not None else "-"
+        lines.append(f"{marker} {key[0][:12]:<12} | {key[1][:20]:<20} | {str(s['n']) + '/' + str(s['n_total']):<9} | {s['mean']:<9.4f} | {s['stddev']:<7.4f} | "
+                     f"{s['p50']:<7.4f} | {s['p90']:<7.4f} | {s['p99']:<7.4f} | {tokens_per_sec:<7} | {s['results_per_sec']:<6.2f}")
+    lines.append("=" * width)
+    lines.append(f"(Percentiles are streaming estimates within {results.relative_error:.0%} of a measured value)")
+    return "\n".join(lines)
+
+class LiveMonitor:
+    """
+    Aggregates result rows as they are recorded (pass `add` as a ResultSink's on_result), prints the
+    current cell's progress line at most every `interval` seconds (None = never) and raises RunAborted
+    the first time a cell with at least `min_results` runs breaks an abort rule: a failure rate above
+    `max_failure_rate` or a TTFT p99 above `max_ttft_p99` seconds (None disables a rule).
+    """
+
+    def __init__(self, interval: float = None, max_failure_rate: float = None, max_ttft_p99: float = None, min_results: int = 10,
+                 clock=time.time):
+        self.aggregator = aggregator.ResultAggregator(clock=clock)
+        self.interval = interval
+        self.max_failure_rate = max_failure_rate
+        self.max_ttft_p99 = max_ttft_p99
+        self.min_results = min_results
+        self.abort_reason = None
+        self._clock = clock
+        self._last_print = None
+
+    def _check_abort(self, key: tuple) -> str:
+        cell = self.aggregator.cells[key]
+        if cell.n_total < self.min_results:
+            return None
+        if self.max_failure_rate is not None and cell.failure_rate > self.max_failure_rate:
+            return f"{key[1]} / {key[0]}: failure rate {cell.failure_rate:.0%} over {cell.n_total} runs exceeds {self.max_failure_rate:.0%}"
+        p99 = cell.ttft_histogram.percentile(99)
+        if self.max_ttft_p99 is not None and cell.ttft.n and p99 > self.max_ttft_p99:
+            return f"{key[1]} / {key[0]}: TTFT p99 {p99:.4f}s over {cell.n_total} runs exceeds {self.max_ttft_p99:.4f}s"
+        return None
+
+    def add(self, row: dict):
+        key = self.aggregator.add(row)
+        now = self._clock()
+        if self.interval and (self._last_print is None or now - self._last_print >= self.interval):
+            self._last_print = now
+            print(f"[live {_format_duration(self.aggregator.elapsed())}] {format_cell(key, self.aggregator.cells[key].summary())}")
+        # Only the first trip raises, so results still arriving while the run winds down are recorded
+        if self.abort_reason is None:
+            self.abort_reason = self._check_abort(key)
+            if self.abort_reason:
+                raise RunAborted(self.abort_reason)
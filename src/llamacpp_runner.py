@@ -1,12 +1,20 @@
 import time
+import base64
+import mimetypes
 import requests
 import json
 
-def run_llamacpp_inference(api_base_url: str, prompt: str, model_alias: str = None, n_predict: int = 10) -> tuple[str, float]:
+# (connect, read) timeout in seconds for inference requests; the read timeout bounds the wait for
+# each chunk of a streamed response, so a stalled server fails the request instead of hanging
+DEFAULT_TIMEOUT = (10.0, 300.0)
+
+def run_llamacpp_inference(api_base_url: str, prompt: str, model_alias: str = None, n_predict: int = 10, timeout: tuple = DEFAULT_TIMEOUT,
+                           cache_prompt: bool = None) -> tuple[str, float]:
     """
     Runs inference by calling a llama.cpp API service and measures Time To First Token (TTFT).
     Assumes an OpenAI-compatible completions endpoint.
     Returns the generated text (or part of it) and TTFT in seconds.
+    `cache_prompt` works as in run_llamacpp_streaming_inference.
     """
     # Ensure the base URL doesn't have a trailing slash, then append endpoint
     if api_base_url.endswith('/'):
@@ -20,19 +28,18 @@ def run_llamacpp_inference(api_base_url: str, prompt: str, model_alias: str = No
         "prompt": prompt,
         "n_predict": n_predict, # Max tokens to generate
         # "model": model_alias, # Include if your server uses this to select models
-        # "stream": True, # Set to True for more accurate TTFT if server supports SSE
+        # For streaming (SSE) requests see run_llamacpp_streaming_inference
     }
 
     # Remove None values from payload
     if model_alias:
         payload["model"] = model_alias
-    
-    # If not using streaming, this approach is simpler
-    # For streaming, you'd use response.iter_lines() or similar
+    if cache_prompt is not None:
+        payload["cache_prompt"] = cache_prompt
     
     try:
         start_time = time.perf_counter()
-        response = requests.post(endpoint, headers=headers, json=payload) # Add stream=True to payload and requests.post if using streaming
+        response = requests.post(endpoint, headers=headers, json=payload, timeout=timeout)
         response.raise_for_status() # Raise an exception for bad status codes
 
         # Assuming non-streaming for simplicity first:
@@ -47,22 +54,7 @@ def run_llamacpp_inference(api_base_url: str, prompt: str, model_alias: str = No
         # If using /v1/chat/completions, the structure might be:
         # generated_text = response_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
 
-        # If streaming were implemented and server sends SSE:
-        # first_token_text = ""
-        # for line in response.iter_lines():
-        #     if line:
-        #         decoded_line = line.decode('utf-8')
-        #         if decoded_line.startswith('data: '):
-        #             json_data = json.loads(decoded_line[len('data: '):])
-        #             if not first_token_text: # Capture TTFT on first actual data
-        #                 end_time = time.perf_counter() # TTFT measured here
-        #                 ttft = end_time - start_time 
-        #             # Extract token from json_data (depends on actual API response structure)
-        #             # e.g., token = json_data.get("choices", [{}])[0].get("text", "")
-        #             # first_token_text += token # Accumulate if needed or just grab first
-        #             # if some condition for first token is met: break
-        #             # This part needs actual API spec for streaming
-        # generated_text = first_token_text # Or however it's assembled
+        # For true TTFT and inter-token latencies, use run_llamacpp_streaming_inference below.
 
         return generated_text, ttft
 
@@ -73,6 +65,287 @@ def run_llamacpp_inference(api_base_url: str, prompt: str, model_alias: str = No
         print(f"Error processing llama.cpp response: {e}")
         return "", -1.0
 
+def _iter_sse_events(response):
+    """
+    Yields the decoded JSON payload of each server-sent event in a streaming response.
+    Stops at the OpenAI-style "[DONE]" sentinel; non-data lines (comments, blank keep-alives) are skipped.
+    """
+    for line in response.iter_lines():
+        if not line:
+            continue
+        decoded_line = line.decode('utf-8') if isinstance(line, bytes) else line
+        if not decoded_line.startswith('data:'):
+            continue
+        data = decoded_line[len('data:'):].strip()
+        if data == '[DONE]':
+            break
+        yield json.loads(data)
+
+def _extract_token_text(event: dict) -> str:
+    """
+    Extracts the generated text from a single streamed event.
+    Handles /v1/completions (choices[0].text), /v1/chat/completions (choices[0].delta.content)
+    and llama.cpp's native /completion format (content).
+    """
+    choices = event.get("choices")
+    if choices:
+        choice = choices[0]
+        if "delta" in choice:
+            return choice["delta"].get("content") or ""
+        return choice.get("text") or ""
+    return event.get("content") or ""
+
+# Fields of llama-server's `timings` block kept with every streaming result as server_<field>
+SERVER_TIMING_KEYS = ("prompt_n", "prompt_ms", "predicted_n", "predicted_ms")
+
+def _server_timings(timings: dict) -> dict:
+    """Flattens llama-server's timings block into server_* keys (None for fields it did not report)."""
+    return {f"server_{key}": (timings or {}).get(key) for key in SERVER_TIMING_KEYS}
+
+def _failed_streaming_result() -> dict:
+    return {
+        "text": "",
+        "ttft": -1.0,
+        "itl": [],
+        "decode_time": 0.0,
+        "tokens_per_sec": 0.0,
+        "n_tokens": 0,
+        "e2e_latency": -1.0,
+        "cached_tokens": None,
+        **_server_timings(None),
+    }
+
+def _cached_tokens(timings: dict, usage: dict):
+    """
+    Prompt tokens the server reused from its KV cache instead of recomputing, from llama.cpp's
+    timings block (cache_n) or the OpenAI usage block (prompt_tokens_details.cached_tokens).
+    Returns None if the server did not report it.
+    """
+    if timings and "cache_n" in timings:
+        return timings["cache_n"]
+    details = (usage or {}).get("prompt_tokens_details") or {}
+    return details.get("cached_tokens")
+
+def _stream_completion(endpoint: str, payload: dict, session: requests.Session = None, timeout: tuple = DEFAULT_TIMEOUT) -> dict:
+    """
+    Posts a streaming request and timestamps every non-empty token as it arrives.
+    Returns a dict with keys: text, ttft, itl (list of seconds), decode_time, tokens_per_sec,
+    n_tokens, e2e_latency, cached_tokens (prompt tokens served from the server's KV cache,
+    None if not reported) and the server_* timings (see SERVER_TIMING_KEYS).
+    On failure (including a `timeout`, see DEFAULT_TIMEOUT), text is "" and ttft is -1.0.
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+
+    try:
+        start_time = time.perf_counter()
+        token_times = []
+        pieces = []
+        timings = None
+        usage = None
+        # Closed on every exit so a failure mid-stream returns the connection to the session's pool
+        with (session or requests).post(endpoint, headers=headers, json=payload, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            for event in _iter_sse_events(response):
+                # llama-server attaches timings (and usage, for the OpenAI endpoints) to the final event
+                timings = event.get("timings", timings)
+                usage = event.get("usage", usage)
+                token_text = _extract_token_text(event)
+                if not token_text:
+                    continue
+                token_times.append(time.perf_counter())
+                pieces.append(token_text)
+            end_time = time.perf_counter()
+
+        if not token_times:
+            print("llama.cpp stream finished without producing any tokens.")
+            return _failed_streaming_result()
+
+        ttft = token_times[0] - start_time
+        itl = [later - earlier for earlier, later in zip(token_times, token_times[1:])]
+        decode_time = token_times[-1] - token_times[0]
+        tokens_per_sec = len(itl) / decode_time if decode_time > 0 else 0.0
+
+        return {
+            "text": "".join(pieces).strip(),
+            "ttft": ttft,
+            "itl": itl,
+            "decode_time": decode_time,
+            "tokens_per_sec": tokens_per_sec,
+            "n_tokens": len(token_times),
+            "e2e_latency": end_time - start_time,
+            "cached_tokens": _cached_tokens(timings, usage),
+            **_server_timings(timings),
+        }
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error during llama.cpp API request: {e}")
+        return _failed_streaming_result()
+    except Exception as e:
+        print(f"Error processing llama.cpp stream: {e}")
+        return _failed_streaming_result()
+
+def run_llamacpp_streaming_inference(api_base_url: str, prompt: str, model_alias: str = None, n_predict: int = 10, session: requests.Session = None, cache_prompt: bool = None,
+                                     timeout: tuple = DEFAULT_TIMEOUT) -> dict:
+    """
+    Runs inference by calling a llama.cpp API service with streaming (SSE) enabled.
+    TTFT is measured at the arrival of the first non-empty token rather than the full response,
+    and every following token is timestamped to produce inter-token latencies (ITL).
+    Returns a dict with keys: text, ttft, itl (list of seconds), decode_time, tokens_per_sec,
+    n_tokens, e2e_latency, cached_tokens and server_* timings. On failure, text is "" and ttft is -1.0.
+    Pass a `session` to reuse pooled connections across requests (e.g. under concurrent load).
+    `cache_prompt=False` stops llama-server from reusing the KV cache of a previous identical prompt,
+    so every repetition pays the full prefill; None leaves the server default.
+    `timeout` is the (connect, read) timeout in seconds.
+    """
+    if api_base_url.endswith('/'):
+        api_base_url = api_base_url[:-1]
+    endpoint = f"{api_base_url}/v1/completions"
+
+    payload = {
+        "prompt": prompt,
+        "n_predict": n_predict,
+        "max_tokens": n_predict, # OpenAI-compatible name for n_predict
+        "stream": True,
+    }
+    if model_alias:
+        payload["model"] = model_alias
+    if cache_prompt is not None:
+        payload["cache_prompt"] = cache_prompt
+
+    return _stream_completion(endpoint, payload, session=session, timeout=timeout)
+
+def latency_breakdown(metrics: dict, client_overhead: float = 0.0) -> dict:
+    """
+    Splits the TTFT of a streaming result into parts that add up to it (seconds):
+      client_overhead - the harness's own cost (e.g. mock_server.measure_harness_overhead's ttft_p50)
+                        plus any client-side queue_delay added by the load generator
+      server_prefill  - prompt processing as timed by the server (timings.prompt_ms), which on
+                        llama-server includes sampling the first token
+      network_queue   - the remainder: transfer time and waiting for a free server slot
+    The remainder is not clamped: a negative one means the client overhead and server prefill
+    exceed the measured TTFT (an overestimated overhead, or clocks that disagree), and
+    `negative_remainder` is set so reports can flag it.
+    Returns None for failed requests and when the server reported no timings.
+    """
+    if metrics["ttft"] == -1.0 or metrics.get("server_prompt_ms") is None:
+        return None
+    client_overhead += metrics.get("queue_delay", 0.0)
+    server_prefill = metrics["server_prompt_ms"] / 1000.0
+    network_queue = metrics["ttft"] - client_overhead - server_prefill
+    return {
+        "client_overhead": client_overhead,
+        "network_queue": network_queue,
+        "server_prefill": server_prefill,
+        "negative_remainder": network_queue < 0,
+    }
+
+def tokenize(api_base_url: str, text: str, timeout: tuple = DEFAULT_TIMEOUT) -> list[int]:
+    """
+    Tokenizes `text` with the server's model through llama-server's /tokenize endpoint, without
+    special tokens. Returns the token IDs, or None if the request fails (including a `timeout`).
+    """
+    if api_base_url.endswith('/'):
+        api_base_url = api_base_url[:-1]
+    try:
+        response = requests.post(f"{api_base_url}/tokenize", json={"content": text, "add_special": False}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["tokens"]
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        print(f"Error during llama.cpp tokenize request: {e}")
+        return None
+
+def detokenize(api_base_url: str, tokens: list[int], timeout: tuple = DEFAULT_TIMEOUT) -> str:
+    """Converts token IDs back to text through llama-server's /detokenize endpoint. Returns None if the request fails (including a `timeout`)."""
+    if api_base_url.endswith('/'):
+        api_base_url = api_base_url[:-1]
+    try:
+        response = requests.post(f"{api_base_url}/detokenize", json={"tokens": tokens}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["content"]
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        print(f"Error during llama.cpp detokenize request: {e}")
+        return None
+
+def encode_image(image_path: str) -> str:
+    """Reads an image file and returns it as a base64 data URL suitable for an image_url content part."""
+    mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
+    with open(image_path, 'rb') as f:
+        encoded = base64.b64encode(f.read()).decode('ascii')
+    return f"data:{mime_type};base64,{encoded}"
+
+def run_llamacpp_vlm_inference(api_base_url: str, prompt: str, image_path: str, model_alias: str = None, n_predict: int = 10, session: requests.Session = None, image_data_url: str = None,
+                               timeout: tuple = DEFAULT_TIMEOUT, cache_prompt: bool = None) -> dict:
+    """
+    Runs image + text inference through the OpenAI-compatible /v1/chat/completions endpoint
+    (the server must be started with a multimodal projector, e.g. `llama-server -hf ggml-org/gemma-3-4b-it-GGUF`).
+    Latency is split into phases:
+      preprocess_time - client-side image read and base64 encoding
+      prefill_time    - request sent until first token (server-side image encoding + prompt prefill)
+      decode_time     - first token until last token
+    ttft is preprocess_time + prefill_time. Other keys match run_llamacpp_streaming_inference.
+    Pass `image_data_url` (see src.image_cache.prepare_images) to send an image prepared ahead of
+    the timed loop; preprocess_time is then 0.0. `cache_prompt` works as in run_llamacpp_streaming_inference.
+    On failure, text is "" and ttft is -1.0.
+    """
+    if api_base_url.endswith('/'):
+        api_base_url = api_base_url[:-1]
+    endpoint = f"{api_base_url}/v1/chat/completions"
+
+    try:
+        preprocess_start = time.perf_counter()
+        image_url = image_data_url or encode_image(image_path)
+        preprocess_time = time.perf_counter() - preprocess_start if image_data_url is None else 0.0
+    except OSError as e:
+        print(f"Error reading image {image_path}: {e}")
+        metrics = _failed_streaming_result()
+        metrics.update({"preprocess_time": 0.0, "prefill_time": -1.0})
+        return metrics
+
+    payload = {
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "image_url", "image_url": {"url": image_url}},
+                    {"type": "text", "text": prompt},
+                ],
+            }
+        ],
+        "n_predict": n_predict,
+        "max_tokens": n_predict,
+        "stream": True,
+    }
+    if model_alias:
+        payload["model"] = model_alias
+    if cache_prompt is not None:
+        payload["cache_prompt"] = cache_prompt
+
+    metrics = _stream_completion(endpoint, payload, session=session, timeout=timeout)
+    metrics["preprocess_time"] = preprocess_time
+    metrics["prefill_time"] = metrics["ttft"]
+    if metrics["ttft"] != -1.0:
+        metrics["ttft"] += preprocess_time
+        metrics["e2e_latency"] += preprocess_time
+    return metrics
+
+def served_model(api_base_url: str) -> str:
+    """
+    Returns the ID of the model the server is serving (its alias, or the GGUF path) from the
+    OpenAI-compatible /v1/models endpoint, or None if it cannot be determined.
+    """
+    if api_base_url.endswith('/'):
+        api_base_url = api_base_url[:-1]
+    try:
+        response = requests.get(f"{api_base_url}/v1/models", timeout=5)
+        response.raise_for_status()
+        return response.json()["data"][0]["id"]
+    except (requests.exceptions.RequestException, ValueError, KeyError, IndexError) as e:
+        print(f"Could not determine the llama.cpp server's model: {e}")
+        return None
+
 if __name__ == '__main__':
     # Example usage (optional, for direct testing of the module)
     # This will only work if you have a llama.cpp server running at the specified URL
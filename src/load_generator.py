@@ -0,0 +1,166 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import llamacpp_runner
+from src import server_monitor
+from src.stats import percentile
+
+def make_session(pool_size: int) -> requests.Session:
+    """
+    Returns a requests.Session whose connection pool can hold `pool_size` keep-alive
+    connections, so concurrent requests don't pay a new TCP handshake each time.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _timed_request(api_base_url: str, prompt: str, model_alias: str, n_predict: int, session: requests.Session, arrival_time: float, timeout: tuple = llamacpp_runner.DEFAULT_TIMEOUT) -> dict:
+    """
+    Sends one streaming request and adds the client-side queue delay (time between the request's
+    scheduled arrival and the moment it was actually sent) to its TTFT and end-to-end latency.
+    Counting from arrival keeps open-loop results free of coordinated omission. `completed_at`
+    (perf_counter) marks when the response finished, so a level's duration can end at its last completion.
+    """
+    queue_delay = time.perf_counter() - arrival_time
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(
+        api_base_url,
+        prompt,
+        model_alias=model_alias,
+        n_predict=n_predict,
+        session=session,
+        timeout=timeout,
+    )
+    metrics["completed_at"] = time.perf_counter()
+    metrics["queue_delay"] = queue_delay
+    if metrics["ttft"] != -1.0:
+        metrics["ttft"] += queue_delay
+        metrics["e2e_latency"] += queue_delay
+    return metrics
+
+async def _run_closed_loop(api_base_url: str, prompts: list[str], concurrency: int, total_requests: int, model_alias: str, n_predict: int, session: requests.Session, timeout: tuple) -> list[dict]:
+    """N users each send a request, wait for the full response, then immediately send the next."""
+    loop = asyncio.get_running_loop()
+    results = []
+    next_index = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def user():
+            nonlocal next_index
+            while next_index < total_requests:
+                prompt = prompts[next_index % len(prompts)]
+                next_index += 1
+                results.append(await loop.run_in_executor(
+                    executor, _timed_request, api_base_url, prompt, model_alias, n_predict, session, time.perf_counter(), timeout
+                ))
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return results
+
+async def _run_open_loop(api_base_url: str, prompts: list[str], qps: float, total_requests: int, model_alias: str, n_predict: int, session: requests.Session, max_in_flight: int, seed: int, timeout: tuple) -> list[dict]:
+    """Requests arrive as a Poisson process at `qps`, independent of how fast earlier ones complete."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    tasks = []
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for i in range(total_requests):
+            tasks.append(loop.run_in_executor(
+                executor, _timed_request, api_base_url, prompts[i % len(prompts)], model_alias, n_predict, session, time.perf_counter(), timeout
+            ))
+            if i < total_requests - 1: # No gap after the last arrival; it would only pad the level's duration
+                await asyncio.sleep(rng.expovariate(qps))
+        return list(await asyncio.gather(*tasks))
+
+def summarize_level(results: list[dict], duration: float) -> dict:
+    """
+    Aggregates the per-request results of one load level into throughput, latency percentiles and
+    error rate, plus the median TTFT split of llamacpp_runner.latency_breakdown (0.0 where the
+    server reported no timings) and how many requests had a negative remainder in that split.
+    """
+    successful = [r for r in results if r["ttft"] != -1.0]
+    breakdowns = [b for b in (llamacpp_runner.latency_breakdown(r) for r in successful) if b is not None]
+    ttfts = [r["ttft"] for r in successful]
+    e2e_latencies = [r["e2e_latency"] for r in successful]
+    generated_tokens = sum(r["n_tokens"] for r in successful)
+
+    return {
+        "n_requests": len(results),
+        "n_errors": len(results) - len(successful),
+        "error_rate": (len(results) - len(successful)) / len(results) if results else 0.0,
+        "duration": duration,
+        "throughput_rps": len(successful) / duration if duration > 0 else 0.0,
+        "throughput_tps": generated_tokens / duration if duration > 0 else 0.0,
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p90": percentile(ttfts, 90),
+        "ttft_p99": percentile(ttfts, 99),
+        "e2e_p50": percentile(e2e_latencies, 50),
+        "e2e_p90": percentile(e2e_latencies, 90),
+        "e2e_p99": percentile(e2e_latencies, 99),
+        "client_p50": percentile([b["client_overhead"] for b in breakdowns], 50),
+        "network_queue_p50": percentile([b["network_queue"] for b in breakdowns], 50),
+        "server_prefill_p50": percentile([b["server_prefill"] for b in breakdowns], 50),
+        "negative_remainder_count": sum(b["negative_remainder"] for b in breakdowns),
+    }
+
+def _server_summary(monitor: server_monitor.ServerMonitor) -> dict:
+    if monitor is None:
+        return {}
+    return {f"server_{key}": value for key, value in server_monitor.summarize_server_samples(monitor.stop()).items()}
+
+def run_concurrency_sweep(api_base_url: str, prompts: list[str], concurrency_levels: list[int], requests_per_level: int, model_alias: str = None, n_predict: int = 10, monitor_interval: float = None,
+                          timeout: tuple = llamacpp_runner.DEFAULT_TIMEOUT) -> list[dict]:
+    """
+    Closed-loop sweep: for each concurrency level, keeps that many requests in flight until
+    `requests_per_level` have completed. Returns one summary dict per level.
+    With `monitor_interval`, the server's /metrics and /slots are polled during each level and
+    summarised into server_* fields (see server_monitor.summarize_server_samples).
+    `timeout` is each request's (connect, read) timeout in seconds.
+    """
+    summaries = []
+    for concurrency in concurrency_levels:
+        print(f"Closed loop: concurrency={concurrency}, requests={requests_per_level}")
+        monitor = server_monitor.ServerMonitor(api_base_url, monitor_interval).start() if monitor_interval else None
+        with make_session(concurrency) as session:
+            start_time = time.perf_counter()
+            results = asyncio.run(_run_closed_loop(
+                api_base_url, prompts, concurrency, requests_per_level, model_alias, n_predict, session, timeout
+            ))
+            duration = time.perf_counter() - start_time
+        summary = {"mode": "closed", "concurrency": concurrency, "qps": ""}
+        summary.update(summarize_level(results, duration))
+        summary.update(_server_summary(monitor))
+        summaries.append(summary)
+    return summaries
+
+def run_qps_sweep(api_base_url: str, prompts: list[str], qps_levels: list[float], requests_per_level: int, model_alias: str = None, n_predict: int = 10, max_in_flight: int = 64, seed: int = 0, monitor_interval: float = None,
+                  timeout: tuple = llamacpp_runner.DEFAULT_TIMEOUT) -> list[dict]:
+    """
+    Open-loop sweep: for each target QPS, sends `requests_per_level` requests with exponentially
+    distributed inter-arrival times. At most `max_in_flight` requests are on the wire at once;
+    any excess waits client-side and that wait is included in its latency.
+    Returns one summary dict per level; `monitor_interval` and `timeout` work as in run_concurrency_sweep.
+    """
+    summaries = []
+    for qps in qps_levels:
+        print(f"Open loop: qps={qps}, requests={requests_per_level}")
+        monitor = server_monitor.ServerMonitor(api_base_url, monitor_interval).start() if monitor_interval else None
+        with make_session(max_in_flight) as session:
+            start_time = time.perf_counter()
+            results = asyncio.run(_run_open_loop(
+                api_base_url, prompts, qps, requests_per_level, model_alias, n_predict, session, max_in_flight, seed, timeout
+            ))
+            # The clock stops at the last completion, not when the event loop and executor have wound down
+            end_time = max((r["completed_at"] for r in results), default=time.perf_counter())
+            duration = end_time - start_time
+        summary = {"mode": "open", "concurrency": "", "qps": qps}
+        summary.update(summarize_level(results, duration))
+        summary.update(_server_summary(monitor))
+        summaries.append(summary)
+    return summaries
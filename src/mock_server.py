@@ -0,0 +1,257 @@
+import json
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src import llamacpp_runner
+from src.stats import percentile
+
+@dataclass
+class LatencyProfile:
+    """
+    Simulated server cost model. Prompt length is counted in whitespace-separated words, and every
+    image content part counts as `image_tokens` prompt tokens. Like llama-server with cache_prompt,
+    a /v1/completions prompt sharing a word prefix with one of the last `n_slots` prompts only pays
+    prefill for the rest.
+    """
+    prefill_per_token: float = 0.0005 # seconds per prompt token
+    decode_per_token: float = 0.02 # seconds per generated token with a single active slot
+    batch_slowdown: float = 0.1 # extra decode cost per additional active slot (continuous batching)
+    n_slots: int = 1 # requests processed in parallel, like llama-server --parallel
+    max_queue: int = None # requests allowed to wait for a slot; beyond this the server answers 503
+    image_tokens: int = 256
+    model_id: str = "mock-model" # reported by /v1/models
+
+def _common_prefix_length(a: list[str], b: list[str]) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+def _count_prompt_tokens(body: dict, profile: LatencyProfile) -> int:
+    if "prompt" in body:
+        return len(str(body["prompt"]).split())
+    n_tokens = 0
+    for message in body.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            n_tokens += len(content.split())
+            continue
+        for part in content:
+            if part.get("type") == "text":
+                n_tokens += len(part.get("text", "").split())
+            elif part.get("type") == "image_url":
+                n_tokens += profile.image_tokens
+    return n_tokens
+
+class _MockLlamaCppHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, like llama-server, so pooled clients reuse connections
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output clean
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, text: str):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _event(self, chat: bool, token: str, timings: dict = None) -> dict:
+        if chat:
+            event = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": token}}]}
+        else:
+            event = {"object": "text_completion", "choices": [{"index": 0, "text": token}]}
+        if timings:
+            event["timings"] = timings
+        return event
+
+    def do_GET(self):
+        server = self.server
+        with server.state_lock:
+            active, waiting = server.active, server.waiting
+            prompt_tokens_total, tokens_predicted_total = server.prompt_tokens_total, server.tokens_predicted_total
+        if self.path == "/metrics":
+            data = (
+                "# TYPE llamacpp:prompt_tokens_total counter\n"
+                f"llamacpp:prompt_tokens_total {prompt_tokens_total}\n"
+                "# TYPE llamacpp:tokens_predicted_total counter\n"
+                f"llamacpp:tokens_predicted_total {tokens_predicted_total}\n"
+                "# TYPE llamacpp:requests_processing gauge\n"
+                f"llamacpp:requests_processing {active}\n"
+                "# TYPE llamacpp:requests_deferred gauge\n"
+                f"llamacpp:requests_deferred {waiting}\n"
+            ).encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif self.path == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": server.profile.model_id, "object": "model", "owned_by": "llamacpp"}]})
+        elif self.path == "/slots":
+            self._send_json(200, [{"id": i, "is_processing": i < active} for i in range(server.profile.n_slots)])
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": "File Not Found"}})
+
+    def do_POST(self):
+        chat = self.path == "/v1/chat/completions"
+        if self.path not in ("/v1/completions", "/v1/chat/completions"):
+            self._send_json(404, {"error": {"code": 404, "message": "File Not Found"}})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+        profile = server.profile
+        n_predict = int(body.get("max_tokens") or body.get("n_predict") or 16)
+        prompt_tokens = _count_prompt_tokens(body, profile)
+        prompt_words = str(body["prompt"]).split() if "prompt" in body else None
+
+        with server.state_lock:
+            if profile.max_queue is not None and server.waiting >= profile.max_queue:
+                self._send_json(503, {"error": {"code": 503, "message": "Server busy: queue is full"}})
+                return
+            server.waiting += 1
+        server.slots.acquire()
+        with server.state_lock:
+            server.waiting -= 1
+            server.active += 1
+
+        try:
+            stream = bool(body.get("stream"))
+            if stream:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            cached_tokens = 0
+            if prompt_words is not None:
+                with server.state_lock:
+                    if body.get("cache_prompt", True):
+                        cached_tokens = max((_common_prefix_length(prompt_words, cached) for cached in server.prompt_cache), default=0)
+                    # Like a slot's KV cache, the most recent prompts stay resident whether or not they were reused
+                    server.prompt_cache.append(prompt_words)
+                    del server.prompt_cache[:-profile.n_slots]
+
+            prefill_start = time.perf_counter()
+            time.sleep((prompt_tokens - cached_tokens) * profile.prefill_per_token)
+            prompt_ms = (time.perf_counter() - prefill_start) * 1000.0
+
+            decode_start = time.perf_counter()
+            tokens = []
+            for i in range(n_predict):
+                if i > 0:
+                    with server.state_lock:
+                        active = server.active
+                    time.sleep(profile.decode_per_token * (1.0 + profile.batch_slowdown * (active - 1)))
+                token = f" tok{i}"
+                tokens.append(token)
+                if stream:
+                    self._write_chunk(f"data: {json.dumps(self._event(chat, token))}\n\n")
+
+            with server.state_lock:
+                server.prompt_tokens_total += prompt_tokens - cached_tokens
+                server.tokens_predicted_total += n_predict
+            timings = {
+                "prompt_n": prompt_tokens - cached_tokens,
+                "cache_n": cached_tokens,
+                "prompt_ms": prompt_ms,
+                "predicted_n": n_predict,
+                "predicted_ms": (time.perf_counter() - decode_start) * 1000.0,
+            }
+            if stream:
+                self._write_chunk(f"data: {json.dumps(self._event(chat, '', timings))}\n\n")
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            else:
+                text = "".join(tokens)
+                choice = {"index": 0, "message": {"role": "assistant", "content": text}} if chat else {"index": 0, "text": text}
+                self._send_json(200, {"choices": [choice], "timings": timings})
+        finally:
+            with server.state_lock:
+                server.active -= 1
+            server.slots.release()
+
+def start_mock_server(profile: LatencyProfile = None, host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """
+    Starts a stand-in llama.cpp server on a background thread. It implements /v1/completions and
+    /v1/chat/completions (streaming and non-streaming) with the costs in `profile`, a fixed number of
+    slots and a wait queue, plus /metrics, /slots and /v1/models. Port 0 picks a free port.
+    Returns (server, base_url); call server.shutdown() to stop it.
+    """
+    profile = profile or LatencyProfile()
+    server = ThreadingHTTPServer((host, port), _MockLlamaCppHandler)
+    server.daemon_threads = True
+    server.profile = profile
+    server.slots = threading.BoundedSemaphore(profile.n_slots)
+    server.state_lock = threading.Lock()
+    server.waiting = 0
+    server.active = 0
+    server.prompt_cache = []
+    server.prompt_tokens_total = 0
+    server.tokens_predicted_total = 0
+    threading.Thread(target=server.serve_forever, name="mock-llamacpp-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def _serve_until_stopped(profile: LatencyProfile, urls, stop):
+    """Worker of mock_server_process: serves until `stop` is set, after reporting the base URL on `urls`."""
+    server, base_url = start_mock_server(profile)
+    urls.put(base_url)
+    stop.wait()
+    server.shutdown()
+    server.server_close()
+
+@contextmanager
+def mock_server_process(profile: LatencyProfile = None, startup_timeout: float = 30.0):
+    """
+    Runs start_mock_server in a separate (spawned) process and yields its base URL, so the server's
+    own request handling neither shares the caller's GIL nor its CPU time.
+    """
+    context = multiprocessing.get_context("spawn")
+    urls, stop = context.Queue(), context.Event()
+    process = context.Process(target=_serve_until_stopped, args=(profile, urls, stop), name="mock-llamacpp-server", daemon=True)
+    process.start()
+    try:
+        yield urls.get(timeout=startup_timeout)
+    finally:
+        stop.set()
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+
+def measure_harness_overhead(n_requests: int = 50, n_predict: int = 10) -> dict:
+    """
+    Runs the streaming client against a mock server that costs nothing, so every measured millisecond
+    is harness, HTTP and SSE-parsing overhead. Subtract these from real TTFT/ITL figures to estimate
+    server-only latency. The mock runs in its own process: in a thread of this one its Python HTTP and
+    JSON work would compete with the client for the GIL and inflate the figures.
+    Returns ttft_p50, ttft_p99, itl_p50 and itl_p99 in seconds.
+    """
+    ttfts = []
+    itls = []
+    with mock_server_process(LatencyProfile(prefill_per_token=0.0, decode_per_token=0.0, n_slots=1)) as base_url:
+        for _ in range(n_requests):
+            metrics = llamacpp_runner.run_llamacpp_streaming_inference(base_url, "calibration prompt", n_predict=n_predict)
+            if metrics["ttft"] != -1.0:
+                ttfts.append(metrics["ttft"])
+                itls.extend(metrics["itl"])
+    return {
+        "n_requests": len(ttfts),
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p99": percentile(ttfts, 99),
+        "itl_p50": percentile(itls, 50),
+        "itl_p99": percentile(itls, 99),
+    }
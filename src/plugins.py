@@ -0,0 +1,49 @@
+import importlib
+import importlib.metadata
+import importlib.util
+import sys
+import types
+
+# Entry point group through which installed packages add runners, e.g. in their pyproject.toml:
+#   [project.entry-points."vlm_benchmark.runners"]
+#   vllm = "my_package.vllm_runner:register"
+# The entry point names a function taking no arguments and returning the same
+# {runner name: entry} mapping as the built-in plugins in scripts/benchmark.py.
+ENTRY_POINT_GROUP = "vlm_benchmark.runners"
+
+class LazyModule(types.ModuleType):
+    """
+    Placeholder for a module that is imported on first attribute access, so heavy dependencies
+    (torch, transformers) are only loaded by runs that actually use them.
+    """
+
+    def __getattr__(self, attribute: str):
+        return getattr(importlib.import_module(self.__name__), attribute)
+
+def lazy_import(module_name: str):
+    """Returns the module if it is already imported, otherwise a LazyModule standing in for it."""
+    return sys.modules.get(module_name) or LazyModule(module_name)
+
+def missing_modules(module_names: list[str]) -> list[str]:
+    """The names among `module_names` that are not installed, checked without importing them."""
+    missing = []
+    for name in module_names:
+        try:
+            if importlib.util.find_spec(name) is None:
+                missing.append(name)
+        except (ImportError, ValueError):
+            missing.append(name)
+    return missing
+
+def runner_plugins(builtin: dict) -> dict:
+    """
+    Plugin name -> zero-argument loader returning that plugin's register function: the built-in
+    plugins plus those installed under ENTRY_POINT_GROUP. Nothing is imported until a loader is called.
+    """
+    plugins = {name: (lambda register=register: register) for name, register in builtin.items()}
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name in plugins:
+            print(f"Ignoring runner plugin '{entry_point.name}' from {entry_point.value}: the name is already taken")
+            continue
+        plugins[entry_point.name] = entry_point.load
+    return plugins
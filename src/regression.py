@@ -0,0 +1,127 @@
+import csv
+import glob
+import os
+
+from src import results_store
+from src import stats
+
+def _number(value):
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def load_result_set(path: str) -> list[dict]:
+    """
+    Loads benchmark result rows from a results file (.jsonl), a saved CSV (benchmark_results_*.csv)
+    or an experiment output directory (every .jsonl in it). ttft and tokens_per_sec are numbers
+    (None where a runner did not report them).
+    """
+    if os.path.isdir(path):
+        rows = []
+        for results_file in sorted(glob.glob(os.path.join(path, "*.jsonl"))):
+            rows.extend(results_store.load_results(results_file, include_prompt_text=False))
+    elif path.endswith(".csv"):
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = results_store.load_results(path, include_prompt_text=False)
+    for row in rows:
+        row['ttft'] = _number(row.get('ttft'))
+        row['tokens_per_sec'] = _number(row.get('tokens_per_sec'))
+    return rows
+
+def cell_key(row: dict, ignore_model: bool = False) -> tuple:
+    """
+    (experiment cell, workload, runner, model) a result row is compared under. Length sweep rows are
+    split by input length. With ignore_model, runs of different models (e.g. two GGUF quants) align.
+    """
+    workload = row['prompt_type']
+    if row.get('input_tokens') not in (None, ''):
+        workload = f"{workload}@{int(float(row['input_tokens']))}"
+    model = "" if ignore_model else (row.get('model') or "")
+    return (row.get('cell') or "", workload, row['runner'], model)
+
+def _relative_change(base: float, current: float) -> float:
+    return (current - base) / base if base else 0.0
+
+def compare_cell(base_rows: list[dict], current_rows: list[dict], ttft_p50_threshold: float, ttft_p99_threshold: float,
+                 throughput_threshold: float, alpha: float = 0.05) -> dict:
+    """
+    Compares the successful runs of one aligned cell. A metric regresses when it worsens by more
+    than its threshold (relative) and the change is significant at `alpha`:
+      TTFT p50   - Mann-Whitney U test on the TTFT distributions
+      TTFT p99   - bootstrap CI of the p99 difference lies entirely above zero
+      throughput - Mann-Whitney U test on tokens/sec, median drop (skipped if not reported)
+    A cell whose current runs all failed while the baseline had successes also regresses.
+    """
+    base_ttft = [r['ttft'] for r in base_rows if r['ttft'] is not None and r['ttft'] != -1.0]
+    current_ttft = [r['ttft'] for r in current_rows if r['ttft'] is not None and r['ttft'] != -1.0]
+    comparison = {
+        'n_base': len(base_ttft),
+        'n_current': len(current_ttft),
+        'regressions': [],
+    }
+    if not current_ttft:
+        if base_ttft:
+            comparison['regressions'].append("all runs failed")
+        return comparison
+
+    base_p50, current_p50 = stats.percentile(base_ttft, 50), stats.percentile(current_ttft, 50)
+    base_p99, current_p99 = stats.percentile(base_ttft, 99), stats.percentile(current_ttft, 99)
+    p99_diff_low, _ = stats.bootstrap_percentile_diff_ci(base_ttft, current_ttft, 99, confidence=1.0 - alpha)
+    comparison.update({
+        'ttft_p50_base': base_p50,
+        'ttft_p50_current': current_p50,
+        'ttft_p50_change': _relative_change(base_p50, current_p50),
+        'ttft_p_value': stats.mann_whitney_u(base_ttft, current_ttft),
+        'ttft_p99_base': base_p99,
+        'ttft_p99_current': current_p99,
+        'ttft_p99_change': _relative_change(base_p99, current_p99),
+    })
+    if comparison['ttft_p50_change'] > ttft_p50_threshold and comparison['ttft_p_value'] < alpha:
+        comparison['regressions'].append("TTFT p50")
+    if comparison['ttft_p99_change'] > ttft_p99_threshold and p99_diff_low > 0:
+        comparison['regressions'].append("TTFT p99")
+
+    base_tps = [r['tokens_per_sec'] for r in base_rows if r['tokens_per_sec']]
+    current_tps = [r['tokens_per_sec'] for r in current_rows if r['tokens_per_sec']]
+    if base_tps and current_tps:
+        base_median, current_median = stats.percentile(base_tps, 50), stats.percentile(current_tps, 50)
+        comparison.update({
+            'throughput_base': base_median,
+            'throughput_current': current_median,
+            'throughput_change': _relative_change(base_median, current_median),
+            'throughput_p_value': stats.mann_whitney_u(base_tps, current_tps),
+        })
+        if -comparison['throughput_change'] > throughput_threshold and comparison['throughput_p_value'] < alpha:
+            comparison['regressions'].append("throughput")
+    return comparison
+
+def compare_result_sets(base_rows: list[dict], current_rows: list[dict], ttft_p50_threshold: float = 0.05, ttft_p99_threshold: float = 0.10,
+                        throughput_threshold: float = 0.05, alpha: float = 0.05, ignore_model: bool = False) -> list[dict]:
+    """
+    Aligns two result sets per cell_key and compares every cell (see compare_cell). Returns one dict
+    per cell with cell, workload, runner, model, status ("ok", "regression", or "missing" / "new" when
+    only one side has the cell) and the compare_cell figures.
+    """
+    base_cells, current_cells = {}, {}
+    for rows, cells in ((base_rows, base_cells), (current_rows, current_cells)):
+        for row in rows:
+            cells.setdefault(cell_key(row, ignore_model), []).append(row)
+
+    comparisons = []
+    for key in sorted(set(base_cells) | set(current_cells)):
+        cell, workload, runner, model = key
+        comparison = {'cell': cell, 'workload': workload, 'runner': runner, 'model': model}
+        if key not in current_cells:
+            comparison['status'] = "missing"
+        elif key not in base_cells:
+            comparison['status'] = "new"
+        else:
+            comparison.update(compare_cell(base_cells[key], current_cells[key], ttft_p50_threshold, ttft_p99_threshold, throughput_threshold, alpha))
+            comparison['status'] = "regression" if comparison['regressions'] else "ok"
+        comparisons.append(comparison)
+    return comparisons
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+from src import scheduler
+
+# Per-run fields added to a result row by ResourceProfiler.summary()
+RESOURCE_KEYS = ("cpu_util", "rss_mb", "peak_rss_mb", "core_util", "server_cpu_util", "server_rss_mb", "server_peak_rss_mb")
+
+def read_core_times() -> list[tuple[float, float]]:
+    """Returns (busy, total) jiffies of every CPU core from /proc/stat, or None where it is unavailable."""
+    try:
+        with open("/proc/stat") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    cores = []
+    for line in lines:
+        fields = line.split()
+        # The aggregate line is "cpu", per-core lines are "cpu0", "cpu1", ...
+        if not fields or not fields[0].startswith("cpu") or fields[0] == "cpu":
+            continue
+        values = [float(v) for v in fields[1:]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0.0) # idle + iowait
+        total = sum(values[:8]) # guest time is already included in user time
+        cores.append((total - idle, total))
+    return cores or None
+
+def process_cpu_seconds(pid: int) -> float:
+    """User + system CPU seconds of a process from /proc/<pid>/stat, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, so split after its closing parenthesis
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def process_rss_mb(pid: int) -> float:
+    """Resident set size of a process in MB from /proc/<pid>/statm, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _core_util(start: list[tuple[float, float]], end: list[tuple[float, float]]) -> list[float]:
+    util = []
+    for (busy_start, total_start), (busy_end, total_end) in zip(start, end):
+        elapsed = total_end - total_start
+        util.append((busy_end - busy_start) / elapsed if elapsed > 0 else 0.0)
+    return util
+
+class ResourceProfiler:
+    """
+    Measures the resources used during one timed region: CPU time of this process (and of a local
+    llama-server given by `server_pid`) and the utilization of every core, from snapshots at start
+    and stop, plus resident memory sampled every `interval` seconds on a background thread.
+    Use as a context manager around the region, then read summary().
+    """
+
+    def __init__(self, server_pid: int = None, interval: float = 0.05):
+        self.server_pid = server_pid
+        self.interval = interval
+        self.rss_samples = []
+        self.server_rss_samples = []
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start = None
+        self._end = None
+
+    def _snapshot(self) -> dict:
+        return {
+            "wall": time.perf_counter(),
+            "cpu": time.process_time(),
+            "server_cpu": process_cpu_seconds(self.server_pid) if self.server_pid else None,
+            "cores": read_core_times(),
+        }
+
+    def _sample(self):
+        self.rss_samples.append(scheduler.current_rss_mb())
+        if self.server_pid:
+            server_rss = process_rss_mb(self.server_pid)
+            if server_rss is not None:
+                self.server_rss_samples.append(server_rss)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop_event.clear()
+        self._sample()
+        self._start = self._snapshot()
+        self._thread = threading.Thread(target=self._run, name="resource-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        """Stops sampling and returns summary()."""
+        self._end = self._snapshot()
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        return self.summary()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def summary(self) -> dict:
+        """
+        cpu_util is CPU seconds per wall second (1.0 = one core fully busy), core_util the busy
+        fraction of each core, rss_mb the mean and peak_rss_mb the highest sampled RSS. The
+        server_* figures are the same for the llama-server process; figures that could not be
+        read are left out.
+        """
+        start, end = self._start, self._end
+        wall_time = end["wall"] - start["wall"]
+        summary = {
+            "cpu_util": (end["cpu"] - start["cpu"]) / wall_time if wall_time > 0 else 0.0,
+            "rss_mb": sum(self.rss_samples) / len(self.rss_samples),
+            "peak_rss_mb": max(self.rss_samples),
+        }
+        if start["cores"] and end["cores"]:
+            summary["core_util"] = _core_util(start["cores"], end["cores"])
+        if start["server_cpu"] is not None and end["server_cpu"] is not None and wall_time > 0:
+            summary["server_cpu_util"] = (end["server_cpu"] - start["server_cpu"]) / wall_time
+        if self.server_rss_samples:
+            summary["server_rss_mb"] = sum(self.server_rss_samples) / len(self.server_rss_samples)
+            summary["server_peak_rss_mb"] = max(self.server_rss_samples)
+        return summary
+
+def efficiency(row: dict, server_side: bool = False) -> dict:
+    """
+    Tokens/sec per busy core and per GB of peak resident memory for one result row. With
+    `server_side=True` (llama.cpp rows, where the server does the work) the llama-server figures are
+    used and nothing is reported without them; otherwise this process's.
+    Returns {'tokens_per_sec_per_core', 'tokens_per_sec_per_gb'} (None where unknown).
+    """
+    tokens_per_sec = row.get("tokens_per_sec")
+    prefix = "server_" if server_side else ""
+    cores = row.get(f"{prefix}cpu_util")
+    peak_mb = row.get(f"{prefix}peak_rss_mb")
+    if not isinstance(tokens_per_sec, (int, float)) or tokens_per_sec <= 0:
+        return {"tokens_per_sec_per_core": None, "tokens_per_sec_per_gb": None}
+    return {
+        "tokens_per_sec_per_core": tokens_per_sec / cores if cores else None,
+        "tokens_per_sec_per_gb": tokens_per_sec / (peak_mb / 1024) if peak_mb else None,
+    }
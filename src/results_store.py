@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+
+# Every line of a results file is one JSON object with a "kind":
+#   prompt     - {"prompt_id", "prompt_text"}, written once per distinct prompt
+#   result     - one measured repetition; refers to its prompt by prompt_id
+#   cell       - written after a (prompt, runner) cell finishes, with the outlier repetitions
+#   cold_start - one-off model load time of a runner, with its memory footprint where measured
+#   phase      - wall time, CPU time and peak RSS of one runner's phase
+#   overhead   - TTFT/ITL the harness itself adds, measured against a zero-cost mock server
+#   server_sample - one poll of the llama.cpp server's /metrics and /slots during the run
+
+def prompt_id_for(prompt_text: str) -> str:
+    """Stable short identifier for a prompt, so records can refer to it without copying the text."""
+    return hashlib.sha1(prompt_text.encode('utf-8')).hexdigest()[:12]
+
+def _read_records(path: str):
+    """Yields the records of a results file, skipping a truncated or malformed line (e.g. after a crash)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            stripped_line = line.strip()
+            if not stripped_line:
+                continue
+            try:
+                yield json.loads(stripped_line)
+            except json.JSONDecodeError:
+                print(f"Skipping malformed record on line {line_number} of {path}")
+
+def read_new_records(path: str, offset: int = 0) -> tuple[list[dict], int]:
+    """
+    Records appended to a results file since byte `offset`, and the offset to continue from. A last
+    line still being written is left for the next call, so a running benchmark can be followed.
+    """
+    records = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue # Blank, or the newline that terminated a crash-truncated line
+    return records, offset
+
+class ResultSink:
+    """
+    Appends benchmark records to a JSON Lines file as soon as each one completes, so an interrupted
+    run keeps everything measured so far. Opening an existing file with resume=True loads what it
+    already contains, so completed cells and repetitions can be skipped. `tags` (e.g. the experiment
+    cell) are added to every result record. `on_result` is called with each result record once it is
+    written (e.g. live_view.LiveMonitor.add); records loaded on resume are not passed to it.
+    """
+
+    def __init__(self, path: str, resume: bool = False, tags: dict = None, on_result=None):
+        self.path = path
+        self.tags = tags or {}
+        self.on_result = on_result
+        self._prompt_ids = set()
+        self._cell_results = {}
+        self._done_cells = set()
+        if resume and os.path.exists(path):
+            self._load_existing()
+        elif os.path.exists(path):
+            raise FileExistsError(f"Results file already exists: {path} (enable resume to continue it)")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        if resume and self._file.tell() > 0 and not self._ends_with_newline():
+            # Terminate a line truncated by a crash so new records start on their own line
+            self._file.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _load_existing(self):
+        for record in _read_records(self.path):
+            kind = record.get('kind')
+            if kind == 'prompt':
+                self._prompt_ids.add(record['prompt_id'])
+            elif kind == 'result':
+                self._cell_results.setdefault((record['prompt_id'], record['runner']), []).append(record)
+            elif kind == 'cell':
+                self._done_cells.add((record['prompt_id'], record['runner']))
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def intern_prompt(self, prompt_text: str) -> str:
+        """Returns the prompt's ID, writing the prompt text to the file the first time it is seen."""
+        prompt_id = prompt_id_for(prompt_text)
+        if prompt_id not in self._prompt_ids:
+            self._write({'kind': 'prompt', 'prompt_id': prompt_id, 'prompt_text': prompt_text})
+            self._prompt_ids.add(prompt_id)
+        return prompt_id
+
+    def is_cell_done(self, prompt_id: str, runner: str) -> bool:
+        return (prompt_id, runner) in self._done_cells
+
+    def cell_results(self, prompt_id: str, runner: str) -> list[dict]:
+        """Result records already stored for a (prompt, runner) cell, in repetition order."""
+        return list(self._cell_results.get((prompt_id, runner), []))
+
+    def append(self, result: dict):
+        """Writes one measured repetition. `result` must contain prompt_id and runner."""
+        record = {'kind': 'result'}
+        record.update(result)
+        record.update(self.tags)
+        self._write(record)
+        self._cell_results.setdefault((result['prompt_id'], result['runner']), []).append(record)
+        if self.on_result is not None:
+            self.on_result(record)
+
+    def finish_cell(self, prompt_id: str, runner: str, outlier_repetitions: list[int]):
+        """Marks a (prompt, runner) cell complete so a resumed run skips it."""
+        self._write({'kind': 'cell', 'prompt_id': prompt_id, 'runner': runner, 'outliers': outlier_repetitions})
+        self._done_cells.add((prompt_id, runner))
+
+    def record_cold_start(self, runner: str, load_time: float, weights_mb: float = None, rss_delta_mb: float = None):
+        """Records a model load: its time, the size of its weights and how much resident memory it added."""
+        record = {'kind': 'cold_start', 'runner': runner, 'load_time': load_time}
+        if weights_mb is not None:
+            record.update({'weights_mb': weights_mb, 'rss_delta_mb': rss_delta_mb})
+        self._write(record)
+
+    def record_phase(self, runner: str, usage: dict):
+        record = {'kind': 'phase', 'runner': runner}
+        record.update(usage)
+        self._write(record)
+
+    def record_harness_overhead(self, overhead: dict):
+        record = {'kind': 'overhead'}
+        record.update(overhead)
+        self._write(record)
+
+    def record_server_samples(self, samples: list[dict]):
+        for sample in samples:
+            record = {'kind': 'server_sample'}
+            record.update(sample)
+            self._write(record)
+
+    def close(self):
+        self._file.close()
+
+def load_results(path: str, include_prompt_text: bool = True) -> list[dict]:
+    """
+    Reads the result records of a results file back as flat rows (without the "kind" field),
+    applying outlier flags from finished cells and, optionally, re-attaching each row's prompt_text.
+    """
+    prompts = {}
+    outliers = {}
+    results = []
+    for record in _read_records(path):
+        kind = record.pop('kind', None)
+        if kind == 'prompt':
+            prompts[record['prompt_id']] = record['prompt_text']
+        elif kind == 'result':
+            results.append(record)
+        elif kind == 'cell':
+            outliers[(record['prompt_id'], record['runner'])] = set(record['outliers'])
+
+    for r in results:
+        r['outlier'] = r['repetition'] in outliers.get((r['prompt_id'], r['runner']), ())
+        if include_prompt_text:
+            r['prompt_text'] = prompts.get(r['prompt_id'], "")
+    return results
+
+def load_cold_starts(path: str) -> dict:
+    """Returns {runner: load_time} from the cold start records of a results file (latest wins)."""
+    return {
+        record['runner']: record['load_time']
+        for record in _read_records(path)
+        if record.get('kind') == 'cold_start'
+    }
+
+def load_model_memory(path: str) -> dict:
+    """Returns {runner: {'weights_mb', 'rss_delta_mb'}} from the cold start records that carry a memory footprint (latest wins)."""
+    return {
+        record['runner']: {'weights_mb': record['weights_mb'], 'rss_delta_mb': record['rss_delta_mb']}
+        for record in _read_records(path)
+        if record.get('kind') == 'cold_start' and 'weights_mb' in record
+    }
+
+def load_phase_usage(path: str) -> dict:
+    """Returns {runner: usage dict} from the phase records of a results file (latest wins)."""
+    usage = {}
+    for record in _read_records(path):
+        if record.pop('kind', None) == 'phase':
+            usage[record.pop('runner')] = record
+    return usage
+
+def load_harness_overhead(path: str) -> dict:
+    """Returns the latest harness overhead record of a results file, or None if there is none."""
+    overhead = None
+    for record in _read_records(path):
+        if record.pop('kind', None) == 'overhead':
+            overhead = record
+    return overhead
+
+def load_server_samples(path: str) -> list[dict]:
+    """Returns the server_sample records of a results file in the order they were taken."""
+    samples = []
+    for record in _read_records(path):
+        if record.pop('kind', None) == 'server_sample':
+            samples.append(record)
+    return samples
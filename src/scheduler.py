@@ -0,0 +1,229 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+ISOLATION_MODES = ("none", "sequential", "concurrent")
+
+def pin_process(pid: int, cpus: list[int]):
+    """Restricts an already running process (e.g. a local llama-server) to the given CPU cores."""
+    if not hasattr(os, "sched_setaffinity"):
+        print("CPU affinity is not supported on this platform; not pinning process.")
+        return
+    try:
+        os.sched_setaffinity(pid, cpus)
+        print(f"Pinned process {pid} to CPUs {sorted(cpus)}")
+    except OSError as e:
+        print(f"Could not pin process {pid} to CPUs {sorted(cpus)}: {e}")
+
+def _apply_isolation(cpus: list[int], num_threads: int, uses_torch: bool = False):
+    """
+    Pins the current process to `cpus` and caps the thread pools of numerical libraries at `num_threads`
+    (torch's too when the phase `uses_torch`; the OpenMP / BLAS variables cover everything else).
+    """
+    if cpus:
+        pin_process(0, cpus)
+    if num_threads:
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(num_threads)
+        # Set after the variables above, so a torch imported here starts with the capped OpenMP pool
+        _set_torch_threads(num_threads, uses_torch)
+
+def _set_torch_threads(num_threads: int, import_torch: bool = False) -> int:
+    """
+    Sets torch's intra-op thread count if torch is loaded, importing it first with `import_torch`
+    (for phases that will use it, whose model import would otherwise come after this). Returns the
+    previous count, or None if nothing changed (no count requested, or torch not loaded / installed).
+    """
+    if not num_threads:
+        return None
+    torch = sys.modules.get("torch")
+    if torch is None:
+        if not import_torch:
+            return None
+        try:
+            torch = importlib.import_module("torch")
+        except ImportError:
+            return None
+    previous = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    return previous
+
+def _usage_snapshot() -> tuple[float, float]:
+    """Returns (wall clock, user + system CPU seconds) of the current process."""
+    if resource is None:
+        return time.perf_counter(), time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return time.perf_counter(), usage.ru_utime + usage.ru_stime
+
+def current_rss_mb() -> float:
+    """Current resident set size of this process in MB, from /proc where available (else the peak so far)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return _peak_rss_mb()
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB (0.0 where unavailable)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _phase_usage(start: tuple[float, float], cpus: list[int], num_threads: int) -> dict:
+    wall_end, cpu_end = _usage_snapshot()
+    wall_time = wall_end - start[0]
+    cpu_time = cpu_end - start[1]
+    return {
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "cpu_util": cpu_time / wall_time if wall_time > 0 else 0.0, # 1.0 = one core fully busy
+        "peak_rss_mb": _peak_rss_mb(),
+        "cpus": sorted(cpus) if cpus else [],
+        "num_threads": num_threads,
+    }
+
+class QueueSink:
+    """
+    Stand-in for results_store.ResultSink inside a worker process. Reads come from a snapshot of the
+    parent's sink taken when the phase started; writes are forwarded to the parent through a queue.
+    """
+
+    def __init__(self, message_queue, done_cells: set, cell_results: dict):
+        self._queue = message_queue
+        self._done_cells = done_cells
+        self._cell_results = cell_results
+
+    def is_cell_done(self, prompt_id: str, runner: str) -> bool:
+        return (prompt_id, runner) in self._done_cells
+
+    def cell_results(self, prompt_id: str, runner: str) -> list[dict]:
+        return list(self._cell_results.get((prompt_id, runner), []))
+
+    def append(self, result: dict):
+        self._queue.put(("append", (result,)))
+        self._cell_results.setdefault((result['prompt_id'], result['runner']), []).append(result)
+
+    def finish_cell(self, prompt_id: str, runner: str, outlier_repetitions: list[int]):
+        self._queue.put(("finish_cell", (prompt_id, runner, outlier_repetitions)))
+        self._done_cells.add((prompt_id, runner))
+
+    def record_cold_start(self, runner: str, load_time: float, weights_mb: float = None, rss_delta_mb: float = None):
+        self._queue.put(("record_cold_start", (runner, load_time, weights_mb, rss_delta_mb)))
+
+def _phase_worker(run_phase, runner_name: str, workload: list[dict], message_queue, done_cells: set, cell_results: dict, cpus: list[int], num_threads: int,
+                  uses_torch: bool = False):
+    """Entry point of a phase's worker process."""
+    _apply_isolation(cpus, num_threads, uses_torch)
+    start = _usage_snapshot()
+    try:
+        run_phase(QueueSink(message_queue, done_cells, cell_results), runner_name, workload)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        message_queue.put(("record_phase", (runner_name, _phase_usage(start, cpus, num_threads))))
+        message_queue.put(("done", (runner_name,)))
+
+def _snapshot(sink, runner_name: str, workload: list[dict]) -> tuple[set, dict]:
+    """Copies what `sink` already holds for one runner so a worker can resume from it."""
+    done_cells = {(item['prompt_id'], runner_name) for item in workload if sink.is_cell_done(item['prompt_id'], runner_name)}
+    cell_results = {(item['prompt_id'], runner_name): sink.cell_results(item['prompt_id'], runner_name) for item in workload}
+    return done_cells, cell_results
+
+def _run_in_workers(sink, run_phase, runner_names: list[str], workload: list[dict], cpus: dict, num_threads: dict, torch_runners: set = frozenset()):
+    """Starts one worker process per runner and writes everything they report to `sink` until all exit."""
+    # "spawn" gives every phase a fresh interpreter with nothing from other runners loaded
+    context = multiprocessing.get_context("spawn")
+    message_queue = context.Queue()
+    workers = {}
+    for runner_name in runner_names:
+        done_cells, cell_results = _snapshot(sink, runner_name, workload)
+        workers[runner_name] = context.Process(
+            target=_phase_worker,
+            args=(run_phase, runner_name, workload, message_queue, done_cells, cell_results,
+                  cpus.get(runner_name), num_threads.get(runner_name), runner_name in torch_runners),
+            name=f"phase-{runner_name}",
+        )
+        workers[runner_name].start()
+
+    running = set(runner_names)
+    try:
+        while running:
+            try:
+                kind, args = message_queue.get(timeout=1.0)
+            except queue.Empty:
+                for runner_name in list(running):
+                    if not workers[runner_name].is_alive():
+                        print(f"Phase worker for {runner_name} exited unexpectedly (exit code {workers[runner_name].exitcode}).")
+                        running.discard(runner_name)
+                continue
+            if kind == "done":
+                running.discard(args[0])
+            else:
+                getattr(sink, kind)(*args)
+    except Exception:
+        # Ctrl-C reaches the workers too and they wind down by themselves; any other reason to stop
+        # (e.g. the sink aborting the run) does not, so stop them before draining what they queued
+        for worker in workers.values():
+            worker.terminate()
+        raise
+    finally:
+        # Keep draining while workers wind down (e.g. after Ctrl-C) so results they already
+        # queued are still written and no worker blocks on a full queue
+        deadline = time.perf_counter() + 5.0
+        while any(w.is_alive() for w in workers.values()) and time.perf_counter() < deadline:
+            try:
+                kind, args = message_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if kind != "done":
+                getattr(sink, kind)(*args)
+        for worker in workers.values():
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+def run_phases(sink, run_phase, runner_names: list[str], workload: list[dict], mode: str = "none", cpus: dict = None, num_threads: dict = None,
+               torch_runners: set = None):
+    """
+    Runs `run_phase(sink, runner_name, workload)` once per runner.
+      none       - in this process, one runner after the other
+      sequential - each runner in its own fresh worker process, one after the other, so only
+                   one runner's model and threads exist at any time
+      concurrent - all runners at once in separate worker processes; give them disjoint `cpus`
+    `cpus` and `num_threads` map runner names to a CPU core list and a thread count (None = unrestricted).
+    `torch_runners` names the runners whose thread count also applies to torch, which is imported for
+    them if needed; the others never load it. In "none" mode CPU pinning is not applied and only torch's thread count is set, then restored after the phase.
+    Wall time, CPU time and peak RSS of each phase are recorded through sink.record_phase.
+    """
+    if mode not in ISOLATION_MODES:
+        raise ValueError(f"Unknown isolation mode '{mode}', expected one of {ISOLATION_MODES}")
+    cpus = cpus or {}
+    num_threads = num_threads or {}
+    torch_runners = frozenset(torch_runners or ())
+
+    if mode == "none":
+        for runner_name in runner_names:
+            previous_threads = _set_torch_threads(num_threads.get(runner_name), runner_name in torch_runners)
+            start = _usage_snapshot()
+            try:
+                run_phase(sink, runner_name, workload)
+            finally:
+                if previous_threads is not None:
+                    _set_torch_threads(previous_threads)
+            # In-process peak RSS covers everything loaded so far, not just this phase
+            sink.record_phase(runner_name, _phase_usage(start, [], num_threads.get(runner_name)))
+    elif mode == "sequential":
+        for runner_name in runner_names:
+            _run_in_workers(sink, run_phase, [runner_name], workload, cpus, num_threads, torch_runners)
+    else:
+        _run_in_workers(sink, run_phase, runner_names, workload, cpus, num_threads, torch_runners)
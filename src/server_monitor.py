@@ -0,0 +1,140 @@
+import threading
+import time
+
+import requests
+
+def parse_prometheus_metrics(text: str) -> dict:
+    """
+    Parses Prometheus text exposition format (as served by `llama-server --metrics` at /metrics)
+    into {metric name: value}. Labels are dropped; comment and unparsable lines are skipped.
+    """
+    values = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        name_part, _, value_part = line.rpartition(' ')
+        name = name_part.split('{', 1)[0].strip()
+        try:
+            values[name] = float(value_part)
+        except ValueError:
+            continue
+    return values
+
+def scrape_metrics(api_base_url: str, session: requests.Session = None) -> dict:
+    """Returns the server's /metrics as a dict, or None if the endpoint is unavailable (llama-server needs --metrics)."""
+    try:
+        response = (session or requests).get(f"{api_base_url.rstrip('/')}/metrics", timeout=5)
+        response.raise_for_status()
+        return parse_prometheus_metrics(response.text)
+    except requests.exceptions.RequestException:
+        return None
+
+def scrape_slots(api_base_url: str, session: requests.Session = None) -> list[dict]:
+    """Returns the server's /slots list, or None if the endpoint is unavailable or disabled (--no-slots)."""
+    try:
+        response = (session or requests).get(f"{api_base_url.rstrip('/')}/slots", timeout=5)
+        response.raise_for_status()
+        slots = response.json()
+        return slots if isinstance(slots, list) else None
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+def _slot_summary(slots: list[dict]) -> dict:
+    # Newer servers report is_processing; older ones a numeric state (0 = idle)
+    busy = sum(1 for slot in slots if slot.get('is_processing', slot.get('state', 0) != 0))
+    return {'slots_total': len(slots), 'slots_busy': busy}
+
+class ServerMonitor:
+    """
+    Polls a llama.cpp server's /metrics and /slots endpoints every `interval` seconds on a
+    background thread while a benchmark runs. An endpoint that is unavailable on the first poll
+    is not polled again. Use as a context manager or call start() and stop().
+    """
+
+    def __init__(self, api_base_url: str, interval: float = 1.0):
+        self.api_base_url = api_base_url
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._session = requests.Session()
+
+    def _poll(self, start_time: float, poll_metrics: bool, poll_slots: bool) -> tuple[bool, bool]:
+        sample = {'t': time.perf_counter() - start_time}
+        if poll_metrics:
+            metrics = scrape_metrics(self.api_base_url, self._session)
+            if metrics is None:
+                print("Server /metrics unavailable (start llama-server with --metrics); not polling it.")
+                poll_metrics = False
+            else:
+                sample.update(metrics)
+        if poll_slots:
+            slots = scrape_slots(self.api_base_url, self._session)
+            if slots is None:
+                print("Server /slots unavailable; not polling it.")
+                poll_slots = False
+            else:
+                sample.update(_slot_summary(slots))
+        if len(sample) > 1:
+            self.samples.append(sample)
+        return poll_metrics, poll_slots
+
+    def _run(self):
+        start_time = time.perf_counter()
+        poll_metrics, poll_slots = True, True
+        while poll_metrics or poll_slots:
+            poll_metrics, poll_slots = self._poll(start_time, poll_metrics, poll_slots)
+            if self._stop_event.wait(self.interval):
+                break
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="server-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> list[dict]:
+        """Stops polling and returns the collected samples."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._session.close()
+        return self.samples
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def summarize_server_samples(samples: list[dict]) -> dict:
+    """
+    Condenses monitor samples into server-side throughput and pressure figures: prompt and
+    generation tokens/sec from the llama.cpp counters, peak processing and deferred (queued)
+    requests, mean KV cache usage and peak busy slots. Figures the server did not expose are None.
+    """
+    def series(name):
+        return [(s['t'], s[name]) for s in samples if name in s]
+
+    def rate(name):
+        points = series(name)
+        if len(points) < 2 or points[-1][0] <= points[0][0]:
+            return None
+        return (points[-1][1] - points[0][1]) / (points[-1][0] - points[0][0])
+
+    def peak(name):
+        points = series(name)
+        return max(v for _, v in points) if points else None
+
+    kv_usage = [v for _, v in series('llamacpp:kv_cache_usage_ratio')]
+    return {
+        'n_samples': len(samples),
+        'prompt_tokens_per_sec': rate('llamacpp:prompt_tokens_total'),
+        'predicted_tokens_per_sec': rate('llamacpp:tokens_predicted_total'),
+        'max_requests_processing': peak('llamacpp:requests_processing'),
+        'max_requests_deferred': peak('llamacpp:requests_deferred'),
+        'mean_kv_cache_usage': sum(kv_usage) / len(kv_usage) if kv_usage else None,
+        'max_slots_busy': peak('slots_busy'),
+        'slots_total': peak('slots_total'),
+    }
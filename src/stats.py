@@ -0,0 +1,155 @@
+import math
+import random
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Returns the q-th percentile (0-100) of `values` using linear interpolation between
+    closest ranks (the same definition as numpy's default). Returns 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def mean(values: list[float]) -> float:
+    """Arithmetic mean, 0.0 for an empty list."""
+    return sum(values) / len(values) if values else 0.0
+
+def stddev(values: list[float]) -> float:
+    """Sample standard deviation (n - 1 denominator), 0.0 for fewer than two values."""
+    if len(values) < 2:
+        return 0.0
+    avg = mean(values)
+    return math.sqrt(sum((v - avg) ** 2 for v in values) / (len(values) - 1))
+
+def bootstrap_ci(values: list[float], confidence: float = 0.95, n_resamples: int = 1000, seed: int = 0) -> tuple[float, float]:
+    """
+    Percentile-bootstrap confidence interval for the mean of `values`.
+    Resampling is seeded so the same samples always give the same interval.
+    Returns (low, high); both equal the single value (or 0.0) when fewer than two values are given.
+    """
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value
+    rng = random.Random(seed)
+    n = len(values)
+    resampled_means = [mean(rng.choices(values, k=n)) for _ in range(n_resamples)]
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    return percentile(resampled_means, tail), percentile(resampled_means, 100.0 - tail)
+
+def outlier_flags(values: list[float], k: float = 1.5) -> list[bool]:
+    """
+    Flags values outside Tukey's fences [Q1 - k*IQR, Q3 + k*IQR].
+    Fewer than four values are never flagged since the quartiles are not meaningful.
+    """
+    if len(values) < 4:
+        return [False] * len(values)
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    low, high = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    return [v < low or v > high for v in values]
+
+def summarize(values: list[float], confidence: float = 0.95) -> dict:
+    """
+    Distribution summary of `values`: n, mean, stddev, p50, p90, p99, the bootstrap
+    confidence interval of the mean (ci_low, ci_high) and the number of Tukey outliers.
+    """
+    ci_low, ci_high = bootstrap_ci(values, confidence=confidence)
+    return {
+        "n": len(values),
+        "mean": mean(values),
+        "stddev": stddev(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "n_outliers": sum(outlier_flags(values)),
+    }
+
+def mann_whitney_u(a: list[float], b: list[float]) -> float:
+    """
+    Two-sided p-value of the Mann-Whitney U test that `a` and `b` come from the same distribution,
+    using the normal approximation with tie and continuity corrections (adequate from about
+    five values per side). Returns 1.0 when either side is empty or all values are tied.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    n = n1 + n2
+    rank_sum_a = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2.0 + 1.0 # Tied values share the mean of their ranks
+        rank_sum_a += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        tie_count = j - i + 1
+        tie_term += tie_count ** 3 - tie_count
+        i = j + 1
+    u = rank_sum_a - n1 * (n1 + 1) / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = max(abs(u - n1 * n2 / 2.0) - 0.5, 0.0) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2.0))
+
+def bootstrap_percentile_diff_ci(a: list[float], b: list[float], q: float, confidence: float = 0.95, n_resamples: int = 1000, seed: int = 0) -> tuple[float, float]:
+    """
+    Percentile-bootstrap confidence interval for percentile(b, q) - percentile(a, q), resampling
+    both sides independently (seeded). Returns (low, high); (0.0, 0.0) when either side is empty.
+    """
+    if not a or not b:
+        return 0.0, 0.0
+    rng = random.Random(seed)
+    diffs = [percentile(rng.choices(b, k=len(b)), q) - percentile(rng.choices(a, k=len(a)), q) for _ in range(n_resamples)]
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    return percentile(diffs, tail), percentile(diffs, 100.0 - tail)
+
+def relative_ci_width(values: list[float], confidence: float = 0.95) -> float:
+    """Width of the bootstrap CI of the mean divided by the mean; infinite when it can't be estimated."""
+    avg = mean(values)
+    if len(values) < 2 or avg == 0:
+        return math.inf
+    ci_low, ci_high = bootstrap_ci(values, confidence=confidence)
+    return (ci_high - ci_low) / abs(avg)
+
+def run_repetitions(run_once, warmup_runs: int = 1, min_repetitions: int = 3, max_repetitions: int = 10, target_rel_ci_width: float = None, metric: str = "ttft", previous: list[dict] = None, on_result=None) -> list[dict]:
+    """
+    Calls `run_once()` (which returns a metrics dict) `warmup_runs` times and discards the results,
+    then repeats it until between `min_repetitions` and `max_repetitions` measurements exist.
+    After the minimum is reached, stops early once the relative width of the bootstrap CI of
+    `metric` over successful runs (metric != -1.0) is at most `target_rel_ci_width`, or when
+    every run so far has failed (retrying a broken configuration won't narrow anything).
+    `previous` holds measurements from an interrupted run; they count towards the limits and,
+    if they already satisfy them, nothing is run at all.
+    `on_result` is called with each new measurement (not warm-ups) as soon as it completes.
+    Returns previous + new measurements in order.
+    """
+    measured = list(previous or [])
+
+    def enough() -> bool:
+        if len(measured) >= max_repetitions:
+            return True
+        if target_rel_ci_width is None or len(measured) < min_repetitions:
+            return False
+        values = [m[metric] for m in measured if m[metric] != -1.0]
+        return not values or relative_ci_width(values) <= target_rel_ci_width
+
+    if enough():
+        return measured
+
+    for _ in range(warmup_runs):
+        run_once()
+
+    while not enough():
+        metrics = run_once()
+        measured.append(metrics)
+        if on_result is not None:
+            on_result(metrics)
+    return measured
@@ -0,0 +1,113 @@
+import json
+import math
+import random
+
+def load_prompts(filepath: str) -> list[str]:
+    prompts = []
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                stripped_line = line.strip()
+                if stripped_line:
+                    prompts.append(stripped_line)
+    except FileNotFoundError:
+        print(f"Error: Prompt file not found at {filepath}")
+    return prompts
+
+def load_vlm_prompts(filepath: str) -> list[dict]:
+    """Loads image + text prompts from a JSON Lines file of {"image": ..., "prompt": ...} objects."""
+    prompts = []
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                stripped_line = line.strip()
+                if not stripped_line:
+                    continue
+                try:
+                    entry = json.loads(stripped_line)
+                except json.JSONDecodeError as e:
+                    print(f"Skipping malformed line {line_number} in {filepath}: {e}")
+                    continue
+                if entry.get('image') and entry.get('prompt'):
+                    prompts.append(entry)
+    except FileNotFoundError:
+        print(f"Error: Prompt file not found at {filepath}")
+    return prompts
+
+# Common words for synthetic filler text; varied enough that tokenizers don't collapse repeats
+_FILLER_WORDS = (
+    "the", "model", "server", "token", "latency", "request", "memory", "cache", "prompt", "image",
+    "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "river", "mountain", "city",
+    "morning", "evening", "system", "network", "signal", "data", "value", "result", "engine", "layer",
+    "and", "with", "from", "into", "under", "after", "before", "while", "because", "although",
+    "measures", "describes", "returns", "builds", "reads", "writes", "sends", "waits", "runs", "stops",
+)
+
+def sweep_lengths(min_tokens: int, max_tokens: int) -> list[int]:
+    """Input lengths from `min_tokens` up to `max_tokens`, doubling each step (e.g. 32, 64, ..., 32768)."""
+    lengths = []
+    n_tokens = min_tokens
+    while n_tokens <= max_tokens:
+        lengths.append(n_tokens)
+        n_tokens *= 2
+    return lengths
+
+def _filler_text(n_words: int, seed: int) -> str:
+    """Deterministic pseudo-random sentences of `n_words` words."""
+    rng = random.Random(seed)
+    words = []
+    for i in range(n_words):
+        word = rng.choice(_FILLER_WORDS)
+        words.append(word.capitalize() if i % 12 == 0 else word)
+        if i % 12 == 11:
+            words[-1] += "."
+    return " ".join(words)
+
+def synthetic_prompt(tokenize, detokenize, n_tokens: int, seed: int = 0, max_adjustments: int = 8) -> tuple[str, int]:
+    """
+    Builds a prompt that `tokenize` splits into exactly `n_tokens` tokens (special tokens excluded).
+    `tokenize(text) -> list[int]` and `detokenize(ids) -> str` should be the target model's own tokenizer.
+    Filler text is cut to `n_tokens` token IDs and decoded; because decode/encode does not always
+    round-trip, the cut point is nudged until the re-encoded length matches.
+    Returns (prompt_text, actual_token_count); the count is the closest reached if no exact match was found.
+    Different seeds give prompts that differ from their first token, so they share no cacheable prefix.
+    """
+    n_words = max(n_tokens, 16)
+    token_ids = tokenize(_filler_text(n_words, seed))
+    while len(token_ids) < n_tokens + 8:
+        n_words *= 2
+        token_ids = tokenize(_filler_text(n_words, seed))
+
+    best = None
+    cut = n_tokens
+    for _ in range(max_adjustments):
+        text = detokenize(token_ids[:cut])
+        count = len(tokenize(text))
+        if best is None or abs(count - n_tokens) < abs(best[1] - n_tokens):
+            best = (text, count)
+        if count == n_tokens:
+            break
+        cut = max(1, min(len(token_ids), cut + n_tokens - count))
+    return best
+
+def prefix_family(prefix_words: int, suffix_words: int, n_suffixes: int, seed: int = 0) -> tuple[str, list[str]]:
+    """
+    A shared prompt prefix (e.g. a long system prompt) and `n_suffixes` distinct suffixes to append
+    to it. Each suffix starts with a space and differs from the others from its first word on, so
+    only the prefix can be served from a KV cache. Returns (prefix, suffixes).
+    """
+    prefix = _filler_text(prefix_words, seed)
+    suffixes = [
+        f" Question {i + 1}: " + _filler_text(suffix_words, seed * 100003 + i + 1)
+        for i in range(n_suffixes)
+    ]
+    return prefix, suffixes
+
+def scaling_exponent(n_small: int, t_small: float, n_large: int, t_large: float) -> float:
+    """
+    Local exponent k in t ~ n^k between two (input length, time) points: about 1 while prefill is
+    linear in the input length and approaching 2 where attention cost dominates.
+    """
+    if n_small <= 0 or n_large <= n_small or t_small <= 0 or t_large <= 0:
+        return 0.0
+    return math.log(t_large / t_small) / math.log(n_large / n_small)
@@ -0,0 +1,53 @@
+# tests/test_aggregator.py
+import random
+import pytest
+from src import aggregator
+from src import stats
+
+def test_running_stats_match_batch_statistics():
+    values = [0.12, 0.5, 0.31, 0.07, 0.44, 0.29]
+    running = aggregator.RunningStats()
+    for value in values:
+        running.add(value)
+    assert running.n == 6
+    assert running.mean == pytest.approx(stats.mean(values))
+    assert running.stddev == pytest.approx(stats.stddev(values))
+    assert (running.min, running.max) == (0.07, 0.5)
+    assert aggregator.RunningStats().stddev == 0.0
+
+def test_histogram_percentiles_are_within_relative_error():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(-3, 1) for _ in range(5000)]
+    histogram = aggregator.LatencyHistogram(relative_error=0.01)
+    for value in values:
+        histogram.add(value)
+    for q in (50, 90, 99):
+        assert histogram.percentile(q) == pytest.approx(stats.percentile(values, q), rel=0.01)
+    assert histogram.percentile(100) == max(values)
+    assert len(histogram._buckets) < 1000 # Memory bounded by the value range, not the count
+
+def test_histogram_handles_empty_and_zero_values():
+    histogram = aggregator.LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+    for value in (0.0, 0.0, 0.0, 1.0):
+        histogram.add(value)
+    assert histogram.percentile(50) == 0.0
+    assert histogram.percentile(100) == 1.0
+
+def test_result_aggregator_tracks_cells_failures_and_rate():
+    results = aggregator.ResultAggregator(clock=lambda: 0.0)
+    results.add({'prompt_type': 'short', 'runner': 'llamacpp', 'ttft': 0.1, 'tokens_per_sec': 40.0, 'finished_at': 100.0})
+    results.add({'prompt_type': 'short', 'runner': 'llamacpp', 'ttft': -1.0, 'tokens_per_sec': '', 'finished_at': 101.0})
+    results.add({'prompt_type': 'short', 'runner': 'llamacpp', 'ttft': 0.3, 'tokens_per_sec': 60.0, 'finished_at': 102.0})
+    assert results.add({'prompt_type': 'long', 'runner': 'baseline', 'ttft': 0.5}) == ('long', 'baseline')
+
+    cell = results.cells[('short', 'llamacpp')]
+    assert cell.failure_rate == pytest.approx(1 / 3)
+    summary = cell.summary()
+    assert (summary['n'], summary['n_total']) == (2, 3)
+    assert summary['mean'] == pytest.approx(0.2)
+    assert summary['tokens_per_sec'] == pytest.approx(50.0)
+    assert summary['results_per_sec'] == pytest.approx(1.0)
+    assert results.cells[('long', 'baseline')].summary()['tokens_per_sec'] is None
+    assert results.current == ('long', 'baseline')
+    assert results.n_results == 4
@@ -34,3 +34,237 @@ def test_run_baseline_inference_model_not_found(mocker):
     pass
 
 # Add more tests for different scenarios, e.g., different max_new_tokens
+
+# --- Measured generation loop ---
+
+def _tiny_gpt2():
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel
+    torch.manual_seed(0)
+    model = GPT2LMHeadModel(GPT2Config(n_layer=1, n_head=2, n_embd=16, vocab_size=32, n_positions=64))
+    model.eval()
+    return model
+
+def test_measured_generate_times_each_step():
+    import torch
+    model = _tiny_gpt2()
+    inputs = {"input_ids": torch.tensor([[1, 2, 3]]), "attention_mask": torch.ones((1, 3), dtype=torch.long)}
+
+    metrics = baseline_runner._measured_generate(model, inputs, max_new_tokens=5)
+
+    assert metrics["n_tokens"] == 5
+    assert len(metrics["token_ids"]) == 5
+    assert len(metrics["itl"]) == 4
+    assert metrics["ttft"] > 0
+    assert metrics["decode_time"] >= 0
+
+def test_measured_generate_matches_greedy_generate():
+    import torch
+    model = _tiny_gpt2()
+    inputs = {"input_ids": torch.tensor([[4, 5, 6, 7]]), "attention_mask": torch.ones((1, 4), dtype=torch.long)}
+
+    metrics = baseline_runner._measured_generate(model, inputs, max_new_tokens=6)
+    reference = model.generate(**inputs, max_new_tokens=6, min_new_tokens=6, do_sample=False, pad_token_id=0)
+
+    assert metrics["token_ids"] == reference[0, 4:].tolist()
+
+def test_measured_generate_calls_streamer(mocker):
+    import torch
+    model = _tiny_gpt2()
+    streamer = mocker.MagicMock()
+    inputs = {"input_ids": torch.tensor([[1, 2]])}
+
+    baseline_runner._measured_generate(model, inputs, max_new_tokens=3, streamer=streamer)
+
+    # Prompt ids first (as TextStreamer(skip_prompt=True) expects), then one call per token, then end
+    assert [name for name, _, _ in streamer.mock_calls] == ["put", "put", "put", "put", "end"]
+    assert streamer.put.call_args_list[0].args[0].tolist() == [[1, 2]]
+    assert all(call.args[0].shape == (1, 1) for call in streamer.put.call_args_list[1:])
+
+def test_measured_generate_excludes_streamer_time():
+    import time
+    import torch
+    model = _tiny_gpt2()
+
+    class SlowStreamer:
+        def put(self, value):
+            time.sleep(0.05)
+        def end(self):
+            pass
+
+    metrics = baseline_runner._measured_generate(model, {"input_ids": torch.tensor([[1, 2]])}, max_new_tokens=4, streamer=SlowStreamer())
+
+    assert metrics["ttft"] < 0.05
+    assert max(metrics["itl"]) < 0.05
+
+def test_run_baseline_streaming_inference_model_not_found(mocker):
+    baseline_runner.clear_model_cache()
+    mocker.patch('src.baseline_runner.AutoTokenizer.from_pretrained', side_effect=OSError("not found"))
+    metrics = baseline_runner.run_baseline_streaming_inference("non_existent_model", "Test prompt")
+    assert metrics["ttft"] == -1.0
+    assert metrics["text"] == ""
+
+class _DigitTokenizer:
+    """Tokenizes a string of digits into one token per digit; BOS is token 31."""
+    eos_token_id = None
+
+    def __call__(self, text, add_special_tokens=True, return_tensors=None):
+        import torch
+        from types import SimpleNamespace
+        ids = ([31] if add_special_tokens else []) + [int(c) for c in text if c.isdigit()]
+        return SimpleNamespace(input_ids=torch.tensor([ids]))
+
+    def decode(self, token_ids, skip_special_tokens=False):
+        return " ".join(str(t) for t in token_ids)
+
+def test_prefix_inference_reuses_prefix_cache_without_changing_output(mocker):
+    baseline_runner.clear_model_cache()
+    mocker.patch('src.baseline_runner.get_model', return_value=(_DigitTokenizer(), _tiny_gpt2(), 0.0))
+
+    cold = baseline_runner.run_baseline_prefix_inference("tiny", "1234567", "89", max_new_tokens=4, reuse_prefix=False)
+    first_warm = baseline_runner.run_baseline_prefix_inference("tiny", "1234567", "89", max_new_tokens=4)
+    second_warm = baseline_runner.run_baseline_prefix_inference("tiny", "1234567", "98", max_new_tokens=4)
+    warm_again = baseline_runner.run_baseline_prefix_inference("tiny", "1234567", "89", max_new_tokens=4)
+
+    assert cold["cached_tokens"] == 0
+    assert first_warm["cached_tokens"] == 8 # BOS + 7 prefix digits
+    assert first_warm["prefix_build_time"] > 0
+    assert second_warm["prefix_build_time"] == 0.0
+    assert first_warm["text"] == cold["text"]
+    assert warm_again["text"] == cold["text"] # Earlier requests did not modify the shared prefix cache
+    baseline_runner.clear_model_cache()
+
+def test_length_batches_buckets_similar_lengths():
+    assert baseline_runner._length_batches([5, 1, 9, 2], 2, bucket_by_length=True) == [[1, 3], [0, 2]]
+    assert baseline_runner._length_batches([5, 1, 9, 2], 3, bucket_by_length=False) == [[0, 1, 2], [3]]
+
+class _PaddingDigitTokenizer(_DigitTokenizer):
+    """_DigitTokenizer with left padding for batches."""
+    pad_token = "<pad>"
+    pad_token_id = 0
+    padding_side = "left"
+
+    def __call__(self, text, add_special_tokens=True, return_tensors=None, padding=False):
+        import torch
+        from transformers import BatchEncoding
+        texts = [text] if isinstance(text, str) else text
+        rows = [[31] + [int(c) for c in t if c.isdigit()] for t in texts]
+        width = max(len(r) for r in rows)
+        input_ids = [[0] * (width - len(r)) + r for r in rows]
+        attention_mask = [[0] * (width - len(r)) + [1] * len(r) for r in rows]
+        if isinstance(text, str) and return_tensors is None:
+            return BatchEncoding({"input_ids": rows[0]})
+        return BatchEncoding({"input_ids": torch.tensor(input_ids), "attention_mask": torch.tensor(attention_mask)})
+
+def test_batched_inference_reports_throughput_and_padding(mocker):
+    mocker.patch('src.baseline_runner.get_model', return_value=(_PaddingDigitTokenizer(), _tiny_gpt2(), 0.0))
+    prompts = ["1", "12", "123456", "1234567"]
+
+    bucketed = baseline_runner.run_baseline_batched_inference("tiny", prompts, batch_size=2, max_new_tokens=3)
+    unbucketed = baseline_runner.run_baseline_batched_inference("tiny", ["1", "123456", "12", "1234567"], batch_size=2, max_new_tokens=3, bucket_by_length=False)
+
+    assert bucketed["n_errors"] == 0
+    assert bucketed["n_batches"] == 2
+    assert bucketed["generated_tokens"] == 12 # Every request generates exactly max_new_tokens
+    assert bucketed["throughput_tps"] > 0
+    assert bucketed["batch_ttft_p50"] > 0
+    assert bucketed["completion_p99"] >= bucketed["latency_p99"]
+    assert bucketed["padding_ratio"] < unbucketed["padding_ratio"]
+
+def test_batch_sweep_reports_cold_start_and_passes_model_options(mocker):
+    get_model = mocker.patch('src.baseline_runner.get_model', side_effect=[
+        (_PaddingDigitTokenizer(), _tiny_gpt2(), 2.5), (_PaddingDigitTokenizer(), _tiny_gpt2(), 0.0)])
+
+    summaries, cold_start = baseline_runner.run_baseline_batch_sweep("tiny", ["1", "12"], [2], max_new_tokens=2,
+                                                                     model_options={'max_cached_models': 3})
+
+    assert cold_start == 2.5
+    assert summaries[0]["load_time"] == 0.0
+    assert all(c.kwargs == {'max_cached_models': 3} for c in get_model.call_args_list)
+
+def test_batched_inference_failure(mocker):
+    mocker.patch('src.baseline_runner.get_model', side_effect=OSError("not found"))
+
+    summary = baseline_runner.run_baseline_batched_inference("missing", ["a", "b"], batch_size=2)
+
+    assert summary["n_errors"] == 2
+    assert summary["throughput_tps"] == 0.0
+
+# --- Model cache ---
+
+@pytest.fixture
+def mock_loaders(mocker):
+    baseline_runner.clear_model_cache()
+    tokenizer_loader = mocker.patch('src.baseline_runner.AutoTokenizer.from_pretrained')
+    model_loader = mocker.patch('src.baseline_runner.AutoModelForCausalLM.from_pretrained')
+    yield tokenizer_loader, model_loader
+    baseline_runner.clear_model_cache()
+
+def test_get_model_loads_once(mock_loaders):
+    tokenizer_loader, model_loader = mock_loaders
+
+    _, first_model, first_load_time = baseline_runner.get_model("mock_model")
+    _, second_model, second_load_time = baseline_runner.get_model("mock_model")
+
+    assert first_model is second_model
+    assert first_load_time >= 0
+    assert second_load_time == 0.0
+    tokenizer_loader.assert_called_once_with("mock_model")
+    model_loader.assert_called_once_with("mock_model")
+
+def test_get_model_evicts_least_recently_used(mock_loaders):
+    _, model_loader = mock_loaders
+
+    baseline_runner.get_model("model_a", max_cached_models=2)
+    baseline_runner.get_model("model_b", max_cached_models=2)
+    baseline_runner.get_model("model_a", max_cached_models=2) # model_b is now least recently used
+    baseline_runner.get_model("model_c", max_cached_models=2)
+
+    assert list(baseline_runner._MODEL_CACHE) == [("model_a", None, "cpu", False, None, False), ("model_c", None, "cpu", False, None, False)]
+    assert model_loader.call_count == 3
+
+def test_get_model_keys_on_dtype(mock_loaders):
+    _, model_loader = mock_loaders
+
+    baseline_runner.get_model("mock_model", max_cached_models=2)
+    baseline_runner.get_model("mock_model", dtype="bfloat16", max_cached_models=2)
+
+    assert model_loader.call_count == 2
+
+def test_get_model_dynamic_int8_shrinks_linear_weights(mock_loaders):
+    import torch
+    _, model_loader = mock_loaders
+    model_loader.side_effect = lambda *args, **kwargs: torch.nn.Sequential(torch.nn.Linear(256, 256), torch.nn.Linear(256, 256))
+
+    _, fp32_model, _ = baseline_runner.get_model("mock_model", max_cached_models=2)
+    _, int8_model, _ = baseline_runner.get_model("mock_model", quantization="dynamic-int8", max_cached_models=2)
+
+    assert fp32_model is not int8_model
+    assert baseline_runner.model_weights_mb(int8_model) < baseline_runner.model_weights_mb(fp32_model) / 3
+
+def test_evicted_model_takes_its_prefix_caches_along(mock_loaders, mocker):
+    _, model_loader = mock_loaders
+    model_loader.side_effect = lambda *args, **kwargs: mocker.MagicMock()
+    tokenizer, model_a, _ = baseline_runner.get_model("model_a", max_cached_models=2)
+    _, model_b, _ = baseline_runner.get_model("model_b", max_cached_models=2)
+    mocker.patch('src.baseline_runner.torch.inference_mode')
+    for model in (model_a, model_b):
+        baseline_runner._get_prefix_cache(tokenizer, model, "shared prefix")
+
+    baseline_runner.get_model("model_c", max_cached_models=2) # Evicts model_a
+
+    assert list(baseline_runner._PREFIX_CACHE) == [(id(model_b), "shared prefix")]
+
+def test_get_model_rejects_unknown_quantization(mock_loaders):
+    with pytest.raises(ValueError):
+        baseline_runner.get_model("mock_model", quantization="gptq")
+
+# --- Multimodal (image + text) ---
+
+def test_run_baseline_vlm_inference_model_not_found(mocker):
+    baseline_runner.clear_model_cache()
+    mocker.patch('src.baseline_runner.AutoProcessor.from_pretrained', side_effect=OSError("not found"))
+    metrics = baseline_runner.run_baseline_vlm_inference("non_existent_model", "Describe", "image.png")
+    assert metrics["ttft"] == -1.0
+    assert metrics["text"] == ""
+    assert metrics["prefill_time"] == -1.0
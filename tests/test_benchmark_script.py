@@ -1,7 +1,10 @@
 # tests/test_benchmark_script.py
 import pytest
 import os
+import subprocess
+import sys
 from scripts import benchmark # Adjust import if necessary based on path handling
+from src import results_store
 
 # Example: Add project root to sys.path for imports from src/scripts
 # import sys
@@ -13,38 +16,317 @@ from scripts import benchmark # Adjust import if necessary based on path handlin
 
 # --- Tests for load_prompts ---
 def test_load_prompts_valid_file(tmp_path):
-    # TODO: Create a temporary prompt file
-    # TODO: Call load_prompts
-    # TODO: Assert correct prompts are returned
-    pass
+    prompt_file = tmp_path / "prompts.txt"
+    prompt_file.write_text("Hello?\n\n  What's up?  \n", encoding="utf-8")
+    assert benchmark.load_prompts(str(prompt_file)) == ["Hello?", "What's up?"]
 
 def test_load_prompts_empty_file(tmp_path):
-    # TODO: Create an empty temporary prompt file
-    # TODO: Call load_prompts
-    # TODO: Assert empty list is returned
-    pass
+    prompt_file = tmp_path / "empty.txt"
+    prompt_file.write_text("", encoding="utf-8")
+    assert benchmark.load_prompts(str(prompt_file)) == []
 
-def test_load_prompts_file_not_found():
-    # TODO: Call load_prompts with a non-existent file
-    # TODO: Assert empty list is returned (or appropriate error handling)
-    pass
+def test_load_prompts_file_not_found(tmp_path):
+    assert benchmark.load_prompts(str(tmp_path / "missing.txt")) == []
+
+def test_load_vlm_prompts_skips_incomplete_and_malformed_lines(tmp_path):
+    prompt_file = tmp_path / "vlm_prompts.jsonl"
+    prompt_file.write_text(
+        '{"image": "a.png", "prompt": "Describe"}\n'
+        '\n'
+        'not json\n'
+        '{"image": "b.png"}\n',
+        encoding="utf-8"
+    )
+    assert benchmark.load_vlm_prompts(str(prompt_file)) == [{"image": "a.png", "prompt": "Describe"}]
 
 # --- Tests for print_summary_report (or its internal stats calculation) ---
+def _row(prompt_type, runner, ttft, repetition=0):
+    return {'prompt_type': prompt_type, 'runner': runner, 'ttft': ttft, 'repetition': repetition}
+
 def test_summary_report_calculations_basic():
-    # TODO: Create sample results data
-    # TODO: Call the stats calculation part of print_summary_report
-    # TODO: Assert averages and success rates are correct
-    pass
+    results = [
+        _row('short', 'baseline', 0.2, 0), _row('short', 'baseline', 0.4, 1),
+        _row('short', 'baseline', -1.0, 2), _row('short', 'llamacpp', 0.1),
+        _row('long', 'baseline', 1.0),
+    ]
+    avg_ttft, num_successful, num_total = benchmark.calculate_stats(results, 'short', 'baseline')
+    assert avg_ttft == pytest.approx(0.3)
+    assert (num_successful, num_total) == (2, 3)
+
+    dist = benchmark.calculate_distribution_stats(results, 'short', 'baseline')
+    assert dist['n'] == 2
+    assert dist['p50'] == pytest.approx(0.3)
 
 def test_summary_report_calculations_no_successes():
-    # TODO: Create sample results data with all failures
-    # TODO: Assert correct handling (e.g., TTFT avg is 0 or N/A, success rate 0%)
-    pass
+    results = [_row('short', 'llamacpp', -1.0), _row('short', 'llamacpp', -1.0)]
+    assert benchmark.calculate_stats(results, 'short', 'llamacpp') == (0.0, 0, 2)
+    assert benchmark.calculate_distribution_stats(results, 'short', 'llamacpp')['n'] == 0
+
+def test_summary_report_calculations_empty_input(capsys):
+    assert benchmark.calculate_stats([], 'short', 'baseline') == (0.0, 0, 0)
+    benchmark.print_summary_report([])
+    assert "Benchmark Summary Report" in capsys.readouterr().out
+
+def test_outlier_repetitions_only_marks_successful_spikes():
+    cell = [_row('short', 'llamacpp', t, i) for i, t in enumerate([0.10, 0.11, -1.0, 0.10, 0.12, 0.90])]
+    assert benchmark._outlier_repetitions(cell) == [5]
+
+def _metrics(ttft):
+    return {'text': 'out', 'ttft': ttft, 'decode_time': 0.1, 'tokens_per_sec': 10.0}
+
+def test_run_cell_streams_each_repetition(tmp_path, mocker):
+    mocker.patch.multiple(benchmark.config, WARMUP_RUNS=1, MIN_REPETITIONS=2, MAX_REPETITIONS=3, TARGET_REL_CI_WIDTH=None)
+    run_once = mocker.Mock(side_effect=[_metrics(9.9), _metrics(0.1), _metrics(0.2), _metrics(0.3)])
+    sink = results_store.ResultSink(str(tmp_path / "results.jsonl"))
+    prompt_id = sink.intern_prompt("Hello?")
+
+    cell = benchmark._run_cell(sink, 'short', 0, prompt_id, 'llamacpp', "Llama.cpp", "test", run_once)
+    sink.close()
+
+    assert [r['ttft'] for r in cell] == [0.1, 0.2, 0.3] # The warm-up run is not recorded
+    stored = results_store.load_results(str(tmp_path / "results.jsonl"))
+    assert [(r['repetition'], r['ttft'], r['prompt_text']) for r in stored] == [(0, 0.1, "Hello?"), (1, 0.2, "Hello?"), (2, 0.3, "Hello?")]
+
+def test_run_cell_resumes_partial_and_skips_finished(tmp_path, mocker):
+    mocker.patch.multiple(benchmark.config, WARMUP_RUNS=0, MIN_REPETITIONS=2, MAX_REPETITIONS=3, TARGET_REL_CI_WIDTH=None)
+    path = str(tmp_path / "results.jsonl")
+    sink = results_store.ResultSink(path)
+    prompt_id = sink.intern_prompt("Hello?")
+    sink.append(benchmark._result_row('short', 0, prompt_id, 'llamacpp', 0, _metrics(0.1)))
+    sink.close() # Simulates a run interrupted after one repetition
+
+    sink = results_store.ResultSink(path, resume=True)
+    run_once = mocker.Mock(return_value=_metrics(0.2))
+    cell = benchmark._run_cell(sink, 'short', 0, prompt_id, 'llamacpp', "Llama.cpp", "test", run_once)
+    assert run_once.call_count == 2
+    assert [r['repetition'] for r in cell] == [0, 1, 2]
+
+    benchmark._run_cell(sink, 'short', 0, prompt_id, 'llamacpp', "Llama.cpp", "test", run_once)
+    assert run_once.call_count == 2 # Finished cell is skipped
+    sink.close()
+
+def test_run_phase_runs_runner_specific_items_on_their_runner_only(tmp_path, mocker):
+    mocker.patch.multiple(benchmark.config, WARMUP_RUNS=0, MIN_REPETITIONS=1, MAX_REPETITIONS=1, TARGET_REL_CI_WIDTH=None)
+    served_model = mocker.patch('scripts.benchmark.llamacpp_runner.served_model', return_value="model.gguf")
+    run_once = mocker.Mock(return_value=_metrics(0.1))
+    mocker.patch.dict(benchmark.RUNNERS, {'llamacpp': ("Llama.cpp", "test", run_once)})
+    sink = results_store.ResultSink(str(tmp_path / "results.jsonl"))
+    workload = [
+        {'prompt_type': 'short', 'prompt_idx': 0, 'prompt_id': sink.intern_prompt("a"), 'prompt_text': "a"},
+        {'prompt_type': 'sweep', 'prompt_idx': 0, 'prompt_id': sink.intern_prompt("b"), 'prompt_text': "b", 'runner': 'llamacpp', 'input_tokens': 32},
+        {'prompt_type': 'sweep', 'prompt_idx': 0, 'prompt_id': sink.intern_prompt("c"), 'prompt_text': "c", 'runner': 'baseline', 'input_tokens': 32},
+    ]
+
+    benchmark.run_phase(sink, 'llamacpp', workload)
+    sink.close()
+
+    assert [call.args[0]['prompt_text'] for call in run_once.call_args_list] == ["a", "b"]
+    stored = results_store.load_results(str(tmp_path / "results.jsonl"))
+    assert [r.get('input_tokens') for r in stored] == [None, 32]
+    assert [r['model'] for r in stored] == ["model.gguf", "model.gguf"]
+    served_model.assert_called_once()
+
+def test_print_length_sweep_report(capsys):
+    results = [
+        {'prompt_type': 'sweep', 'runner': 'llamacpp', 'input_tokens': 32, 'ttft': 0.1},
+        {'prompt_type': 'sweep', 'runner': 'llamacpp', 'input_tokens': 64, 'ttft': 0.4},
+        {'prompt_type': 'sweep', 'runner': 'llamacpp', 'input_tokens': 128, 'ttft': -1.0},
+    ]
+    benchmark.print_length_sweep_report(results)
+    output = capsys.readouterr().out
+
+    assert "320.0" in output # 32 tokens / 0.1 s
+    assert "2.00" in output # TTFT quadrupled for twice the tokens
+    assert "failed (context limit?)" in output
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_repeated_llamacpp_prompts_are_not_served_from_cache(mocker, streaming):
+    from src import mock_server
+    server, base_url = mock_server.start_mock_server(mock_server.LatencyProfile(prefill_per_token=0.0, decode_per_token=0.0))
+    mocker.patch.multiple(benchmark.config, LLAMACPP_API_BASE_URL=base_url, LLAMACPP_USE_STREAMING=streaming)
+    post = mocker.spy(benchmark.llamacpp_runner.requests, 'post')
+    item = {'prompt_text': "one two three four five"}
+    try:
+        runs = [benchmark._run_llamacpp(item) for _ in range(3)]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert all(call.kwargs['json']['cache_prompt'] is False for call in post.call_args_list)
+    if streaming: # Only the streaming client records the server's timings
+        assert [r['server_prompt_n'] for r in runs] == [5, 5, 5] # Full prefill every repetition
+
+def test_llamacpp_prefix_runner_warms_the_prefix(mocker):
+    runner = mocker.patch('scripts.benchmark.llamacpp_runner.run_llamacpp_streaming_inference', return_value=_metrics(0.1))
+    item = {'prompt_text': "shared prefix", 'suffixes': [" a", " b"], 'cache_mode': 'warm'}
+    cold_item = {'prompt_text': "shared prefix", 'suffixes': [" a", " b"], 'cache_mode': 'cold'}
+
+    for prefix_item in (item, cold_item, item):
+        benchmark._profiled(benchmark._run_llamacpp_prefix, prefix_item, benchmark._prime_llamacpp_prefix)
+
+    sent = [(call.args[1], call.kwargs['cache_prompt']) for call in runner.call_args_list]
+    assert sent == [
+        ("shared prefix", True), ("shared prefix a", True), # Untimed priming, then the measured request
+        ("shared prefix a", False),
+        ("shared prefix", True), ("shared prefix b", True),
+    ]
+
+def test_print_prefix_cache_report_pairs_cold_and_warm_runs(capsys):
+    results = [
+        {'prompt_type': 'prefix-cold', 'prompt_idx': 0, 'runner': 'llamacpp', 'ttft': 0.4, 'cached_tokens': 0},
+        {'prompt_type': 'prefix-warm', 'prompt_idx': 0, 'runner': 'llamacpp', 'ttft': 0.1, 'cached_tokens': 30},
+        {'prompt_type': 'prefix-warm', 'prompt_idx': 0, 'runner': 'llamacpp', 'ttft': -1.0},
+        {'prompt_type': 'prefix-cold', 'prompt_idx': 1, 'runner': 'llamacpp', 'ttft': -1.0},
+        {'prompt_type': 'short', 'prompt_idx': 0, 'runner': 'llamacpp', 'ttft': 0.2},
+    ]
+    benchmark.print_prefix_cache_report(results)
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Llamacpp")]
+
+    assert len(lines) == 2 # One row per (runner, family)
+    assert "4.00x" in lines[0] and "30" in lines[0]
+    assert "failed" in lines[1]
+
+def test_print_latency_breakdown_uses_server_timings(capsys):
+    results = [
+        {'prompt_type': 'short', 'runner': 'llamacpp', 'ttft': 0.5, 'server_prompt_ms': 300.0, 'server_predicted_n': 10, 'server_predicted_ms': 200.0},
+        {'prompt_type': 'short', 'runner': 'baseline', 'ttft': 0.4}, # No server timings: not part of the breakdown
+    ]
+    benchmark.print_latency_breakdown(results, {'ttft_p50': 0.01})
+    output = capsys.readouterr().out
+
+    assert "Llamacpp" in output
+    assert "Baseline" not in output
+    assert "0.1900" in output # 0.5 - 0.01 client - 0.3 prefill
+    assert "Neg = runs" not in output
+
+def test_baseline_variants_become_separate_runners(mocker):
+    mocker.patch.object(benchmark.config, 'BASELINE_VARIANTS', {})
+    assert benchmark._baseline_variants() == {'baseline': ("", {})}
 
-def test_summary_report_calculations_empty_input():
-    # TODO: Call with empty results
-    # TODO: Assert it handles this gracefully (e.g., prints empty report or message)
-    pass
+    mocker.patch.multiple(benchmark.config,
+                          BASELINE_VARIANTS={'int8': {'quantization': 'dynamic-int8', 'num_threads': 2}, 'bf16': {'dtype': 'bfloat16'}},
+                          RUNNER_CPUS={'baseline': [0, 1], 'llamacpp': None},
+                          RUNNER_NUM_THREADS={'baseline': 4, 'llamacpp': None})
+    assert benchmark._baseline_variants() == {
+        'baseline-int8': (" int8", {'quantization': 'dynamic-int8'}), # num_threads is applied by the scheduler
+        'baseline-bf16': (" bf16", {'dtype': 'bfloat16'}),
+    }
+    cpus, num_threads = benchmark._runner_isolation()
+    assert cpus['baseline-int8'] == cpus['baseline-bf16'] == [0, 1]
+    assert num_threads['baseline-int8'] == 2
+    assert num_threads['baseline-bf16'] == 4
+
+def test_setup_baseline_records_load_time_and_memory(mocker):
+    mocker.patch.object(benchmark.config, 'BASELINE_WARMUP_RUNS', 0)
+    get_model = mocker.patch('scripts.benchmark.baseline_runner.get_model', return_value=(None, "model", 1.5))
+    mocker.patch('scripts.benchmark.baseline_runner.model_weights_mb', return_value=120.0)
+    mocker.patch('scripts.benchmark.scheduler.current_rss_mb', side_effect=[500.0, 650.0])
+    sink = mocker.Mock()
+
+    benchmark._setup_baseline(sink, runner_name='baseline-int8', model_options={'quantization': 'dynamic-int8'})
+
+    assert get_model.call_args.kwargs['quantization'] == 'dynamic-int8'
+    sink.record_cold_start.assert_called_once_with('baseline-int8', 1.5, 120.0, 150.0)
+
+def test_setup_baseline_preloads_vlm_model_when_the_cache_holds_both(mocker):
+    mocker.patch.multiple(benchmark.config, BASELINE_WARMUP_RUNS=0, BASELINE_MAX_CACHED_MODELS=2)
+    get_model = mocker.patch('scripts.benchmark.baseline_runner.get_model', return_value=(None, "model", 1.5))
+    mocker.patch('scripts.benchmark.baseline_runner.model_weights_mb', return_value=120.0)
+    mocker.patch('scripts.benchmark.scheduler.current_rss_mb', return_value=500.0)
+    sink = mocker.Mock()
+
+    benchmark._setup_baseline(sink, [{'prompt_text': "a"}, {'prompt_text': "b", 'image': "cat.png"}])
+
+    assert [c.args[0] for c in sink.record_cold_start.call_args_list] == ['baseline vlm', 'baseline']
+    assert get_model.call_args_list[0].kwargs['multimodal'] is True
+    assert all(c.kwargs['max_cached_models'] == 2 for c in get_model.call_args_list)
+
+def test_measured_baseline_runs_honour_cache_limit(mocker):
+    mocker.patch.object(benchmark.config, 'BASELINE_MAX_CACHED_MODELS', 3)
+    run_vlm = mocker.patch('scripts.benchmark.baseline_runner.run_baseline_vlm_inference', return_value={'ttft': 0.1})
+    run_prefix = mocker.patch('scripts.benchmark.baseline_runner.run_baseline_prefix_inference', return_value={'ttft': 0.1})
+
+    benchmark._run_baseline_vlm({'prompt_text': "a", 'image': "cat.png"}, model_options={'dtype': 'bfloat16'})
+    benchmark._run_baseline_prefix({'prompt_text': "a", 'cache_mode': 'cold', 'suffixes': ["b"]})
+
+    assert run_vlm.call_args.kwargs['model_options'] == {'dtype': 'bfloat16', 'max_cached_models': 3}
+    assert run_prefix.call_args.kwargs['model_options'] == {'max_cached_models': 3}
+
+def test_model_load_inside_a_run_is_recorded_as_cold_start(mocker):
+    sink = mocker.Mock()
+    metrics = benchmark._record_model_load(sink, 'baseline vlm', {'ttft': 0.2, 'text': "x", 'load_time': 3.0})
+
+    sink.record_cold_start.assert_called_once_with('baseline vlm', 3.0)
+    assert benchmark._result_row('vlm', 0, 'vlm-0', 'baseline', 0, metrics)['load_time'] == 3.0
+    benchmark._record_model_load(sink, 'baseline', {'ttft': 0.2, 'text': "x", 'load_time': 0.0})
+    assert sink.record_cold_start.call_count == 1
+
+def test_profiled_run_adds_resource_figures(mocker):
+    mocker.patch.multiple(benchmark.config, RESOURCE_PROFILE_INTERVAL=0.01, LLAMACPP_SERVER_PID=None)
+    metrics = benchmark._profiled(lambda item: _metrics(0.1), {})
+    row = benchmark._result_row('short', 0, "id", 'baseline', 0, metrics)
+
+    assert row['ttft'] == 0.1
+    assert row['peak_rss_mb'] > 0.0
+    assert 'cpu_util' in row
+
+    mocker.patch.object(benchmark.config, 'RESOURCE_PROFILE_INTERVAL', None)
+    assert 'cpu_util' not in benchmark._profiled(lambda item: _metrics(0.1), {})
+
+def test_profiled_run_primes_outside_the_profile(mocker):
+    mocker.patch.multiple(benchmark.config, RESOURCE_PROFILE_INTERVAL=0.01, LLAMACPP_SERVER_PID=None)
+    profiler = mocker.patch('scripts.benchmark.resource_profiler.ResourceProfiler').return_value
+    profiler.summary.return_value = {}
+    events = []
+    profiler.__enter__.side_effect = lambda: events.append('profile start')
+    profiler.__exit__.side_effect = lambda *exc: events.append('profile stop')
+
+    benchmark._profiled(lambda item: events.append('run') or _metrics(0.1), {}, prime=lambda item: events.append('prime'))
+
+    assert events == ['prime', 'profile start', 'run', 'profile stop']
+
+def test_print_resource_report(capsys):
+    results = [
+        {'prompt_type': 'short', 'runner': 'baseline', 'ttft': 0.1, 'tokens_per_sec': 40.0, 'cpu_util': 4.0, 'peak_rss_mb': 2048.0},
+        {'prompt_type': 'short', 'runner': 'llamacpp', 'ttft': 0.1, 'tokens_per_sec': 40.0, 'cpu_util': 0.1, 'peak_rss_mb': 100.0},
+        {'prompt_type': 'short', 'runner': 'baseline', 'ttft': -1.0, 'tokens_per_sec': '', 'cpu_util': 9.0, 'peak_rss_mb': 9.0}, # Failed: ignored
+    ]
+    benchmark.print_resource_report(results)
+    output = capsys.readouterr().out
+
+    assert "10.00" in output # 40 tok/s on 4 cores
+    assert "20.00" in output # 40 tok/s in 2 GB
+    assert "n/a" in output # No llama-server process figures
+
+def test_enabled_runners_and_settings_reconfigure_runner_tables(mocker):
+    settings = {'BASELINE_VARIANTS': {'int8': {'quantization': 'dynamic-int8'}, 'bf16': {'dtype': 'bfloat16'}}, 'ENABLED_RUNNERS': ['baseline']}
+    seen = {}
+    mocker.patch('scripts.benchmark.run_phase', side_effect=lambda sink, runner_name, workload: seen.update(
+        runners=benchmark._enabled_runners(), target=benchmark.RUNNERS[runner_name][1]))
+
+    benchmark._run_phase_with_settings(settings, None, 'baseline-int8', [])
+
+    assert seen == {'runners': ['baseline-int8', 'baseline-bf16'], 'target': "gpt2 (quantization=dynamic-int8)"}
+    assert list(benchmark.RUNNERS) == ['baseline', 'llamacpp'] # Tables follow the restored config afterwards
+    mocker.patch.object(benchmark.config, 'ENABLED_RUNNERS', ['llamacpp'])
+    assert benchmark._enabled_runners() == ['llamacpp']
+
+def test_experiment_cell_tags_every_result(tmp_path, mocker):
+    mocker.patch.multiple(benchmark.config, WARMUP_RUNS=0, MIN_REPETITIONS=1, MAX_REPETITIONS=1, TARGET_REL_CI_WIDTH=None,
+                          HARNESS_OVERHEAD_CALIBRATION=False, SERVER_MONITOR_INTERVAL=None, RESOURCE_PROFILE_INTERVAL=None,
+                          LLAMACPP_MODEL_ALIAS="alias")
+    mocker.patch('scripts.benchmark.build_workload', side_effect=lambda sink: [
+        {'prompt_type': 'short', 'prompt_idx': 0, 'prompt_id': sink.intern_prompt("a"), 'prompt_text': "a"}])
+    run_llamacpp = mocker.patch('scripts.benchmark._run_llamacpp', return_value=_metrics(0.1))
+    mocker.patch('scripts.benchmark.save_results_to_csv')
+    stem = str(tmp_path / "000_max_new_tokens=5")
+
+    benchmark._run_experiment_cell({'ENABLED_RUNNERS': ['llamacpp'], 'MAX_NEW_TOKENS_FOR_TTFT': 5}, "max_new_tokens=5", stem, False)
+
+    assert run_llamacpp.call_count == 1
+    stored = results_store.load_results(stem + ".jsonl")
+    assert [(r['runner'], r['cell']) for r in stored] == [('llamacpp', "max_new_tokens=5")]
+    assert benchmark.config.MAX_NEW_TOKENS_FOR_TTFT != 5 # Restored after the cell
 
 # --- Higher-level test for benchmark.main() ---
 # This would require significant mocking of runners and config
@@ -57,3 +339,27 @@ def test_summary_report_calculations_empty_input():
 #     # TODO: Call benchmark.main()
 #     # TODO: Assert that runners were called, and report functions were called
 #     pass
+
+def test_llamacpp_only_startup_does_not_import_baseline_dependencies():
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    code = ("import sys; from src import config; config.ENABLED_RUNNERS = ['llamacpp']; import scripts.benchmark as b; "
+            "print(sorted(b.RUNNERS), [m for m in ('torch', 'transformers', 'PIL', 'src.baseline_runner') if m in sys.modules])")
+    result = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "['llamacpp'] []"
+
+def test_runner_plugin_from_entry_point_is_registered(mocker):
+    run_echo = mocker.Mock()
+    plugin = lambda: {'echo': {'text': ("Echo", "local", run_echo)}}
+    mocker.patch('scripts.benchmark.plugins.runner_plugins', side_effect=lambda builtin: {**{name: (lambda r=r: r) for name, r in builtin.items()}, 'echo': lambda: plugin})
+    mocker.patch.object(benchmark.config, 'ENABLED_RUNNERS', ['echo'])
+    try:
+        benchmark.configure_runners()
+        assert benchmark._enabled_runners() == ['echo']
+        assert benchmark.RUNNERS['echo'][2] is run_echo
+        assert 'echo' not in benchmark.VLM_RUNNERS and not benchmark.RUNNER_SETUP and not benchmark.TORCH_RUNNERS
+    finally:
+        mocker.stopall()
+        benchmark.configure_runners()
+    # Built-in: only the baseline runners need torch for their thread count
+    assert 'llamacpp' not in benchmark.TORCH_RUNNERS
+    assert all(name in benchmark.TORCH_RUNNERS for name in benchmark.RUNNERS if name.startswith('baseline'))
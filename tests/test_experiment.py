@@ -0,0 +1,141 @@
+# tests/test_experiment.py
+import json
+import os
+import pytest
+from src import config
+from src import experiment
+
+def test_resolve_key_accepts_aliases_and_config_names():
+    assert experiment.resolve_key("model") == "BASELINE_MODEL_NAME"
+    assert experiment.resolve_key("min_repetitions") == "MIN_REPETITIONS"
+    assert experiment.resolve_key("isolation_mode") == "ISOLATION_MODE"
+    with pytest.raises(ValueError):
+        experiment.resolve_key("no_such_setting")
+
+def test_parse_assignment_reads_json_or_string():
+    assert experiment.parse_assignment("max_new_tokens=32") == ("MAX_NEW_TOKENS_FOR_TTFT", 32)
+    assert experiment.parse_assignment("runners=[\"llamacpp\"]") == ("ENABLED_RUNNERS", ["llamacpp"])
+    assert experiment.parse_assignment("endpoint=http://host:8000") == ("LLAMACPP_API_BASE_URL", "http://host:8000")
+    with pytest.raises(ValueError):
+        experiment.parse_assignment("max_new_tokens")
+
+def test_load_spec_toml_and_yaml(tmp_path):
+    toml_path = tmp_path / "spec.toml"
+    toml_path.write_text('name = "t"\n[matrix]\nmodel = ["gpt2"]\n')
+    yaml_path = tmp_path / "spec.yaml"
+    yaml_path.write_text("name: t\nmatrix:\n  model: [gpt2]\n")
+    assert experiment.load_spec(str(toml_path)) == {"name": "t", "matrix": {"model": ["gpt2"]}}
+    if experiment.yaml is not None:
+        assert experiment.load_spec(str(yaml_path)) == {"name": "t", "matrix": {"model": ["gpt2"]}}
+
+def test_load_spec_rejects_unknown_sections_and_formats(tmp_path):
+    bad_section = tmp_path / "spec.toml"
+    bad_section.write_text('[cells]\nmodel = "gpt2"\n')
+    with pytest.raises(ValueError):
+        experiment.load_spec(str(bad_section))
+    with pytest.raises(ValueError):
+        experiment.load_spec(str(tmp_path / "spec.json"))
+
+def test_expand_matrix_is_the_cartesian_product_with_settings():
+    spec = {
+        "settings": {"min_repetitions": 5},
+        "matrix": {"model": ["gpt2", "distilgpt2"], "max_new_tokens": [10, 64]},
+    }
+    cells = experiment.expand_matrix(spec)
+
+    assert [c['cell_id'] for c in cells] == [
+        "model=gpt2,max_new_tokens=10", "model=gpt2,max_new_tokens=64",
+        "model=distilgpt2,max_new_tokens=10", "model=distilgpt2,max_new_tokens=64",
+    ]
+    assert cells[1]['settings'] == {"MIN_REPETITIONS": 5, "BASELINE_MODEL_NAME": "gpt2", "MAX_NEW_TOKENS_FOR_TTFT": 64}
+    assert experiment.expand_matrix({})[0] == {'cell_id': "default", 'settings': {}}
+    with pytest.raises(ValueError):
+        experiment.expand_matrix({"matrix": {"model": "gpt2"}})
+
+def test_order_cells_groups_cells_by_model():
+    spec = {
+        "settings": {"runners": ["baseline"], "isolation_mode": "none", "baseline_variants": {}},
+        "matrix": {"max_new_tokens": [10, 64], "model": ["gpt2", "distilgpt2"]},
+    }
+    cells = experiment.expand_matrix(spec)
+    assert experiment.count_model_loads(cells) == 4 # Model alternates in spec order
+
+    ordered = experiment.order_cells(cells)
+    assert [c['settings']['BASELINE_MODEL_NAME'] for c in ordered] == ["gpt2", "gpt2", "distilgpt2", "distilgpt2"]
+    assert [c['settings']['MAX_NEW_TOKENS_FOR_TTFT'] for c in ordered] == [10, 64, 10, 64] # Spec order kept within a model
+    assert experiment.count_model_loads(ordered) == 2
+
+@pytest.mark.parametrize("settings", [
+    {"runners": ["baseline"], "isolation_mode": "sequential"}, # Every phase runs in a fresh worker
+    {"runners": ["baseline", "llamacpp"], "isolation_mode": "none"}, # The llama.cpp phase releases the model
+])
+def test_count_model_loads_without_reuse_between_cells(settings):
+    spec = {"settings": dict(settings, baseline_variants={}), "matrix": {"model": ["gpt2"], "max_new_tokens": [10, 64]}}
+    cells = experiment.order_cells(experiment.expand_matrix(spec))
+
+    assert experiment.count_model_loads(cells) == 2
+
+def test_count_model_loads_counts_each_baseline_variant():
+    spec = {
+        "settings": {"runners": ["baseline"], "isolation_mode": "none", "baseline_max_cached_models": 1,
+                     "variants": {"int8": {"quantization": "dynamic-int8"}, "bf16": {"dtype": "bfloat16"}}},
+        "matrix": {"max_new_tokens": [10, 64]},
+    }
+    cells = experiment.expand_matrix(spec)
+
+    assert experiment.count_model_loads(cells) == 4 # Two variants evict each other from a one-model cache
+
+    spec["settings"]["baseline_max_cached_models"] = 2
+    assert experiment.count_model_loads(experiment.expand_matrix(spec)) == 2
+
+def test_apply_settings_coerces_values_to_the_config_type():
+    settings = {"LLAMACPP_REQUEST_TIMEOUT": [5, 30], "ENABLED_RUNNERS": "llamacpp", "TEXT_WORKLOADS": "short"}
+
+    with experiment.apply_settings(settings):
+        assert config.LLAMACPP_REQUEST_TIMEOUT == (5, 30)
+        assert config.ENABLED_RUNNERS == ["llamacpp"]
+        assert config.TEXT_WORKLOADS == ["short"]
+    with experiment.apply_settings({"ENABLED_RUNNERS": None, "MAX_NEW_TOKENS_FOR_TTFT": 8}):
+        assert config.ENABLED_RUNNERS is None
+        assert config.MAX_NEW_TOKENS_FOR_TTFT == 8
+
+def test_apply_settings_restores_config():
+    original = config.MAX_NEW_TOKENS_FOR_TTFT
+    with pytest.raises(RuntimeError):
+        with experiment.apply_settings({"MAX_NEW_TOKENS_FOR_TTFT": original + 1}):
+            assert config.MAX_NEW_TOKENS_FOR_TTFT == original + 1
+            raise RuntimeError
+    assert config.MAX_NEW_TOKENS_FOR_TTFT == original
+
+def test_cli_runs_cells_in_order_with_overrides(tmp_path, mocker):
+    spec_path = tmp_path / "spec.toml"
+    spec_path.write_text('name = "t"\n[matrix]\nmax_new_tokens = [10, 64]\nmodel = ["a/b", "c"]\n')
+    run_single = mocker.Mock()
+    run_cell = mocker.Mock(side_effect=lambda settings, cell_id, stem, resume: settings)
+
+    outcomes = experiment.cli("test", run_single, run_cell,
+                              ["--spec", str(spec_path), "--output-dir", str(tmp_path / "out"), "--set", "min_repetitions=2"])
+
+    run_single.assert_not_called()
+    stems = [call.args[2] for call in run_cell.call_args_list]
+    assert [os.path.basename(stem) for stem in stems] == [
+        "000_max_new_tokens=10_model=a_b", "001_max_new_tokens=64_model=a_b",
+        "002_max_new_tokens=10_model=c", "003_max_new_tokens=64_model=c",
+    ]
+    assert all(settings["MIN_REPETITIONS"] == 2 for settings in outcomes.values())
+    manifest = json.loads((tmp_path / "out" / "cells.json").read_text())
+    assert manifest['overrides'] == {"MIN_REPETITIONS": 2}
+    assert [c['outputs'] for c in manifest['cells']] == [os.path.basename(stem) for stem in stems]
+
+def test_cli_without_spec_runs_once_and_dry_run_runs_nothing(tmp_path, mocker):
+    run_single = mocker.Mock(return_value="results")
+    run_cell = mocker.Mock()
+    assert experiment.cli("test", run_single, run_cell, ["--set", "max_new_tokens=5"]) == "results"
+    run_single.assert_called_once_with({"MAX_NEW_TOKENS_FOR_TTFT": 5})
+
+    spec_path = tmp_path / "spec.toml"
+    spec_path.write_text('[matrix]\nmodel = ["gpt2"]\n')
+    assert experiment.cli("test", run_single, run_cell, ["--spec", str(spec_path), "--dry-run"]) is None
+    run_cell.assert_not_called()
+    with pytest.raises(SystemExit):
+        experiment.cli("test", run_single, run_cell, ["--set", "bogus=1"])
@@ -0,0 +1,55 @@
+# tests/test_image_cache.py
+import base64
+import io
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from src import image_cache
+
+def _write_png(path, size=(64, 32), color=(255, 0, 0)):
+    Image.new("RGB", size, color).save(path, format="PNG")
+    return str(path)
+
+def test_prepare_images_caches_by_content(tmp_path):
+    image_path = _write_png(tmp_path / "red.png")
+    cache_dir = str(tmp_path / "cache")
+
+    first, first_stats = image_cache.prepare_images([image_path, image_path], cache_dir, workers=1)
+    second, second_stats = image_cache.prepare_images([image_path], cache_dir, workers=1)
+
+    assert first_stats["n_images"] == 1 # Duplicate paths are prepared once
+    assert first_stats["cache_misses"] == 1
+    assert second_stats["cache_hits"] == 1
+    assert second_stats["hit_rate"] == 1.0
+    assert first[image_path] == second[image_path]
+    with open(image_path, 'rb') as f:
+        assert first[image_path] == "data:image/png;base64," + base64.b64encode(f.read()).decode('ascii')
+
+def test_prepare_images_resizes(tmp_path):
+    image_path = _write_png(tmp_path / "wide.png", size=(400, 100))
+
+    prepared, _ = image_cache.prepare_images([image_path], str(tmp_path / "cache"), max_side=100, image_format="JPEG", workers=1)
+
+    header, encoded = prepared[image_path].split(",", 1)
+    assert header == "data:image/jpeg;base64"
+    assert Image.open(io.BytesIO(base64.b64decode(encoded))).size == (100, 25)
+
+def test_cache_key_depends_on_parameters():
+    assert image_cache._cache_key(b"abc", None, "PNG") != image_cache._cache_key(b"abc", 256, "PNG")
+    assert image_cache._cache_key(b"abc", 256, "PNG") == image_cache._cache_key(b"abc", 256, "PNG")
+
+def test_prepare_images_skips_missing_files(tmp_path):
+    prepared, stats = image_cache.prepare_images([str(tmp_path / "missing.png")], str(tmp_path / "cache"), workers=1)
+    assert prepared == {}
+    assert stats["n_images"] == 0
+
+def test_prepare_images_skips_images_pil_rejects(tmp_path, mocker):
+    good = _write_png(tmp_path / "good.png")
+    bomb = _write_png(tmp_path / "bomb.png", size=(400, 100))
+    mocker.patch.object(Image, 'MAX_IMAGE_PIXELS', 10000)
+    # Threads instead of worker processes, so the workers see the patched limit
+    mocker.patch('src.image_cache.ProcessPoolExecutor', ThreadPoolExecutor)
+
+    prepared, stats = image_cache.prepare_images([good, bomb], str(tmp_path / "cache"), max_side=32, workers=1)
+
+    assert list(prepared) == [good] # 40000 pixels > 2 x MAX_IMAGE_PIXELS raises DecompressionBombError
+    assert stats["n_images"] == 1
@@ -0,0 +1,41 @@
+# tests/test_live_view.py
+import pytest
+from src import live_view
+
+def _row(ttft, runner='llamacpp', prompt_type='short'):
+    return {'prompt_type': prompt_type, 'runner': runner, 'ttft': ttft, 'tokens_per_sec': 50.0}
+
+def test_monitor_prints_progress_at_most_every_interval(capsys):
+    now = [0.0]
+    monitor = live_view.LiveMonitor(interval=10.0, clock=lambda: now[0])
+    for t in (1.0, 5.0, 12.0):
+        now[0] = t
+        monitor.add(_row(0.1))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert lines[-1].startswith("[live 00:00:12] llamacpp / short: 3/3 ok")
+
+def test_monitor_aborts_once_a_cell_breaks_a_rule():
+    monitor = live_view.LiveMonitor(max_failure_rate=0.5, min_results=4)
+    for ttft in (-1.0, -1.0, -1.0):
+        monitor.add(_row(ttft)) # Too few runs to judge yet
+    with pytest.raises(live_view.RunAborted, match="failure rate 100%"):
+        monitor.add(_row(-1.0))
+    monitor.add(_row(-1.0)) # Results arriving after the abort are still aggregated
+    assert monitor.aggregator.cells[('short', 'llamacpp')].n_total == 5
+
+    tail_monitor = live_view.LiveMonitor(max_ttft_p99=0.5, min_results=2)
+    tail_monitor.add(_row(0.1))
+    with pytest.raises(live_view.RunAborted, match="TTFT p99"):
+        tail_monitor.add(_row(0.9))
+
+def test_render_dashboard_marks_the_current_cell():
+    monitor = live_view.LiveMonitor()
+    monitor.add(_row(0.1, runner='baseline'))
+    monitor.add(_row(0.2, runner='llamacpp'))
+
+    lines = live_view.render_dashboard(monitor.aggregator, title="run.jsonl").splitlines()
+    assert "run.jsonl (2 results)" in lines[1]
+    assert lines[5].startswith("  short        | baseline")
+    assert lines[6].startswith("> short        | llamacpp")
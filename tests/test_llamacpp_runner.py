@@ -1,5 +1,6 @@
 # tests/test_llamacpp_runner.py
 import pytest
+import requests
 import requests_mock # from the requests-mock library
 from src import llamacpp_runner
 
@@ -36,4 +37,168 @@ def test_run_llamacpp_inference_connection_error(requests_mock):
     # assert ttft == -1.0
     pass
 
-# TODO: Add tests for streaming if that feature is implemented in llamacpp_runner
+# --- Streaming (SSE) ---
+
+def _sse_body(chunks: list[str]) -> str:
+    lines = [f'data: {{"choices": [{{"text": "{c}"}}]}}' for c in chunks]
+    lines.append("data: [DONE]")
+    return "\n\n".join(lines) + "\n\n"
+
+def test_run_llamacpp_streaming_inference_success(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/v1/completions", text=_sse_body(["", " Hello", " world", "!"]))
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi", n_predict=3)
+
+    assert metrics["text"] == "Hello world!"
+    assert metrics["ttft"] > 0
+    assert metrics["n_tokens"] == 3 # The empty first chunk is not counted as a token
+    assert len(metrics["itl"]) == 2
+    assert metrics["decode_time"] >= 0
+    assert metrics["e2e_latency"] >= metrics["ttft"]
+    sent = requests_mock.last_request.json()
+    assert sent["stream"] is True
+    assert sent["n_predict"] == 3
+
+def test_run_llamacpp_streaming_inference_no_tokens(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/v1/completions", text="data: [DONE]\n\n")
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi")
+    assert metrics["ttft"] == -1.0
+    assert metrics["text"] == ""
+
+def test_run_llamacpp_streaming_inference_api_error(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/v1/completions", status_code=500, text="Server Error")
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi")
+    assert metrics["ttft"] == -1.0
+    assert metrics["itl"] == []
+
+def test_streaming_inference_times_out_instead_of_hanging(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/v1/completions", exc=requests.exceptions.ReadTimeout)
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi", timeout=(1.0, 2.0))
+    assert metrics["ttft"] == -1.0
+    assert requests_mock.last_request.timeout == (1.0, 2.0)
+
+def test_streaming_inference_closes_response_on_mid_stream_failure(mocker):
+    response = mocker.MagicMock()
+    response.__enter__.return_value = response
+    response.iter_lines.side_effect = requests.exceptions.ChunkedEncodingError("connection broken")
+    session = mocker.Mock()
+    session.post.return_value = response
+
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi", session=session)
+
+    assert metrics["ttft"] == -1.0
+    response.__exit__.assert_called_once()
+    assert session.post.call_args.kwargs["timeout"] == llamacpp_runner.DEFAULT_TIMEOUT
+
+def test_extract_token_text_formats():
+    assert llamacpp_runner._extract_token_text({"choices": [{"text": "a"}]}) == "a"
+    assert llamacpp_runner._extract_token_text({"choices": [{"delta": {"content": "b"}}]}) == "b"
+    assert llamacpp_runner._extract_token_text({"choices": [{"delta": {"role": "assistant"}}]}) == ""
+    assert llamacpp_runner._extract_token_text({"content": "c"}) == "c"
+
+# --- Multimodal (image + text) ---
+
+def _chat_sse_body(chunks: list[str]) -> str:
+    lines = [f'data: {{"choices": [{{"delta": {{"content": "{c}"}}}}]}}' for c in chunks]
+    lines.append("data: [DONE]")
+    return "\n\n".join(lines) + "\n\n"
+
+def test_run_llamacpp_vlm_inference_success(requests_mock, tmp_path):
+    image_path = tmp_path / "pixel.png"
+    image_path.write_bytes(b"\x89PNG fake image bytes")
+    requests_mock.post(f"{API_BASE_URL}/v1/chat/completions", text=_chat_sse_body(["A", " cat"]))
+
+    metrics = llamacpp_runner.run_llamacpp_vlm_inference(API_BASE_URL, "Describe", str(image_path))
+
+    assert metrics["text"] == "A cat"
+    assert metrics["preprocess_time"] >= 0
+    assert metrics["prefill_time"] > 0
+    assert metrics["ttft"] == pytest.approx(metrics["preprocess_time"] + metrics["prefill_time"])
+    content = requests_mock.last_request.json()["messages"][0]["content"]
+    assert content[0]["image_url"]["url"].startswith("data:image/png;base64,")
+    assert content[1] == {"type": "text", "text": "Describe"}
+
+def test_run_llamacpp_vlm_inference_missing_image():
+    metrics = llamacpp_runner.run_llamacpp_vlm_inference(API_BASE_URL, "Describe", "does/not/exist.png")
+    assert metrics["ttft"] == -1.0
+    assert metrics["prefill_time"] == -1.0
+
+def test_run_llamacpp_vlm_inference_prepared_image(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/v1/chat/completions", text=_chat_sse_body(["ok"]))
+
+    metrics = llamacpp_runner.run_llamacpp_vlm_inference(
+        API_BASE_URL, "Describe", "not/read.png", image_data_url="data:image/png;base64,AAAA"
+    )
+
+    assert metrics["preprocess_time"] == 0.0
+    assert metrics["ttft"] == metrics["prefill_time"]
+    content = requests_mock.last_request.json()["messages"][0]["content"]
+    assert content[0]["image_url"]["url"] == "data:image/png;base64,AAAA"
+
+def test_tokenize_and_detokenize(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/tokenize", json={"tokens": [1, 2, 3]})
+    requests_mock.post(f"{API_BASE_URL}/detokenize", json={"content": "a b c"})
+
+    assert llamacpp_runner.tokenize(API_BASE_URL, "a b c") == [1, 2, 3]
+    assert requests_mock.last_request.json() == {"content": "a b c", "add_special": False}
+    assert llamacpp_runner.detokenize(API_BASE_URL, [1, 2, 3]) == "a b c"
+
+def test_tokenize_unavailable(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/tokenize", status_code=404)
+
+    assert llamacpp_runner.tokenize(API_BASE_URL, "a b c") is None
+
+def test_tokenize_times_out_instead_of_hanging(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/tokenize", exc=requests.exceptions.ReadTimeout)
+    requests_mock.post(f"{API_BASE_URL}/detokenize", exc=requests.exceptions.ReadTimeout)
+
+    assert llamacpp_runner.tokenize(API_BASE_URL, "a b c", timeout=(1.0, 2.0)) is None
+    assert requests_mock.last_request.timeout == (1.0, 2.0)
+    assert llamacpp_runner.detokenize(API_BASE_URL, [1, 2]) is None
+    assert requests_mock.last_request.timeout == llamacpp_runner.DEFAULT_TIMEOUT
+
+def test_served_model(requests_mock):
+    requests_mock.get(f"{API_BASE_URL}/v1/models", json={"object": "list", "data": [{"id": "models/qwen2.5-0.5b-q4_k_m.gguf"}]})
+    assert llamacpp_runner.served_model(API_BASE_URL) == "models/qwen2.5-0.5b-q4_k_m.gguf"
+
+    requests_mock.get(f"{API_BASE_URL}/v1/models", status_code=404)
+    assert llamacpp_runner.served_model(API_BASE_URL) is None
+
+def test_streaming_inference_can_disable_prompt_cache(requests_mock):
+    requests_mock.post(f"{API_BASE_URL}/v1/completions", text=_sse_body([" Hi"]))
+
+    llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi", cache_prompt=False)
+
+    assert requests_mock.last_request.json()["cache_prompt"] is False
+
+def test_streaming_inference_reports_cached_tokens(requests_mock):
+    body = _sse_body([" Hi"]).replace("data: [DONE]", 'data: {"choices": [{"text": ""}], "timings": {"prompt_n": 2, "cache_n": 30}}\n\ndata: [DONE]')
+    requests_mock.post(f"{API_BASE_URL}/v1/completions", text=body)
+
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(API_BASE_URL, "Hi")
+
+    assert metrics["cached_tokens"] == 30
+    assert metrics["n_tokens"] == 1
+
+def test_cached_tokens_from_openai_usage():
+    assert llamacpp_runner._cached_tokens(None, {"prompt_tokens_details": {"cached_tokens": 12}}) == 12
+    assert llamacpp_runner._cached_tokens(None, None) is None
+
+def test_latency_breakdown_splits_ttft():
+    metrics = {"ttft": 0.5, "queue_delay": 0.05, "server_prompt_ms": 300.0, "server_predicted_n": 10, "server_predicted_ms": 200.0}
+
+    breakdown = llamacpp_runner.latency_breakdown(metrics, client_overhead=0.01)
+
+    assert breakdown["client_overhead"] == pytest.approx(0.06)
+    assert breakdown["server_prefill"] == pytest.approx(0.3)
+    assert breakdown["network_queue"] == pytest.approx(0.14)
+    # The parts add up to the measured TTFT, decode timings play no part in it
+    assert breakdown["client_overhead"] + breakdown["server_prefill"] + breakdown["network_queue"] == pytest.approx(metrics["ttft"])
+    assert not breakdown["negative_remainder"]
+    assert llamacpp_runner.latency_breakdown({"ttft": 0.5, "server_prompt_ms": None}) is None
+    assert llamacpp_runner.latency_breakdown({"ttft": -1.0, "server_prompt_ms": 1.0}) is None
+
+def test_latency_breakdown_flags_negative_remainder():
+    breakdown = llamacpp_runner.latency_breakdown({"ttft": 0.2, "server_prompt_ms": 250.0}, client_overhead=0.01)
+
+    assert breakdown["network_queue"] == pytest.approx(-0.06)
+    assert breakdown["negative_remainder"]
@@ -0,0 +1,62 @@
+# tests/test_load_generator.py
+import pytest
+from src import load_generator
+
+API_BASE_URL = "http://test-llamacpp-api:8000"
+
+def _ok(ttft=0.1, e2e=0.5, n_tokens=10):
+    return {"text": "ok", "ttft": ttft, "itl": [], "decode_time": e2e - ttft,
+            "tokens_per_sec": 0.0, "n_tokens": n_tokens, "e2e_latency": e2e}
+
+def _failed():
+    return {"text": "", "ttft": -1.0, "itl": [], "decode_time": 0.0,
+            "tokens_per_sec": 0.0, "n_tokens": 0, "e2e_latency": -1.0}
+
+def test_summarize_level_counts_errors_and_throughput():
+    results = [_ok(ttft=0.1), _ok(ttft=0.3), _failed(), _ok(ttft=0.2)]
+    summary = load_generator.summarize_level(results, duration=2.0)
+
+    assert summary["n_requests"] == 4
+    assert summary["n_errors"] == 1
+    assert summary["error_rate"] == pytest.approx(0.25)
+    assert summary["throughput_rps"] == pytest.approx(1.5)
+    assert summary["throughput_tps"] == pytest.approx(15.0)
+    assert summary["ttft_p50"] == pytest.approx(0.2)
+
+def test_run_concurrency_sweep_sends_requests_per_level(mocker):
+    runner = mocker.patch('src.load_generator.llamacpp_runner.run_llamacpp_streaming_inference', side_effect=lambda *a, **k: _ok())
+
+    summaries = load_generator.run_concurrency_sweep(API_BASE_URL, ["a", "b"], [1, 3], requests_per_level=5)
+
+    assert runner.call_count == 10
+    assert [s["concurrency"] for s in summaries] == [1, 3]
+    assert all(s["n_requests"] == 5 and s["n_errors"] == 0 for s in summaries)
+    # The pooled session is shared by every request of a level
+    assert runner.call_args.kwargs["session"] is not None
+
+def test_run_qps_sweep_adds_queue_delay(mocker):
+    mocker.patch('src.load_generator.llamacpp_runner.run_llamacpp_streaming_inference', side_effect=lambda *a, **k: _ok(ttft=0.1))
+
+    summaries = load_generator.run_qps_sweep(API_BASE_URL, ["a"], [200.0], requests_per_level=4, seed=1)
+
+    assert summaries[0]["mode"] == "open"
+    assert summaries[0]["n_requests"] == 4
+    assert summaries[0]["ttft_p50"] >= 0.1
+
+def test_run_qps_sweep_stops_the_clock_at_the_last_completion(mocker):
+    mocker.patch('src.load_generator.llamacpp_runner.run_llamacpp_streaming_inference', side_effect=lambda *a, **k: _ok())
+    sleep = mocker.patch('src.load_generator.asyncio.sleep', new=mocker.AsyncMock())
+    clock = iter([0.0] + [float(i) for i in range(1, 100)])
+    mocker.patch('src.load_generator.time.perf_counter', side_effect=lambda: next(clock))
+
+    summaries = load_generator.run_qps_sweep(API_BASE_URL, ["a"], [1.0], requests_per_level=3, seed=1)
+
+    # No inter-arrival gap is drawn after the last request is sent
+    assert sleep.await_count == 2
+    # Each request reads the clock for its arrival, its send and its completion: the last completion is at 9
+    assert summaries[0]["duration"] == pytest.approx(9.0)
+
+def test_failed_requests_keep_sentinel_ttft(mocker):
+    mocker.patch('src.load_generator.llamacpp_runner.run_llamacpp_streaming_inference', side_effect=lambda *a, **k: _failed())
+    result = load_generator._timed_request(API_BASE_URL, "a", None, 10, None, arrival_time=0.0)
+    assert result["ttft"] == -1.0
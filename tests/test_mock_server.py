@@ -0,0 +1,109 @@
+# tests/test_mock_server.py
+import pytest
+import requests
+from src import mock_server
+from src import llamacpp_runner
+from src import load_generator
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**profile_kwargs):
+        server, base_url = mock_server.start_mock_server(mock_server.LatencyProfile(**profile_kwargs))
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_streaming_completion_follows_latency_profile(start_server):
+    base_url = start_server(prefill_per_token=0.01, decode_per_token=0.01)
+
+    metrics = llamacpp_runner.run_llamacpp_streaming_inference(base_url, "one two three four five", n_predict=4)
+
+    assert metrics["n_tokens"] == 4
+    assert metrics["text"].strip() == "tok0 tok1 tok2 tok3"
+    assert metrics["ttft"] >= 0.05 # 5 prompt tokens x 10 ms prefill
+    assert len(metrics["itl"]) == 3
+    assert all(itl >= 0.009 for itl in metrics["itl"])
+
+def test_non_streaming_completion_reports_timings(start_server):
+    base_url = start_server(prefill_per_token=0.0, decode_per_token=0.0)
+
+    response = requests.post(f"{base_url}/v1/completions", json={"prompt": "a b c", "n_predict": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["choices"][0]["text"] == " tok0 tok1 tok2"
+    assert body["timings"]["prompt_n"] == 3
+    assert body["timings"]["predicted_n"] == 3
+
+def test_chat_completion_counts_image_tokens(start_server, tmp_path):
+    base_url = start_server(prefill_per_token=0.001, decode_per_token=0.0, image_tokens=50)
+    image = tmp_path / "image.png"
+    image.write_bytes(b"not really a png")
+
+    metrics = llamacpp_runner.run_llamacpp_vlm_inference(base_url, "describe", str(image), n_predict=2)
+
+    assert metrics["n_tokens"] == 2
+    assert metrics["prefill_time"] >= 0.05 # 50 image tokens + 1 text token x 1 ms
+
+def test_requests_queue_for_a_single_slot(start_server):
+    base_url = start_server(prefill_per_token=0.0, decode_per_token=0.02, n_slots=1)
+
+    summaries = load_generator.run_concurrency_sweep(base_url, ["hi"], [2], requests_per_level=4, n_predict=5)
+
+    # Each request holds the slot for ~80 ms, so with 2 users someone always waits for one
+    assert summaries[0]["n_errors"] == 0
+    assert summaries[0]["ttft_p90"] >= 0.06
+    # The wait for the slot is not server prefill time, so it lands in the network/queue share
+    assert summaries[0]["network_queue_p50"] > summaries[0]["server_prefill_p50"]
+
+def test_load_sweep_summarises_server_metrics(start_server):
+    base_url = start_server(prefill_per_token=0.0, decode_per_token=0.01, n_slots=1)
+
+    summaries = load_generator.run_concurrency_sweep(base_url, ["hi"], [2], requests_per_level=4, n_predict=5, monitor_interval=0.01)
+
+    assert summaries[0]["server_n_samples"] >= 2
+    assert summaries[0]["server_max_requests_deferred"] >= 1
+
+def test_full_queue_is_rejected(start_server):
+    base_url = start_server(decode_per_token=0.05, n_slots=1, max_queue=0)
+
+    summaries = load_generator.run_concurrency_sweep(base_url, ["hi"], [3], requests_per_level=3, n_predict=5)
+
+    assert summaries[0]["n_errors"] >= 1
+
+def test_prompt_cache_skips_shared_prefix(start_server):
+    base_url = start_server(prefill_per_token=0.002, decode_per_token=0.0)
+    prefix = " ".join(f"w{i}" for i in range(50))
+
+    cold = llamacpp_runner.run_llamacpp_streaming_inference(base_url, prefix + " first question", n_predict=1, cache_prompt=False)
+    warm = llamacpp_runner.run_llamacpp_streaming_inference(base_url, prefix + " second question", n_predict=1)
+
+    assert cold["cached_tokens"] == 0
+    assert warm["cached_tokens"] == 50
+    assert warm["ttft"] < cold["ttft"]
+
+def test_unknown_endpoint_returns_404(start_server):
+    base_url = start_server()
+
+    assert requests.post(f"{base_url}/v1/embeddings", json={}).status_code == 404
+
+def test_served_model_is_reported(start_server):
+    base_url = start_server(model_id="mock-q4_k_m.gguf")
+
+    assert llamacpp_runner.served_model(base_url) == "mock-q4_k_m.gguf"
+
+def test_measure_harness_overhead_is_small(mocker):
+    serve = mocker.spy(mock_server, 'start_mock_server')
+    overhead = mock_server.measure_harness_overhead(n_requests=5, n_predict=3)
+
+    serve.assert_not_called() # The calibration server runs in its own process
+
+    assert overhead["n_requests"] == 5
+    assert 0.0 < overhead["ttft_p50"] < 0.5
+    assert overhead["itl_p50"] < 0.5
@@ -0,0 +1,37 @@
+# tests/test_plugins.py
+import importlib.metadata
+import sys
+from src import plugins
+
+def test_lazy_import_defers_the_import_until_first_use(mocker):
+    mocker.patch.dict(sys.modules)
+    sys.modules.pop("colorsys", None)
+
+    module = plugins.lazy_import("colorsys")
+    assert isinstance(module, plugins.LazyModule)
+    assert "colorsys" not in sys.modules
+
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert plugins.lazy_import("colorsys") is sys.modules["colorsys"] # Already imported: the real module
+
+def test_missing_modules_checks_without_importing(mocker):
+    mocker.patch.dict(sys.modules)
+    sys.modules.pop("colorsys", None)
+    assert plugins.missing_modules(["colorsys", "no_such_module_xyz", "no_such_package.sub"]) == ["no_such_module_xyz", "no_such_package.sub"]
+    assert "colorsys" not in sys.modules
+
+def test_runner_plugins_adds_entry_points_without_overriding_builtins(mocker, capsys):
+    register_builtin = lambda: {}
+    entry_points = [
+        importlib.metadata.EntryPoint("vllm", "colorsys:rgb_to_hsv", plugins.ENTRY_POINT_GROUP),
+        importlib.metadata.EntryPoint("llamacpp", "colorsys:hsv_to_rgb", plugins.ENTRY_POINT_GROUP),
+    ]
+    mocker.patch('src.plugins.importlib.metadata.entry_points', return_value=entry_points)
+
+    loaders = plugins.runner_plugins({'llamacpp': register_builtin})
+
+    assert list(loaders) == ['llamacpp', 'vllm']
+    assert loaders['llamacpp']() is register_builtin
+    assert loaders['vllm']().__name__ == "rgb_to_hsv"
+    assert "Ignoring runner plugin 'llamacpp'" in capsys.readouterr().out
@@ -0,0 +1,108 @@
+# tests/test_regression.py
+import csv
+import random
+import pytest
+from src import regression
+from src import results_store
+from scripts import compare
+
+def _rows(ttfts, runner='llamacpp', model='m.gguf', prompt_type='short', tokens_per_sec=50.0, **extra):
+    return [dict({'prompt_type': prompt_type, 'runner': runner, 'model': model, 'ttft': t, 'tokens_per_sec': tokens_per_sec}, **extra) for t in ttfts]
+
+def _ttfts(center, n=20, seed=0):
+    rng = random.Random(seed)
+    return [center * (1.0 + rng.uniform(-0.02, 0.02)) for _ in range(n)]
+
+def test_compare_flags_significant_ttft_regression():
+    comparisons = regression.compare_result_sets(_rows(_ttfts(0.100)), _rows(_ttfts(0.120, seed=1)))
+
+    assert len(comparisons) == 1
+    assert comparisons[0]['status'] == "regression"
+    assert comparisons[0]['regressions'] == ["TTFT p50", "TTFT p99"]
+    assert comparisons[0]['ttft_p50_change'] == pytest.approx(0.2, abs=0.03)
+
+def test_compare_ignores_noise_and_small_changes():
+    same = regression.compare_result_sets(_rows(_ttfts(0.100)), _rows(_ttfts(0.100, seed=1)))
+    assert same[0]['status'] == "ok"
+
+    # Significant but within the 5% threshold
+    slightly_slower = regression.compare_result_sets(_rows(_ttfts(0.100)), _rows(_ttfts(0.103, seed=1)))
+    assert slightly_slower[0]['status'] == "ok"
+
+    # Large change on too few runs to be significant
+    few = regression.compare_result_sets(_rows([0.10, 0.30]), _rows([0.12, 0.31]))
+    assert few[0]['status'] == "ok"
+
+def test_compare_flags_throughput_drop_and_total_failure():
+    base = _rows(_ttfts(0.1), tokens_per_sec=None)
+    for i, row in enumerate(base):
+        row['tokens_per_sec'] = 50.0 + i * 0.01
+    current = _rows(_ttfts(0.1, seed=1), tokens_per_sec=None)
+    for i, row in enumerate(current):
+        row['tokens_per_sec'] = 40.0 + i * 0.01
+    assert regression.compare_result_sets(base, current)[0]['regressions'] == ["throughput"]
+
+    failed = regression.compare_result_sets(_rows(_ttfts(0.1)), _rows([-1.0, -1.0]))
+    assert failed[0]['regressions'] == ["all runs failed"]
+
+def test_compare_aligns_by_workload_runner_model_and_cell():
+    base = _rows(_ttfts(0.1), model='q4.gguf') + _rows(_ttfts(0.2), runner='baseline', model='gpt2')
+    current = _rows(_ttfts(0.1, seed=1), model='q5.gguf') + _rows(_ttfts(0.2, seed=1), runner='baseline', model='gpt2', cell='max_new_tokens=5')
+
+    statuses = {(c['cell'], c['runner'], c['model']): c['status'] for c in regression.compare_result_sets(base, current)}
+    assert statuses == {
+        ('', 'baseline', 'gpt2'): "missing",
+        ('', 'llamacpp', 'q4.gguf'): "missing",
+        ('', 'llamacpp', 'q5.gguf'): "new",
+        ('max_new_tokens=5', 'baseline', 'gpt2'): "new",
+    }
+    ignoring_model = regression.compare_result_sets(base, current, ignore_model=True)
+    assert [c['status'] for c in ignoring_model if c['runner'] == 'llamacpp'] == ["ok"]
+
+    sweep_row = {'prompt_type': 'sweep', 'runner': 'llamacpp', 'input_tokens': '128'}
+    assert regression.cell_key(sweep_row) == ('', 'sweep@128', 'llamacpp', '')
+
+def test_load_result_set_from_jsonl_csv_and_directory(tmp_path):
+    sink = results_store.ResultSink(str(tmp_path / "run" / "000_cell.jsonl"), tags={'cell': 'a'})
+    prompt_id = sink.intern_prompt("Hi")
+    sink.append({'prompt_id': prompt_id, 'prompt_type': 'short', 'runner': 'llamacpp', 'repetition': 0, 'ttft': 0.1, 'tokens_per_sec': ''})
+    sink.close()
+    csv_path = tmp_path / "benchmark_results.csv"
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['prompt_type', 'runner', 'ttft', 'tokens_per_sec'])
+        writer.writeheader()
+        writer.writerow({'prompt_type': 'short', 'runner': 'llamacpp', 'ttft': '0.25', 'tokens_per_sec': ''})
+
+    from_dir = regression.load_result_set(str(tmp_path / "run"))
+    assert [(r['cell'], r['ttft'], r['tokens_per_sec']) for r in from_dir] == [('a', 0.1, None)]
+    assert regression.load_result_set(str(tmp_path / "run" / "000_cell.jsonl")) == from_dir
+    assert [(r['ttft'], r['tokens_per_sec']) for r in regression.load_result_set(str(csv_path))] == [(0.25, None)]
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['prompt_type', 'runner', 'model', 'ttft', 'tokens_per_sec'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_compare_main_exit_codes(tmp_path, capsys):
+    base, slower, other_model = tmp_path / "base.csv", tmp_path / "slower.csv", tmp_path / "other.csv"
+    _write_csv(base, _rows(_ttfts(0.1)))
+    _write_csv(slower, _rows(_ttfts(0.15, seed=1)))
+    _write_csv(other_model, _rows(_ttfts(0.15, seed=1), model='other.gguf'))
+
+    assert compare.main([str(base), str(base)]) == 0
+    assert compare.main([str(base), str(slower)]) == 1
+    assert "FAIL" in capsys.readouterr().out
+    assert compare.main([str(base), str(slower), "--ttft-p50", "1.0", "--ttft-p99", "1.0"]) == 0
+    assert compare.main([str(base), str(other_model)]) == 2 # Nothing to compare
+    assert compare.main([str(base), str(other_model), "--ignore-model"]) == 1
+
+def test_compare_main_fails_when_baseline_cells_are_missing(tmp_path, capsys):
+    base, without_llamacpp = tmp_path / "base.csv", tmp_path / "current.csv"
+    rows = _rows(_ttfts(0.1))
+    _write_csv(base, rows + _rows(_ttfts(0.1), runner='baseline', model='gpt2'))
+    _write_csv(without_llamacpp, _rows(_ttfts(0.1), runner='baseline', model='gpt2')) # The llamacpp phase crashed
+
+    assert compare.main([str(base), str(without_llamacpp)]) == 1
+    assert "1 baseline cell(s) missing" in capsys.readouterr().out
+    assert compare.main([str(base), str(without_llamacpp), "--allow-missing"]) == 0
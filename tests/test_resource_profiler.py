@@ -0,0 +1,52 @@
+# tests/test_resource_profiler.py
+import os
+import sys
+import time
+import pytest
+from src import resource_profiler
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+
+@linux_only
+def test_process_stats_of_own_process():
+    assert resource_profiler.process_cpu_seconds(os.getpid()) >= 0.0
+    assert resource_profiler.process_rss_mb(os.getpid()) > 0.0
+    cores = resource_profiler.read_core_times()
+    assert len(cores) == os.cpu_count()
+    assert all(0 <= busy <= total for busy, total in cores)
+
+def test_process_stats_of_missing_process():
+    missing_pid = 2 ** 30
+    assert resource_profiler.process_cpu_seconds(missing_pid) is None
+    assert resource_profiler.process_rss_mb(missing_pid) is None
+
+@linux_only
+def test_profiler_measures_busy_region_and_server_process():
+    with resource_profiler.ResourceProfiler(server_pid=os.getpid(), interval=0.01) as profiler:
+        deadline = time.perf_counter() + 0.2
+        while time.perf_counter() < deadline:
+            pass
+    summary = profiler.summary()
+
+    assert summary['cpu_util'] > 0.5 # One core spinning
+    assert summary['peak_rss_mb'] >= summary['rss_mb'] > 0.0
+    assert len(profiler.rss_samples) > 2 # Sampled during the region, not just at its edges
+    assert len(summary['core_util']) == os.cpu_count()
+    assert max(summary['core_util']) > 0.0
+    assert summary['server_cpu_util'] > 0.0
+    assert summary['server_peak_rss_mb'] > 0.0
+
+def test_profiler_without_server_pid_omits_server_figures():
+    with resource_profiler.ResourceProfiler(interval=0.01) as profiler:
+        pass
+    assert not any(key.startswith('server_') for key in profiler.summary())
+
+def test_efficiency():
+    row = {'tokens_per_sec': 40.0, 'cpu_util': 4.0, 'peak_rss_mb': 2048.0, 'server_cpu_util': 8.0, 'server_peak_rss_mb': 512.0}
+    assert resource_profiler.efficiency(row) == {'tokens_per_sec_per_core': 10.0, 'tokens_per_sec_per_gb': 20.0}
+    assert resource_profiler.efficiency(row, server_side=True) == {'tokens_per_sec_per_core': 5.0, 'tokens_per_sec_per_gb': 80.0}
+    # A llama.cpp row without server figures says nothing about the server's efficiency
+    assert resource_profiler.efficiency({'tokens_per_sec': 40.0, 'cpu_util': 0.1}, server_side=True) == {
+        'tokens_per_sec_per_core': None, 'tokens_per_sec_per_gb': None}
+    assert resource_profiler.efficiency({'tokens_per_sec': '', 'cpu_util': 1.0}) == {
+        'tokens_per_sec_per_core': None, 'tokens_per_sec_per_gb': None}
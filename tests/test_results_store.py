@@ -0,0 +1,97 @@
+# tests/test_results_store.py
+import json
+import pytest
+from src import results_store
+
+def _result(prompt_id, runner, repetition, ttft):
+    return {'prompt_id': prompt_id, 'runner': runner, 'repetition': repetition, 'ttft': ttft}
+
+def test_prompts_are_interned_once(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = results_store.ResultSink(str(path))
+    first = sink.intern_prompt("A long prompt")
+    second = sink.intern_prompt("A long prompt")
+    sink.append(_result(first, 'baseline', 0, 0.1))
+    sink.append(_result(first, 'baseline', 1, 0.2))
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert first == second
+    assert sum(1 for record in lines if record['kind'] == 'prompt') == 1
+    assert all('prompt_text' not in record for record in lines if record['kind'] == 'result')
+
+def test_records_are_on_disk_before_close(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = results_store.ResultSink(str(path))
+    prompt_id = sink.intern_prompt("Hello?")
+    sink.append(_result(prompt_id, 'llamacpp', 0, 0.1))
+
+    assert len(results_store.load_results(str(path))) == 1
+    sink.close()
+
+def test_load_results_applies_outliers_and_prompt_text(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    sink = results_store.ResultSink(path)
+    prompt_id = sink.intern_prompt("Hello?")
+    sink.append(_result(prompt_id, 'llamacpp', 0, 0.1))
+    sink.append(_result(prompt_id, 'llamacpp', 1, 0.9))
+    sink.finish_cell(prompt_id, 'llamacpp', [1])
+    sink.record_cold_start('baseline', 2.5)
+    sink.record_cold_start('baseline-int8', 1.5, 120.0, 180.0)
+    sink.close()
+
+    results = results_store.load_results(path)
+    assert [r['outlier'] for r in results] == [False, True]
+    assert all(r['prompt_text'] == "Hello?" for r in results)
+    assert 'prompt_text' not in results_store.load_results(path, include_prompt_text=False)[0]
+    assert results_store.load_cold_starts(path) == {'baseline': 2.5, 'baseline-int8': 1.5}
+    assert results_store.load_model_memory(path) == {'baseline-int8': {'weights_mb': 120.0, 'rss_delta_mb': 180.0}}
+
+def test_resume_restores_cells_and_tolerates_truncated_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = results_store.ResultSink(str(path))
+    prompt_id = sink.intern_prompt("Hello?")
+    sink.append(_result(prompt_id, 'baseline', 0, 0.1))
+    sink.finish_cell(prompt_id, 'baseline', [])
+    sink.append(_result(prompt_id, 'llamacpp', 0, 0.2))
+    sink.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind": "result", "prompt_id"') # Crash mid-write
+
+    resumed = results_store.ResultSink(str(path), resume=True)
+    assert resumed.is_cell_done(prompt_id, 'baseline')
+    assert not resumed.is_cell_done(prompt_id, 'llamacpp')
+    assert [r['ttft'] for r in resumed.cell_results(prompt_id, 'llamacpp')] == [0.2]
+    resumed.append(_result(prompt_id, 'llamacpp', 1, 0.3))
+    resumed.close()
+    assert [r['ttft'] for r in results_store.load_results(str(path))] == [0.1, 0.2, 0.3]
+
+def test_existing_file_requires_resume(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text("", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        results_store.ResultSink(str(path))
+
+def test_on_result_sees_each_new_result(tmp_path):
+    path = tmp_path / "results.jsonl"
+    seen = []
+    sink = results_store.ResultSink(str(path), tags={'cell': "c"}, on_result=seen.append)
+    sink.append(_result("p", 'baseline', 0, 0.1))
+    sink.close()
+    assert seen == [{'kind': 'result', 'prompt_id': "p", 'runner': 'baseline', 'repetition': 0, 'ttft': 0.1, 'cell': "c"}]
+
+    resumed = results_store.ResultSink(str(path), resume=True, on_result=seen.append)
+    resumed.close()
+    assert len(seen) == 1 # Stored results are not replayed
+
+def test_read_new_records_follows_a_growing_file(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"kind": "result", "ttft": 0.1}\n{"kind": "res', encoding="utf-8")
+
+    records, offset = results_store.read_new_records(str(path))
+    assert records == [{'kind': 'result', 'ttft': 0.1}]
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('ult", "ttft": 0.2}\n')
+    records, offset = results_store.read_new_records(str(path), offset)
+    assert records == [{'kind': 'result', 'ttft': 0.2}]
+    assert results_store.read_new_records(str(path), offset) == ([], offset)
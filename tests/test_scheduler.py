@@ -0,0 +1,118 @@
+# tests/test_scheduler.py
+import os
+import time
+import pytest
+from src import results_store
+from src import scheduler
+
+def _fake_phase(sink, runner_name, workload):
+    """Module-level so spawned workers can unpickle it."""
+    for item in workload:
+        if sink.is_cell_done(item['prompt_id'], runner_name):
+            continue
+        repetition = len(sink.cell_results(item['prompt_id'], runner_name))
+        sink.append({'prompt_id': item['prompt_id'], 'runner': runner_name, 'repetition': repetition,
+                     'ttft': 0.1, 'pid': os.getpid()})
+        sink.finish_cell(item['prompt_id'], runner_name, [])
+    sink.record_cold_start(runner_name, 1.0)
+
+def _endless_phase(sink, runner_name, workload):
+    """Keeps producing results until the worker is stopped."""
+    repetition = 0
+    while True:
+        sink.append({'prompt_id': workload[0]['prompt_id'], 'runner': runner_name, 'repetition': repetition, 'ttft': 0.1})
+        repetition += 1
+        time.sleep(0.01)
+
+@pytest.fixture
+def sink_and_workload(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    sink = results_store.ResultSink(path)
+    workload = [{'prompt_id': sink.intern_prompt(text), 'prompt_type': 'short', 'prompt_idx': i}
+                for i, text in enumerate(["a", "b"])]
+    return path, sink, workload
+
+def test_run_phases_in_process(sink_and_workload):
+    path, sink, workload = sink_and_workload
+
+    scheduler.run_phases(sink, _fake_phase, ['baseline', 'llamacpp'], workload, mode="none")
+    sink.close()
+
+    results = results_store.load_results(path)
+    assert len(results) == 4
+    assert {r['pid'] for r in results} == {os.getpid()}
+    assert set(results_store.load_phase_usage(path)) == {'baseline', 'llamacpp'}
+
+def test_first_in_process_phase_gets_its_thread_count_before_torch_is_imported(sink_and_workload, mocker, monkeypatch):
+    _, sink, workload = sink_and_workload
+    fake_torch = mocker.Mock()
+    fake_torch.threads = 1
+    fake_torch.get_num_threads.side_effect = lambda: fake_torch.threads
+    fake_torch.set_num_threads.side_effect = lambda n: setattr(fake_torch, 'threads', n)
+    monkeypatch.delitem(scheduler.sys.modules, "torch", raising=False)
+    import_module = mocker.patch('src.scheduler.importlib.import_module', return_value=fake_torch)
+    seen = []
+
+    def phase(sink, runner_name, workload):
+        seen.append((runner_name, fake_torch.threads))
+        monkeypatch.setitem(scheduler.sys.modules, "torch", fake_torch) # As the phase's own model import would
+
+    scheduler.run_phases(sink, phase, ['baseline-a', 'baseline-b'], workload, mode="none",
+                         num_threads={'baseline-a': 2, 'baseline-b': 3}, torch_runners={'baseline-a', 'baseline-b'})
+
+    assert seen == [('baseline-a', 2), ('baseline-b', 3)]
+    import_module.assert_called_once_with("torch")
+    assert fake_torch.threads == 1 # Restored after each phase
+
+def test_thread_count_does_not_import_torch_for_other_runners(mocker, monkeypatch):
+    monkeypatch.delitem(scheduler.sys.modules, "torch", raising=False)
+    monkeypatch.setattr(scheduler.os, "environ", {})
+    import_module = mocker.patch('src.scheduler.importlib.import_module')
+
+    scheduler._apply_isolation(None, 2) # e.g. RUNNER_NUM_THREADS["llamacpp"]
+
+    import_module.assert_not_called()
+    assert scheduler.os.environ["OMP_NUM_THREADS"] == "2"
+
+@pytest.mark.parametrize("mode", ["sequential", "concurrent"])
+def test_run_phases_in_workers(sink_and_workload, mode):
+    path, sink, workload = sink_and_workload
+
+    scheduler.run_phases(sink, _fake_phase, ['baseline', 'llamacpp'], workload, mode=mode,
+                         num_threads={'baseline': 1})
+    sink.close()
+
+    results = results_store.load_results(path)
+    assert len(results) == 4
+    assert os.getpid() not in {r['pid'] for r in results}
+    # Each runner's phase ran in its own process
+    assert len({r['pid'] for r in results if r['runner'] == 'baseline'} | {r['pid'] for r in results if r['runner'] == 'llamacpp'}) == 2
+    usage = results_store.load_phase_usage(path)
+    assert usage['baseline']['num_threads'] == 1
+    assert usage['llamacpp']['peak_rss_mb'] > 0
+    assert results_store.load_cold_starts(path) == {'baseline': 1.0, 'llamacpp': 1.0}
+
+def test_workers_resume_from_snapshot(sink_and_workload):
+    path, sink, workload = sink_and_workload
+    sink.append({'prompt_id': workload[0]['prompt_id'], 'runner': 'baseline', 'repetition': 0, 'ttft': 0.1, 'pid': 0})
+    sink.finish_cell(workload[0]['prompt_id'], 'baseline', [])
+
+    scheduler.run_phases(sink, _fake_phase, ['baseline'], workload, mode="sequential")
+    sink.close()
+
+    assert [r['prompt_id'] for r in results_store.load_results(path)] == [workload[0]['prompt_id'], workload[1]['prompt_id']]
+
+def test_run_phases_rejects_unknown_mode(sink_and_workload):
+    _, sink, workload = sink_and_workload
+    with pytest.raises(ValueError):
+        scheduler.run_phases(sink, _fake_phase, ['baseline'], workload, mode="parallel")
+    sink.close()
+
+def test_sink_error_stops_workers_without_waiting(sink_and_workload, mocker):
+    path, sink, workload = sink_and_workload
+    mocker.patch.object(sink, 'append', side_effect=RuntimeError("abort"))
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        scheduler.run_phases(sink, _endless_phase, ['llamacpp'], workload, mode="sequential")
+    assert time.perf_counter() - start < 30 # The endless worker was terminated, not waited for
@@ -0,0 +1,60 @@
+# tests/test_server_monitor.py
+import time
+import pytest
+from src import server_monitor
+from src import mock_server
+from src import llamacpp_runner
+
+API_BASE_URL = "http://test-llamacpp-api:8000"
+
+def test_parse_prometheus_metrics():
+    text = (
+        "# HELP llamacpp:prompt_tokens_total Number of prompt tokens processed.\n"
+        "# TYPE llamacpp:prompt_tokens_total counter\n"
+        "llamacpp:prompt_tokens_total 1234\n"
+        'llamacpp:requests_processing{slot="0"} 2\n'
+        "broken line\n"
+    )
+    assert server_monitor.parse_prometheus_metrics(text) == {
+        "llamacpp:prompt_tokens_total": 1234.0,
+        "llamacpp:requests_processing": 2.0,
+    }
+
+def test_scrape_endpoints_unavailable(requests_mock):
+    requests_mock.get(f"{API_BASE_URL}/metrics", status_code=501)
+    requests_mock.get(f"{API_BASE_URL}/slots", status_code=501)
+
+    assert server_monitor.scrape_metrics(API_BASE_URL) is None
+    assert server_monitor.scrape_slots(API_BASE_URL) is None
+
+def test_summarize_server_samples():
+    samples = [
+        {"t": 0.0, "llamacpp:prompt_tokens_total": 0, "llamacpp:requests_deferred": 0, "slots_busy": 1, "slots_total": 2},
+        {"t": 2.0, "llamacpp:prompt_tokens_total": 100, "llamacpp:requests_deferred": 3, "slots_busy": 2, "slots_total": 2},
+    ]
+    summary = server_monitor.summarize_server_samples(samples)
+
+    assert summary["prompt_tokens_per_sec"] == pytest.approx(50.0)
+    assert summary["max_requests_deferred"] == 3
+    assert summary["max_slots_busy"] == 2
+    assert summary["predicted_tokens_per_sec"] is None
+    assert summary["mean_kv_cache_usage"] is None
+
+def test_monitor_polls_mock_server():
+    # The request keeps a slot busy for 250 ms, several poll intervals, so a busy sample is always seen
+    server, base_url = mock_server.start_mock_server(mock_server.LatencyProfile(prefill_per_token=0.0, decode_per_token=0.05, n_slots=2))
+    try:
+        with server_monitor.ServerMonitor(base_url, interval=0.02) as monitor:
+            llamacpp_runner.run_llamacpp_streaming_inference(base_url, "a b c d", n_predict=5)
+            # The server updates its counters after the stream ends; wait for a poll that saw them
+            deadline = time.perf_counter() + 2.0
+            while time.perf_counter() < deadline and not (monitor.samples and monitor.samples[-1].get("llamacpp:prompt_tokens_total") == 4):
+                time.sleep(0.02)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(monitor.samples) >= 2
+    assert monitor.samples[-1]["llamacpp:prompt_tokens_total"] == 4
+    assert monitor.samples[-1]["slots_total"] == 2
+    assert server_monitor.summarize_server_samples(monitor.samples)["max_slots_busy"] >= 1
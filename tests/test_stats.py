@@ -0,0 +1,86 @@
+# tests/test_stats.py
+import pytest
+from src import stats
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert stats.percentile(values, 0) == 1.0
+    assert stats.percentile(values, 100) == 4.0
+    assert stats.percentile(values, 50) == pytest.approx(2.5)
+    assert stats.percentile(values, 90) == pytest.approx(3.7)
+
+def test_percentile_unsorted_and_single_value():
+    assert stats.percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert stats.percentile([5.0], 99) == 5.0
+
+def test_percentile_empty():
+    assert stats.percentile([], 50) == 0.0
+
+def test_stddev_and_mean():
+    assert stats.mean([1.0, 2.0, 3.0]) == 2.0
+    assert stats.stddev([2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]) == pytest.approx(2.138, abs=1e-3)
+    assert stats.stddev([1.0]) == 0.0
+
+def test_bootstrap_ci_brackets_mean_and_is_deterministic():
+    values = [0.10, 0.11, 0.09, 0.12, 0.10, 0.11]
+    low, high = stats.bootstrap_ci(values)
+    assert low <= stats.mean(values) <= high
+    assert (low, high) == stats.bootstrap_ci(values)
+
+def test_outlier_flags_marks_spike():
+    values = [0.10, 0.11, 0.10, 0.12, 0.11, 0.95]
+    assert stats.outlier_flags(values) == [False, False, False, False, False, True]
+    assert stats.outlier_flags([0.1, 5.0]) == [False, False]
+
+def test_summarize_keys():
+    summary = stats.summarize([0.1, 0.2, 0.3])
+    assert summary["n"] == 3
+    assert summary["p50"] == pytest.approx(0.2)
+    assert summary["ci_low"] <= summary["mean"] <= summary["ci_high"]
+
+def test_mann_whitney_u():
+    # U = 0 for fully separated samples of five: z = (12.5 - 0.5) / sqrt(25 * 11 / 12)
+    assert stats.mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]) == pytest.approx(0.01219, abs=1e-4)
+    assert stats.mann_whitney_u([1, 2, 3], [1, 2, 3]) == 1.0
+    assert stats.mann_whitney_u([1.0] * 4, [1.0] * 4) == 1.0 # All tied
+    assert stats.mann_whitney_u([], [1.0]) == 1.0
+
+def test_bootstrap_percentile_diff_ci():
+    low, high = stats.bootstrap_percentile_diff_ci([1.0, 1.1, 0.9, 1.0, 1.05] * 4, [2.0, 2.1, 1.9, 2.0, 2.05] * 4, 50)
+    assert 0.8 < low <= high < 1.2
+    assert stats.bootstrap_percentile_diff_ci([], [1.0], 50) == (0.0, 0.0)
+
+def test_run_repetitions_discards_warmup_and_stops_early():
+    calls = []
+    def run_once():
+        calls.append(1)
+        return {"ttft": 0.5}
+
+    measured = stats.run_repetitions(run_once, warmup_runs=2, min_repetitions=3, max_repetitions=10, target_rel_ci_width=0.05)
+
+    assert len(measured) == 3 # Identical samples reach a zero-width CI at the minimum
+    assert len(calls) == 5
+
+def test_run_repetitions_runs_max_without_target():
+    measured = stats.run_repetitions(lambda: {"ttft": 0.5}, warmup_runs=0, max_repetitions=4, target_rel_ci_width=None)
+    assert len(measured) == 4
+
+def test_run_repetitions_keeps_going_while_noisy():
+    samples = iter([0.1, 1.0, 0.2, 0.9, 0.3, 0.8])
+    measured = stats.run_repetitions(lambda: {"ttft": next(samples)}, warmup_runs=0, min_repetitions=2, max_repetitions=6, target_rel_ci_width=0.01)
+    assert len(measured) == 6
+
+def test_run_repetitions_stops_when_everything_fails():
+    measured = stats.run_repetitions(lambda: {"ttft": -1.0}, warmup_runs=0, min_repetitions=3, max_repetitions=10, target_rel_ci_width=0.05)
+    assert len(measured) == 3
+
+def test_run_repetitions_continues_from_previous():
+    previous = [{"ttft": 0.1}, {"ttft": 0.9}]
+    measured = stats.run_repetitions(lambda: {"ttft": 0.5}, warmup_runs=0, max_repetitions=4, previous=previous)
+    assert [m["ttft"] for m in measured] == [0.1, 0.9, 0.5, 0.5]
+
+def test_run_repetitions_skips_warmup_when_previous_is_enough():
+    calls = []
+    measured = stats.run_repetitions(lambda: calls.append(1) or {"ttft": 0.5}, warmup_runs=2, max_repetitions=2, previous=[{"ttft": 0.5}, {"ttft": 0.5}])
+    assert len(measured) == 2
+    assert calls == []
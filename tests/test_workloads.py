@@ -0,0 +1,62 @@
+# tests/test_workloads.py
+import pytest
+from src import workloads
+
+class _PieceTokenizer:
+    """Toy subword tokenizer: spaces are tokens of their own and words are cut into pieces of up to 3 characters."""
+
+    def __init__(self):
+        self.vocab = {}
+        self.pieces = []
+
+    def _id(self, piece: str) -> int:
+        if piece not in self.vocab:
+            self.vocab[piece] = len(self.pieces)
+            self.pieces.append(piece)
+        return self.vocab[piece]
+
+    def tokenize(self, text: str) -> list[int]:
+        ids = []
+        for i, word in enumerate(text.split(" ")):
+            if i > 0:
+                ids.append(self._id(" "))
+            ids.extend(self._id(word[j:j + 3]) for j in range(0, len(word), 3))
+        return ids
+
+    def detokenize(self, ids: list[int]) -> str:
+        return "".join(self.pieces[i] for i in ids)
+
+def test_sweep_lengths_doubles_up_to_max():
+    assert workloads.sweep_lengths(32, 300) == [32, 64, 128, 256]
+    assert workloads.sweep_lengths(32, 16) == []
+
+@pytest.mark.parametrize("n_tokens", [1, 7, 32, 100, 513])
+def test_synthetic_prompt_hits_exact_token_count(n_tokens):
+    tokenizer = _PieceTokenizer()
+
+    text, count = workloads.synthetic_prompt(tokenizer.tokenize, tokenizer.detokenize, n_tokens)
+
+    assert count == n_tokens
+    assert len(tokenizer.tokenize(text)) == n_tokens
+
+def test_synthetic_prompt_seeds_do_not_share_a_prefix():
+    tokenizer = _PieceTokenizer()
+
+    first, _ = workloads.synthetic_prompt(tokenizer.tokenize, tokenizer.detokenize, 64, seed=0)
+    second, _ = workloads.synthetic_prompt(tokenizer.tokenize, tokenizer.detokenize, 64, seed=1)
+
+    assert first != second
+    assert first.split(" ")[0] != second.split(" ")[0] or first.split(" ")[1] != second.split(" ")[1]
+
+def test_scaling_exponent():
+    assert workloads.scaling_exponent(100, 1.0, 200, 2.0) == pytest.approx(1.0)
+    assert workloads.scaling_exponent(100, 1.0, 200, 4.0) == pytest.approx(2.0)
+    assert workloads.scaling_exponent(100, 0.0, 200, 4.0) == 0.0
+
+def test_prefix_family_shares_only_the_prefix():
+    prefix, suffixes = workloads.prefix_family(50, 8, 3)
+
+    assert len(prefix.split()) == 50
+    assert len(suffixes) == 3
+    assert all(s.startswith(" ") for s in suffixes)
+    assert len(set(suffixes)) == 3